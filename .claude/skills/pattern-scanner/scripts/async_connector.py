@@ -0,0 +1,270 @@
+"""
+Asyncio MetaTrader MCP connector with a pool of persistent sessions.
+
+``AsyncMcpPool`` keeps up to ``size`` open TCP sessions to an MCP bridge that
+speaks JSON lines (one ``{"id", "method", "params"}`` request per line, one
+``{"id", "result"|"error"}`` response per line; see ``mcp_replay``; errors
+are ``{"code", "message"}`` objects with JSON-RPC codes, or plain strings from
+older bridges). Requests
+borrow an idle session, so the pool size is also the concurrency bound, and
+every request runs under its own timeout. A session that times out or drops
+is discarded rather than reused, since a late reply would desynchronise it.
+
+``fetch_symbol`` / ``fetch_many`` issue the price and every timeframe of every
+symbol at once. ``AsyncMcpConnector`` runs a pool on a background event loop
+and exposes the blocking ``get_symbol_data(symbol, timeframes, count)`` shape
+that ``run_scan`` and ``batch_scanner`` already use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_COUNT = 250
+# JSON-RPC "Method not found": the bridge does not implement the request.
+METHOD_NOT_FOUND = -32601
+
+SymbolData = Tuple[Dict[str, str], float]
+
+
+class McpError(RuntimeError):
+    """The MCP bridge answered with an error, timed out or dropped the session."""
+
+    def __init__(self, message: str, code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class _Session:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def call(self, request_id: int, method: str, params: Dict[str, Any]) -> Any:
+        request = {"id": request_id, "method": method, "params": params}
+        self.writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("MCP session closed by the server.")
+        response = json.loads(line)
+        if response.get("id") != request_id:
+            raise ConnectionError(f"MCP response id {response.get('id')} does not match request {request_id}.")
+        if "error" in response:
+            error = response["error"]
+            if isinstance(error, dict):
+                raise McpError(f"{method}: {error.get('message')}", error.get("code"))
+            raise McpError(f"{method}: {error}")
+        return response.get("result")
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncMcpPool:
+    """Bounded pool of persistent MCP sessions."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self.requests = 0
+        self.timeouts = 0
+        self.sessions_opened = 0
+        self._idle: List[_Session] = []
+        self._slots = asyncio.Semaphore(size)
+        self._ids = itertools.count(1)
+        self._batch_prices = True
+
+    async def __aenter__(self) -> "AsyncMcpPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def call(self, method: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        limit = self.timeout if timeout is None else timeout
+        async with self._slots:
+            session = self._idle.pop() if self._idle else None
+            try:
+                if session is None:
+                    session = await asyncio.wait_for(self._connect(), limit)
+                result = await asyncio.wait_for(session.call(next(self._ids), method, params), limit)
+            except McpError:
+                self._idle.append(session)
+                raise
+            except asyncio.TimeoutError as exc:
+                self.timeouts += 1
+                self._discard(session)
+                raise McpError(f"{method} timed out after {limit:.1f}s") from exc
+            except (ConnectionError, OSError, ValueError) as exc:
+                self._discard(session)
+                raise McpError(f"{method} failed: {exc}") from exc
+            except BaseException:
+                self._discard(session)
+                raise
+            self.requests += 1
+            self._idle.append(session)
+            return result
+
+    async def candles(self, symbol: str, timeframe: str, count: int = DEFAULT_COUNT) -> str:
+        result = await self.call("get_candles_latest", {"symbol": symbol, "timeframe": timeframe, "count": count})
+        # Accept both {"result": "CSV"} wrappers and bare CSV strings, like run_pattern_scan.
+        if isinstance(result, dict) and "result" in result:
+            result = result["result"]
+        if not isinstance(result, str):
+            raise McpError(f"Unexpected candle payload for {symbol} {timeframe}.")
+        return result
+
+    async def price(self, symbol: str) -> float:
+        return _quote_price(await self.call("get_symbol_price", {"symbol": symbol}))
+
+    async def prices(self, symbols: Sequence[str]) -> Dict[str, float]:
+        """Prices for many symbols: one ``get_symbol_prices`` round-trip when the bridge has it."""
+        symbols = list(symbols)
+        if self._batch_prices:
+            try:
+                result = await self.call("get_symbol_prices", {"symbols": symbols})
+            except McpError as exc:
+                if exc.code != METHOD_NOT_FOUND:
+                    raise
+                # Checked once per pool: later calls go straight to per-symbol quotes.
+                self._batch_prices = False
+            else:
+                return {symbol: _quote_price(quote) for symbol, quote in (result or {}).items()}
+        quotes = await asyncio.gather(*(self.price(symbol) for symbol in symbols))
+        return dict(zip(symbols, quotes))
+
+    async def close(self) -> None:
+        while self._idle:
+            session = self._idle.pop()
+            session.close()
+            try:
+                await session.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _connect(self) -> _Session:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.sessions_opened += 1
+        return _Session(reader, writer)
+
+    @staticmethod
+    def _discard(session: Optional[_Session]) -> None:
+        if session is not None:
+            session.close()
+
+
+async def fetch_symbol(
+    pool: AsyncMcpPool,
+    symbol: str,
+    timeframes: Sequence[str],
+    count: int = DEFAULT_COUNT,
+    with_price: bool = True,
+) -> SymbolData:
+    """Price plus every timeframe of one symbol, requested concurrently."""
+    price_request = pool.price(symbol) if with_price else _no_price()
+    price, *payloads = await asyncio.gather(
+        price_request, *(pool.candles(symbol, tf, count) for tf in timeframes)
+    )
+    return dict(zip(timeframes, payloads)), price
+
+
+async def _no_price() -> float:
+    return 0.0
+
+
+async def fetch_many(
+    pool: AsyncMcpPool,
+    symbols: Iterable[str],
+    timeframes: Sequence[str],
+    count: int = DEFAULT_COUNT,
+) -> Dict[str, Union[SymbolData, BaseException]]:
+    """``fetch_symbol`` for every symbol at once; failures are returned per symbol."""
+    symbols = list(symbols)
+    results = await asyncio.gather(
+        *(fetch_symbol(pool, symbol, timeframes, count) for symbol in symbols), return_exceptions=True
+    )
+    return dict(zip(symbols, results))
+
+
+class AsyncMcpConnector:
+    """Blocking adapter running an ``AsyncMcpPool`` on a background event loop (thread-safe)."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-connector", daemon=True)
+        self._thread.start()
+        self.pool = self._run(self._create_pool(host, port, pool_size, timeout))
+
+    def __enter__(self) -> "AsyncMcpConnector":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def get_symbol_data(
+        self,
+        symbol: str,
+        timeframes: Sequence[str],
+        count: int = DEFAULT_COUNT,
+        with_price: bool = True,
+    ) -> Dict[str, Any]:
+        candles, price = self._run(fetch_symbol(self.pool, symbol, list(timeframes), count, with_price))
+        return {"candles": candles, "current_price": price}
+
+    def get_prices(self, symbols: Sequence[str]) -> Dict[str, float]:
+        return self._run(self.pool.prices(symbols))
+
+    def get_many(
+        self, symbols: Iterable[str], timeframes: Sequence[str], count: int = DEFAULT_COUNT
+    ) -> Dict[str, Union[SymbolData, BaseException]]:
+        return self._run(fetch_many(self.pool, symbols, list(timeframes), count))
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        self._run(self.pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _create_pool(host: str, port: int, size: int, timeout: float) -> AsyncMcpPool:
+        return AsyncMcpPool(host, port, size, timeout)
+
+
+def _quote_price(quote: Any) -> float:
+    if isinstance(quote, dict):
+        quote = quote.get("bid") or quote.get("last") or 0.0
+    return float(quote or 0.0)
+
+
+def parse_address(address: str, default_port: int = 8765) -> Tuple[str, int]:
+    """``HOST:PORT`` (or just ``HOST``) as a tuple."""
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host or "127.0.0.1", int(port) if port else default_port
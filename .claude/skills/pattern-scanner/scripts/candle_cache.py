@@ -0,0 +1,153 @@
+"""
+Persistent on-disk candle cache with incremental bar append.
+
+Each symbol/timeframe lives in its own append-only file of fixed 64-byte
+records (``RECORD_DTYPE``), oldest bar first. After the first fill a scan only
+needs the bars newer than the last cached timestamp: ``bars_to_fetch`` sizes
+that request and ``merge`` appends the new bars while rewriting, in place, the
+overlapping tail bars (the previously in-progress candle whose OHLC kept
+moving after it was cached).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from candle_series import FIELDS, CandleSeries, timeframe_seconds
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("tick_volume", "<i8"),
+        ("spread", "<i8"),
+        ("real_volume", "<i8"),
+    ]
+)
+
+# How many trailing cached bars a fetch may overwrite. MT5 only revises the
+# forming bar, but allow a little slack for reconnect gaps.
+REPAIR_WINDOW = 8
+
+_PATH_LOCKS: Dict[Path, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _PATH_LOCKS_GUARD:
+        return _PATH_LOCKS.setdefault(path, threading.Lock())
+
+
+def series_to_records(series: CandleSeries) -> np.ndarray:
+    records = np.empty(len(series), dtype=RECORD_DTYPE)
+    for name in FIELDS:
+        records[name] = getattr(series, name)
+    return records
+
+
+def records_to_series(records: np.ndarray) -> CandleSeries:
+    return CandleSeries(*(records[name] for name in FIELDS))
+
+
+class CandleDiskCache:
+    """Directory of append-only ``<SYMBOL>/<TF>.bin`` candle files."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        return self.directory / symbol.upper() / f"{timeframe.upper()}.bin"
+
+    def bar_count(self, symbol: str, timeframe: str) -> int:
+        path = self.path(symbol, timeframe)
+        return path.stat().st_size // RECORD_DTYPE.itemsize if path.exists() else 0
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        tail = self._read_tail(self.path(symbol, timeframe), 1)
+        return int(tail["time"][-1]) if tail.shape[0] else None
+
+    def load(self, symbol: str, timeframe: str, count: Optional[int] = None) -> CandleSeries:
+        """The newest ``count`` cached bars (all of them when ``count`` is None)."""
+        path = self.path(symbol, timeframe)
+        with _lock_for(path):
+            if count is None:
+                records = np.fromfile(path, dtype=RECORD_DTYPE) if path.exists() else np.empty(0, RECORD_DTYPE)
+            else:
+                records = self._read_tail(path, count)
+        return records_to_series(records)
+
+    def bars_to_fetch(self, symbol: str, timeframe: str, now: int, full_count: int) -> int:
+        """
+        Bars to request so the cache catches up to ``now``.
+
+        ``now`` is on the bar clock (broker server time, see
+        ``candle_series.broker_now``), not UTC. Includes the cached
+        in-progress bar so it gets repaired, and falls back to ``full_count``
+        for an empty or too-stale cache.
+        """
+        last = self.last_time(symbol, timeframe)
+        if last is None:
+            return full_count
+        missing = max(0, (now - last) // timeframe_seconds(timeframe))
+        return int(min(full_count, missing + 1))
+
+    def leaves_gap(self, symbol: str, timeframe: str, series: CandleSeries) -> bool:
+        """Whether ``series`` starts after the last cached bar (a fetch that was sized too short)."""
+        last = self.last_time(symbol, timeframe)
+        return last is not None and not series.is_empty and int(series.time[0]) > last
+
+    def merge(self, symbol: str, timeframe: str, series: CandleSeries) -> int:
+        """Append bars newer than the cache and repair overlapping tail bars; returns bars appended."""
+        if series.is_empty:
+            return 0
+        path = self.path(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        incoming = series_to_records(series)
+        with _lock_for(path):
+            tail = self._read_tail(path, REPAIR_WINDOW)
+            if not tail.shape[0]:
+                self._append(path, incoming)
+                return int(incoming.shape[0])
+
+            last = tail["time"][-1]
+            fresh = incoming[incoming["time"] > last]
+            overlap = incoming[(incoming["time"] <= last) & (incoming["time"] >= tail["time"][0])]
+            slots = np.searchsorted(tail["time"], overlap["time"])
+            matched = tail["time"][np.minimum(slots, tail.shape[0] - 1)] == overlap["time"]
+            if matched.any():
+                tail[slots[matched]] = overlap[matched]
+                self._rewrite_tail(path, tail)
+            if fresh.shape[0]:
+                self._append(path, fresh)
+            return int(fresh.shape[0])
+
+    @staticmethod
+    def _read_tail(path: Path, count: int) -> np.ndarray:
+        if count <= 0 or not path.exists():
+            return np.empty(0, dtype=RECORD_DTYPE)
+        total = path.stat().st_size // RECORD_DTYPE.itemsize
+        start = max(0, total - count)
+        with path.open("rb") as handle:
+            handle.seek(start * RECORD_DTYPE.itemsize)
+            return np.fromfile(handle, dtype=RECORD_DTYPE, count=total - start)
+
+    @staticmethod
+    def _append(path: Path, records: np.ndarray) -> None:
+        with path.open("ab") as handle:
+            records.tofile(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    @staticmethod
+    def _rewrite_tail(path: Path, tail: np.ndarray) -> None:
+        with path.open("r+b") as handle:
+            handle.seek(-tail.shape[0] * RECORD_DTYPE.itemsize, os.SEEK_END)
+            tail.tofile(handle)
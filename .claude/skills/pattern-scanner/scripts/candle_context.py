@@ -0,0 +1,118 @@
+"""
+Per-scan registry of parsed candle payloads.
+
+A single scan touches the same CSV from several places (price inference,
+detection, technical snapshots, report rendering). ``CandleContext`` hands all
+of them the same ``CandlePayload`` for a given (symbol, timeframe, payload
+hash), so each payload is parsed at most once per run. Swing points are
+memoised the same way, so S/R, Fibonacci and chart-pattern consumers share
+one computation per payload and settings. ``debug_stats()`` exposes the
+counters that prove it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from candle_payload import CandlePayload
+from candle_series import CandleSeries
+from swings import SwingPoints, detect_swings
+
+PayloadKey = Tuple[str, str, str]
+
+
+def payload_digest(csv_data: str) -> str:
+    return hashlib.blake2b(csv_data.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class CandleContext:
+    """Parse-once cache of candle payloads shared across one scan."""
+
+    def __init__(self) -> None:
+        self._payloads: Dict[PayloadKey, CandlePayload] = {}
+        self._latest_key: Dict[Tuple[str, str], PayloadKey] = {}
+        self._swings: Dict[Tuple[PayloadKey, Tuple[Tuple[str, Any], ...]], SwingPoints] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.swing_runs = 0
+
+    def payload(self, symbol: str, timeframe: str, csv_data: str) -> CandlePayload:
+        key = (symbol.upper(), timeframe.upper(), payload_digest(csv_data or ""))
+        with self._lock:
+            self.lookups += 1
+            cached = self._payloads.get(key)
+            if cached is None:
+                cached = CandlePayload(csv_data)
+                self._payloads[key] = cached
+            self._latest_key[key[:2]] = key
+            return cached
+
+    def register_series(self, symbol: str, timeframe: str, series: CandleSeries) -> str:
+        """
+        Register a series that is already columnar; returns its CSV.
+
+        Later lookups of that CSV hit this payload, so the text handed to
+        CSV-based consumers is never parsed back.
+        """
+        payload = CandlePayload.from_series(series)
+        key = (symbol.upper(), timeframe.upper(), payload_digest(payload.csv_data))
+        with self._lock:
+            self._payloads.setdefault(key, payload)
+            self._latest_key[key[:2]] = key
+        return payload.csv_data
+
+    def register(self, symbol: str, candles: Dict[str, str]) -> Dict[str, CandlePayload]:
+        return {tf: self.payload(symbol, tf, csv_data) for tf, csv_data in candles.items() if csv_data}
+
+    def series(self, symbol: str, timeframe: str, csv_data: Optional[str] = None) -> CandleSeries:
+        """Full series for a payload; without ``csv_data`` the last registered one is used."""
+        return self._resolve(symbol, timeframe, csv_data).series
+
+    def series_by_timeframe(self, symbol: str, timeframes: Iterable[str]) -> Dict[str, CandleSeries]:
+        result: Dict[str, CandleSeries] = {}
+        for timeframe in timeframes:
+            key = self._latest_key.get((symbol.upper(), timeframe.upper()))
+            if key is not None:
+                result[timeframe] = self._payloads[key].series
+        return result
+
+    def swings(self, symbol: str, timeframe: str, **options: Any) -> SwingPoints:
+        """``detect_swings`` of the last registered payload, computed once per payload and options."""
+        payload = self._resolve(symbol, timeframe, None)
+        key = (self._latest_key[(symbol.upper(), timeframe.upper())], tuple(sorted(options.items())))
+        with self._lock:
+            cached = self._swings.get(key)
+        if cached is None:
+            cached = detect_swings(payload.series, **options)
+            with self._lock:
+                self._swings[key] = cached
+                self.swing_runs += 1
+        return cached
+
+    def swings_by_timeframe(self, symbol: str, timeframes: Iterable[str], **options: Any) -> Dict[str, SwingPoints]:
+        return {
+            timeframe: self.swings(symbol, timeframe, **options)
+            for timeframe in timeframes
+            if (symbol.upper(), timeframe.upper()) in self._latest_key
+        }
+
+    def debug_stats(self) -> Dict[str, int]:
+        parses = [payload.parse_count for payload in self._payloads.values()]
+        return {
+            "payloads": len(parses),
+            "lookups": self.lookups,
+            "full_parses": sum(parses),
+            "tail_reads": sum(payload.tail_reads for payload in self._payloads.values()),
+            "max_parses_per_payload": max(parses, default=0),
+            "swing_runs": self.swing_runs,
+        }
+
+    def _resolve(self, symbol: str, timeframe: str, csv_data: Optional[str]) -> CandlePayload:
+        if csv_data is not None:
+            return self.payload(symbol, timeframe, csv_data)
+        key = self._latest_key.get((symbol.upper(), timeframe.upper()))
+        if key is None:
+            raise KeyError(f"No candles registered for {symbol} {timeframe}.")
+        return self._payloads[key]
@@ -0,0 +1,100 @@
+"""
+Lazy view over a raw MCP candle CSV payload.
+
+Price inference, last-bar validation and current-candle checks only need the
+newest few rows, yet a 250-candle payload is usually parsed in full just to
+read them. ``CandlePayload`` keeps the CSV text and answers ``latest(n)`` by
+slicing only the n newest lines out of the text (from whichever end holds the
+newest bars: MCP payloads are newest-first, exported files oldest-first). The
+full ``CandleSeries`` is materialised once, on first access to ``series``.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from candle_series import CandleSeries
+from mcp_csv import parse_mcp_csv
+
+
+class CandlePayload:
+    """Raw candle CSV with on-demand tail and full parsing."""
+
+    __slots__ = ("csv_data", "parse_count", "tail_reads", "_header", "_body", "_newest_first", "_series")
+
+    def __init__(self, csv_data: str) -> None:
+        self.csv_data = csv_data or ""
+        self.parse_count = 0
+        self.tail_reads = 0
+        header, _, body = self.csv_data.strip().partition("\n")
+        self._header = header
+        self._body = body.strip()
+        self._newest_first: Optional[bool] = None
+        self._series: Optional[CandleSeries] = None
+
+    @classmethod
+    def from_series(cls, series: CandleSeries) -> "CandlePayload":
+        """Payload over an already-columnar series (archives): its CSV rendering, nothing left to parse."""
+        payload = cls(series.to_csv())
+        payload._series = series
+        return payload
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._body
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._series is not None
+
+    @property
+    def series(self) -> CandleSeries:
+        """Full ascending series, parsed on first access."""
+        if self._series is None:
+            self._series = parse_mcp_csv(self.csv_data)
+            self.parse_count += 1
+        return self._series
+
+    def row_count(self) -> int:
+        if self.is_empty:
+            return 0
+        return self._body.count("\n") + 1
+
+    def latest(self, count: int) -> CandleSeries:
+        """The ``count`` newest bars in ascending order, without a full parse."""
+        if self._series is not None:
+            return self._series.tail(count)
+        if count <= 0 or self.is_empty:
+            return CandleSeries.empty()
+        self.tail_reads += 1
+        first, last = self._edge_rows()
+        if self._is_newest_first(first, last):
+            rows = self._body.split("\n", count)[:count]
+        else:
+            rows = self._body.rsplit("\n", count)[-count:]
+        return parse_mcp_csv(self._header + "\n" + "\n".join(rows))
+
+    def last_close(self) -> float:
+        return self.latest(1).last_close()
+
+    def _edge_rows(self) -> Tuple[str, str]:
+        first = self._body[: self._body.find("\n")] if "\n" in self._body else self._body
+        last = self._body[self._body.rfind("\n") + 1 :]
+        return first, last
+
+    def _is_newest_first(self, first: str, last: str) -> bool:
+        if self._newest_first is None:
+            # MCP timestamps are fixed-width ISO strings, so comparing the
+            # text of the time field orders the two edge rows.
+            self._newest_first = self._time_text(first) > self._time_text(last)
+        return self._newest_first
+
+    def _time_text(self, row: str) -> str:
+        names = [name.strip() for name in self._header.split(",")]
+        if names and names[0] == "":
+            names = names[1:]
+        fields = row.split(",")
+        try:
+            return fields[names.index("time") + len(fields) - len(names)]
+        except (ValueError, IndexError):
+            return ""
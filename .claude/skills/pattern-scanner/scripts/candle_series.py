@@ -0,0 +1,245 @@
+"""
+Columnar candle storage for the pattern scanner.
+
+A ``CandleSeries`` keeps every field of one symbol/timeframe as its own
+contiguous NumPy array (float64 prices, int64 epoch seconds and counters) in
+ascending time order. Detection, support/resistance and snapshot code can work
+on whole columns at once instead of indexing DataFrame rows one by one; legacy
+callers that still expect pandas get a view through ``to_pandas()``.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from symbol_metadata import from_points, to_points
+from timestamps import parse_timestamps
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+COUNT_FIELDS = ("tick_volume", "spread", "real_volume")
+FIELDS = ("time",) + PRICE_FIELDS + COUNT_FIELDS
+
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+    "W1": 604800,
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    try:
+        return TIMEFRAME_SECONDS[timeframe.upper()]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported timeframe: {timeframe}") from exc
+
+
+def broker_now(offset: int = 0, utc: Optional[float] = None) -> int:
+    """
+    Current time on the MT5 bar clock, in epoch seconds.
+
+    MT5 stamps bars in broker server time; ``offset`` is that clock in
+    seconds east of UTC (``10800`` for a UTC+3 server). ``utc`` overrides
+    the wall clock.
+    """
+    return int(time.time() if utc is None else utc) + int(offset)
+
+
+class CandleSeries:
+    """Contiguous OHLC arrays for a single symbol/timeframe, oldest bar first."""
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        time: Iterable[int],
+        open: Iterable[float],
+        high: Iterable[float],
+        low: Iterable[float],
+        close: Iterable[float],
+        tick_volume: Optional[Iterable[int]] = None,
+        spread: Optional[Iterable[int]] = None,
+        real_volume: Optional[Iterable[int]] = None,
+    ) -> None:
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        size = self.time.shape[0]
+        for name, values in zip(PRICE_FIELDS, (open, high, low, close)):
+            setattr(self, name, np.ascontiguousarray(values, dtype=np.float64))
+        for name, values in zip(COUNT_FIELDS, (tick_volume, spread, real_volume)):
+            if values is None:
+                array = np.zeros(size, dtype=np.int64)
+            else:
+                array = np.ascontiguousarray(values, dtype=np.int64)
+            setattr(self, name, array)
+        for name in FIELDS:
+            array = getattr(self, name)
+            if array.ndim != 1 or array.shape[0] != size:
+                raise ValueError(f"Column '{name}' must be 1-D with {size} rows.")
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls(*(np.empty(0) for _ in range(5)))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CandleSeries":
+        """Build a series from a DataFrame shaped like ``parse_candles_from_csv`` output."""
+        if df.empty:
+            return cls.empty()
+        epoch = _epoch_seconds(df["time"])
+        order = np.argsort(epoch, kind="stable")
+        columns = {"time": epoch[order]}
+        for name in PRICE_FIELDS:
+            columns[name] = df[name].to_numpy(dtype=np.float64)[order]
+        for name in COUNT_FIELDS:
+            if name in df.columns:
+                columns[name] = df[name].to_numpy(dtype=np.int64)[order]
+        return cls(**columns)
+
+    @classmethod
+    def from_csv(cls, csv_data: str) -> "CandleSeries":
+        """Parse an MCP candle CSV payload (any row order) into a series."""
+        from mcp_csv import parse_mcp_csv
+
+        return parse_mcp_csv(csv_data)
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def __getitem__(self, key: slice) -> "CandleSeries":
+        if not isinstance(key, slice):
+            raise TypeError("CandleSeries only supports slice indexing.")
+        return CandleSeries(*(getattr(self, name)[key] for name in FIELDS))
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "CandleSeries(empty)"
+        first, last = self.datetimes()[[0, -1]]
+        return f"CandleSeries({len(self)} bars, {first} -> {last})"
+
+    @property
+    def is_empty(self) -> bool:
+        return not len(self)
+
+    def tail(self, count: int) -> "CandleSeries":
+        if count <= 0:
+            return self[0:0]
+        return self[-count:]
+
+    def last_close(self) -> float:
+        if not len(self):
+            raise ValueError("Series has no candles.")
+        return float(self.close[-1])
+
+    def datetimes(self) -> np.ndarray:
+        """Bar times as naive UTC ``datetime64[s]`` (a view, not a copy)."""
+        return self.time.view("datetime64[s]")
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        DataFrame view over the same buffers (no column is copied).
+
+        The ``time`` column is naive UTC. Treat the frame as read-only: writes
+        would land in the series arrays shared with other consumers.
+        """
+        data = self.columns()
+        data["time"] = self.datetimes()
+        return pd.DataFrame(data, copy=False)
+
+    def to_csv(self) -> str:
+        """Serialise back to the MCP candle CSV layout (oldest row first, UTC offsets)."""
+        lines = [",".join(FIELDS)]
+        stamps = np.datetime_as_string(self.datetimes(), unit="s")
+        for index in range(len(self)):
+            prices = ",".join(repr(float(getattr(self, name)[index])) for name in PRICE_FIELDS)
+            counts = ",".join(str(int(getattr(self, name)[index])) for name in COUNT_FIELDS)
+            lines.append(f"{stamps[index].replace('T', ' ')}+00:00,{prices},{counts}")
+        return "\n".join(lines) + "\n"
+
+    def to_records(self) -> List[Dict[str, object]]:
+        """Row dictionaries for code that still iterates candles one by one."""
+        return self.to_pandas().to_dict("records")
+
+    def to_points(self, digits: int) -> "PointCandles":
+        """OHLC as integer points of ``10**-digits`` (see ``symbol_metadata``)."""
+        return PointCandles.from_prices(self.time, digits, *(getattr(self, name) for name in PRICE_FIELDS))
+
+
+class PointCandles:
+    """
+    OHLC stored as exact integer points, oldest bar first.
+
+    Each price column holds offsets from a shared int64 ``anchor`` (the lowest
+    low), as ``int32`` whenever the series range fits, so comparisons between
+    columns are exact integer comparisons and the arrays take half the
+    memory of float64 prices.
+    """
+
+    __slots__ = ("time", "digits", "anchor") + PRICE_FIELDS
+
+    def __init__(self, time: np.ndarray, digits: int, anchor: int, **offsets: np.ndarray) -> None:
+        self.time = time
+        self.digits = digits
+        self.anchor = anchor
+        for name in PRICE_FIELDS:
+            setattr(self, name, offsets[name])
+
+    @classmethod
+    def from_prices(
+        cls,
+        time: np.ndarray,
+        digits: int,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+    ) -> "PointCandles":
+        points = {name: to_points(values, digits) for name, values in zip(PRICE_FIELDS, (open, high, low, close))}
+        anchor = int(points["low"].min()) if points["low"].size else 0
+        span = max((int(values.max()) - anchor for values in points.values() if values.size), default=0)
+        dtype = np.int32 if span <= np.iinfo(np.int32).max else np.int64
+        offsets = {name: (values - anchor).astype(dtype) for name, values in points.items()}
+        return cls(np.asarray(time, dtype=np.int64), digits, anchor, **offsets)
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def points(self, name: str) -> np.ndarray:
+        """Absolute int64 points of one price column."""
+        return getattr(self, name).astype(np.int64) + self.anchor
+
+    def prices(self, name: str) -> np.ndarray:
+        return from_points(self.points(name), self.digits)
+
+    def to_series(self) -> CandleSeries:
+        return CandleSeries(self.time, *(self.prices(name) for name in PRICE_FIELDS))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in PRICE_FIELDS)
+
+
+def parse_candle_payloads(candles_data: Dict[str, str]) -> Dict[str, CandleSeries]:
+    """Parse every timeframe CSV of an MCP payload into ``CandleSeries``."""
+    return {timeframe: CandleSeries.from_csv(csv_data) for timeframe, csv_data in candles_data.items()}
+
+
+def _epoch_seconds(times: pd.Series) -> np.ndarray:
+    """Epoch seconds for a time column; MT5 strings skip ``pd.to_datetime``."""
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        try:
+            return parse_timestamps(times.astype(str).to_numpy())
+        except ValueError:
+            pass
+    converted = pd.to_datetime(times, utc=True)
+    return converted.dt.tz_convert(None).to_numpy().astype("datetime64[s]").view(np.int64)
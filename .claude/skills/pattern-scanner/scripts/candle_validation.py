@@ -0,0 +1,191 @@
+"""
+Vectorised bulk validation of candle payloads.
+
+``validate_timeframes`` concatenates the columns of every timeframe and runs
+each check once over the combined arrays, so a whole multi-timeframe payload
+is verified with a handful of NumPy passes instead of per-timeframe DataFrame
+work. Every bar gets a ``uint8`` bit mask of ``CandleIssue`` flags; those are
+OR-reduced into one compact mask per timeframe that the scanner can test
+before spending a scan-and-render cycle on bad data.
+
+Gaps that span a weekend (any interval containing a Saturday) are expected in
+FX data and are not flagged. Prices are compared with a tiny relative
+tolerance because MT5 floats are often one ulp off their 5-digit value.
+"""
+
+from __future__ import annotations
+
+import enum
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from candle_series import FIELDS, PRICE_FIELDS, CandleSeries, timeframe_seconds
+
+MIN_BARS = 50
+STALE_BARS = 3
+PRICE_RTOL = 1e-12
+
+_DAY = 86400
+# 1970-01-01 was a Thursday (weekday 3); Saturday is weekday 5.
+_SATURDAY = 5
+_EPOCH_WEEKDAY = 3
+
+
+class CandleIssue(enum.IntFlag):
+    NONE = 0
+    DUPLICATE_TIME = 1
+    NON_MONOTONIC = 2
+    GAP = 4
+    OHLC_INCONSISTENT = 8
+    BAD_PRICE = 16
+    STALE = 32
+    INSUFFICIENT = 64
+
+
+# Issues ``repair_series`` can fix; the rest describe the data source itself.
+REPAIRABLE = CandleIssue.DUPLICATE_TIME | CandleIssue.NON_MONOTONIC | CandleIssue.OHLC_INCONSISTENT | CandleIssue.BAD_PRICE
+# Issues that make a timeframe unusable for scanning even after repair.
+BLOCKING = CandleIssue.INSUFFICIENT
+
+
+class ValidationReport:
+    """Per-timeframe masks plus the per-bar flags they were reduced from."""
+
+    def __init__(self, masks: Dict[str, CandleIssue], row_flags: Dict[str, np.ndarray]) -> None:
+        self.masks = masks
+        self.row_flags = row_flags
+
+    def __getitem__(self, timeframe: str) -> CandleIssue:
+        return self.masks[timeframe]
+
+    def ok(self, timeframe: str) -> bool:
+        return self.masks[timeframe] == CandleIssue.NONE
+
+    def needs_repair(self, timeframe: str) -> bool:
+        return bool(self.masks[timeframe] & REPAIRABLE)
+
+    def usable(self, timeframe: str) -> bool:
+        return not self.masks[timeframe] & BLOCKING
+
+    def issue_counts(self, timeframe: str) -> Dict[str, int]:
+        flags = self.row_flags[timeframe]
+        return {
+            issue.name.lower(): int(np.count_nonzero(flags & issue))
+            for issue in CandleIssue
+            if issue and issue.value < CandleIssue.STALE and np.any(flags & issue)
+        }
+
+    def describe(self, timeframe: str) -> str:
+        mask = self.masks[timeframe]
+        if not mask:
+            return "ok"
+        counts = self.issue_counts(timeframe)
+        parts = []
+        for issue in CandleIssue:
+            if issue and mask & issue:
+                name = issue.name.lower()
+                parts.append(f"{name}={counts[name]}" if name in counts else name)
+        return ", ".join(parts)
+
+
+def validate_timeframes(
+    series_by_timeframe: Mapping[str, CandleSeries],
+    now: Optional[int] = None,
+    min_bars: int = MIN_BARS,
+    stale_bars: int = STALE_BARS,
+) -> ValidationReport:
+    """
+    Validate every timeframe in one pass over the concatenated columns.
+
+    Series are checked in the order given (they are expected ascending).
+    ``now`` (epoch seconds on the bars' broker clock, see
+    ``candle_series.broker_now``) enables the stale-last-bar check; leave it
+    ``None`` for offline samples and archives.
+    """
+    names: List[str] = list(series_by_timeframe)
+    sizes = np.array([len(series_by_timeframe[tf]) for tf in names], dtype=np.int64)
+    periods = np.array([timeframe_seconds(tf) for tf in names], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    total = int(offsets[-1])
+
+    flags = np.zeros(total, dtype=np.uint8)
+    if total:
+        columns = {
+            name: np.concatenate([getattr(series_by_timeframe[tf], name) for tf in names])
+            for name in ("time",) + PRICE_FIELDS
+        }
+        time = columns["time"]
+        period = np.repeat(periods, sizes)
+        starts = offsets[:-1][sizes > 0]
+
+        step = np.empty(total, dtype=np.int64)
+        step[0] = 0
+        np.subtract(time[1:], time[:-1], out=step[1:])
+        step[starts] = period[starts]  # first bar of each timeframe has no predecessor
+        flags |= _flag(step == 0, CandleIssue.DUPLICATE_TIME)
+        flags |= _flag(step < 0, CandleIssue.NON_MONOTONIC)
+        gap = step > period
+        if gap.any():
+            rows = np.flatnonzero(gap)
+            gap[rows[_spans_weekend(time[rows] - step[rows], time[rows])]] = False
+            flags |= _flag(gap, CandleIssue.GAP)
+
+        open_, high, low, close = (columns[name] for name in PRICE_FIELDS)
+        body_top = np.maximum(open_, close)
+        body_bottom = np.minimum(open_, close)
+        tolerance = np.abs(body_top) * PRICE_RTOL
+        inconsistent = (high < body_top - tolerance) | (low > body_bottom + tolerance) | (high < low)
+        flags |= _flag(inconsistent, CandleIssue.OHLC_INCONSISTENT)
+        bad = ~np.isfinite(open_ + high + low + close) | (np.minimum(body_bottom, low) <= 0)
+        flags |= _flag(bad, CandleIssue.BAD_PRICE)
+
+    masks: Dict[str, CandleIssue] = {}
+    row_flags: Dict[str, np.ndarray] = {}
+    for index, timeframe in enumerate(names):
+        segment = flags[offsets[index] : offsets[index + 1]]
+        row_flags[timeframe] = segment
+        mask = CandleIssue(int(np.bitwise_or.reduce(segment))) if segment.shape[0] else CandleIssue.NONE
+        if sizes[index] < min_bars:
+            mask |= CandleIssue.INSUFFICIENT
+        if now is not None and sizes[index]:
+            last = int(series_by_timeframe[timeframe].time.max())
+            deadline = last + periods[index] * (stale_bars + 1)
+            if now > deadline and not _spans_weekend(np.array([last]), np.array([now]))[0]:
+                mask |= CandleIssue.STALE
+        masks[timeframe] = mask
+    return ValidationReport(masks, row_flags)
+
+
+def repair_series(series: CandleSeries) -> CandleSeries:
+    """
+    Fix the ``REPAIRABLE`` issues of one series.
+
+    Bars are sorted by time, duplicate times keep their last copy, bars with
+    non-finite or non-positive prices are dropped and high/low are widened to
+    cover open and close. Gaps and staleness cannot be repaired here.
+    """
+    if series.is_empty:
+        return series
+    order = np.argsort(series.time, kind="stable")
+    columns = {name: getattr(series, name)[order] for name in FIELDS}
+    keep = np.ones(len(series), dtype=bool)
+    keep[:-1] = columns["time"][1:] != columns["time"][:-1]
+    prices = np.stack([columns[name] for name in PRICE_FIELDS])
+    keep &= np.isfinite(prices).all(axis=0) & (prices > 0).all(axis=0)
+    columns = {name: values[keep] for name, values in columns.items()}
+    columns["high"] = np.maximum.reduce([columns[name] for name in PRICE_FIELDS])
+    columns["low"] = np.minimum.reduce([columns[name] for name in PRICE_FIELDS])
+    return CandleSeries(**columns)
+
+
+def _flag(condition: np.ndarray, issue: CandleIssue) -> np.ndarray:
+    return condition.view(np.uint8) * np.uint8(issue)
+
+
+def _spans_weekend(before: np.ndarray, after: np.ndarray) -> np.ndarray:
+    """True where the interval ``[before, after]`` contains part of a Saturday."""
+    day = before // _DAY
+    weekday = (day + _EPOCH_WEEKDAY) % 7
+    next_saturday = (day + (_SATURDAY - weekday) % 7) * _DAY
+    return (next_saturday <= after) & (after - before <= 4 * _DAY)
@@ -0,0 +1,167 @@
+"""
+Memory-mapped binary history archive for multi-year candle data.
+
+Layout of a ``.tsa`` file (all little-endian)::
+
+    header   128 bytes  magic, version, record count, index stride, symbol, timeframe
+    index    int64[k]   time of every ``index_stride``-th bar (sparse time index)
+    columns  8 x n      time, open, high, low, close, tick_volume, spread, real_volume
+
+Columns are stored one after another so each one is a contiguous block of the
+file: ``HistoryArchive.slice`` maps the file with ``numpy.memmap`` and returns
+``CandleSeries`` views over the requested date range without copying. The
+sparse index keeps range lookups to a couple of page touches even for
+millions of bars.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from candle_series import FIELDS, CandleSeries
+from mcp_csv import parse_mcp_csv
+
+MAGIC = b"TSARCH01"
+VERSION = 1
+HEADER_SIZE = 128
+DEFAULT_INDEX_STRIDE = 4096
+ARCHIVE_SUFFIX = ".tsa"
+
+_HEADER = struct.Struct("<8sIIqq16s8s")
+_COLUMN_DTYPES = {name: np.dtype("<i8") for name in FIELDS}
+_COLUMN_DTYPES.update({name: np.dtype("<f8") for name in ("open", "high", "low", "close")})
+
+
+def archive_path(directory: Path | str, symbol: str, timeframe: str) -> Path:
+    return Path(directory) / f"{symbol.upper()}_{timeframe.upper()}{ARCHIVE_SUFFIX}"
+
+
+def write_archive(
+    path: Path | str,
+    symbol: str,
+    timeframe: str,
+    series: CandleSeries,
+    index_stride: int = DEFAULT_INDEX_STRIDE,
+) -> Path:
+    """Write ``series`` (ascending, unique times) as a new archive file."""
+    if len(series) > 1 and not (np.diff(series.time) > 0).all():
+        raise ValueError("Archive input must be strictly ascending in time.")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index = series.time[::index_stride]
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        index_stride,
+        len(series),
+        index.shape[0],
+        symbol.upper().encode("ascii")[:16],
+        timeframe.upper().encode("ascii")[:8],
+    )
+    with path.open("wb") as handle:
+        handle.write(header.ljust(HEADER_SIZE, b"\0"))
+        index.astype("<i8").tofile(handle)
+        for name in FIELDS:
+            getattr(series, name).astype(_COLUMN_DTYPES[name], copy=False).tofile(handle)
+    return path
+
+
+class HistoryArchive:
+    """Read-only, memory-mapped view of one ``.tsa`` archive."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            raw = handle.read(HEADER_SIZE)
+        if len(raw) < HEADER_SIZE or raw[:8] != MAGIC:
+            raise ValueError(f"{self.path} is not a history archive.")
+        _, version, stride, count, index_count, symbol, timeframe = _HEADER.unpack(raw[: _HEADER.size])
+        if version != VERSION:
+            raise ValueError(f"Unsupported archive version {version} in {self.path}.")
+        self.symbol = symbol.rstrip(b"\0").decode("ascii")
+        self.timeframe = timeframe.rstrip(b"\0").decode("ascii")
+        self.index_stride = int(stride)
+        self.count = int(count)
+
+        offset = HEADER_SIZE
+        self.index = self._map(np.dtype("<i8"), offset, int(index_count))
+        offset += int(index_count) * 8
+        self._columns: Dict[str, np.ndarray] = {}
+        for name in FIELDS:
+            self._columns[name] = self._map(_COLUMN_DTYPES[name], offset, self.count)
+            offset += self.count * 8
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"HistoryArchive({self.symbol} {self.timeframe}, {self.count} bars)"
+
+    @property
+    def time_range(self) -> Tuple[Optional[int], Optional[int]]:
+        if not self.count:
+            return None, None
+        return int(self._columns["time"][0]), int(self._columns["time"][-1])
+
+    def locate(self, timestamp: int, side: str = "left") -> int:
+        """Bar position for ``timestamp`` (``np.searchsorted`` semantics) via the sparse index."""
+        block = int(np.searchsorted(self.index, timestamp, side="right")) - 1
+        if block < 0:
+            return 0
+        start = block * self.index_stride
+        stop = min(self.count, start + self.index_stride + 1)
+        return start + int(np.searchsorted(self._columns["time"][start:stop], timestamp, side=side))
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> CandleSeries:
+        """Bars with ``start <= time < end`` (epoch seconds) as a zero-copy series."""
+        first = 0 if start is None else self.locate(start, "left")
+        last = self.count if end is None else self.locate(end, "left")
+        return self._series(first, max(first, last))
+
+    def tail(self, count: int) -> CandleSeries:
+        return self._series(max(0, self.count - count), self.count)
+
+    def _series(self, first: int, last: int) -> CandleSeries:
+        return CandleSeries(*(self._columns[name][first:last] for name in FIELDS))
+
+    def _map(self, dtype: np.dtype, offset: int, length: int) -> np.ndarray:
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=(length,))
+
+
+def archive_from_csv(
+    csv_data: str,
+    directory: Path | str,
+    symbol: str,
+    timeframe: str,
+) -> Path:
+    """Convert one MCP candle CSV payload into an archive."""
+    series = parse_mcp_csv(csv_data)
+    return write_archive(archive_path(directory, symbol, timeframe), symbol, timeframe, _deduplicated(series))
+
+
+def archive_from_sample_json(sample_path: Path | str, directory: Path | str, symbol: str) -> List[Path]:
+    """Convert a ``--sample-data`` JSON file (one CSV per timeframe) into archives."""
+    payload = json.loads(Path(sample_path).read_text(encoding="utf-8"))
+    candles = payload["candles"] if isinstance(payload, dict) and "candles" in payload else payload
+    return [
+        archive_from_csv(csv_data, directory, symbol, timeframe)
+        for timeframe, csv_data in candles.items()
+        if csv_data
+    ]
+
+
+def _deduplicated(series: CandleSeries) -> CandleSeries:
+    if len(series) < 2:
+        return series
+    keep = np.ones(len(series), dtype=bool)
+    keep[:-1] = series.time[1:] != series.time[:-1]  # keep the last copy of a bar
+    if keep.all():
+        return series
+    return CandleSeries(*(getattr(series, name)[keep] for name in FIELDS))
@@ -0,0 +1,136 @@
+"""
+Sorted interval index over a symbol's support/resistance levels across timeframes.
+
+Confluence scoring and the report's S/R table both ask "which levels are
+within X pips of this price?" for every pattern on every timeframe. Scanning
+each timeframe's level lists per pattern is O(patterns x levels); with
+zone-based levels on four timeframes that adds up. ``LevelIndex`` flattens
+all timeframes into one list of intervals sorted by their low bound (plain
+levels are zero-width intervals). Zones are narrow, so every interval
+overlapping ``[price - X, price + X]`` starts within
+``[price - X - widest, price + X]``: two ``bisect`` calls bound the
+candidates and a proximity query costs O(log n + matches).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+SIDES = ("support", "resistance")
+
+
+class Level(NamedTuple):
+    low: float
+    high: float
+    center: float
+    timeframe: str
+    side: str
+    touches: Optional[int] = None
+    weight: Optional[float] = None
+
+
+class LevelIndex:
+    """
+    Support/resistance intervals of one symbol, all timeframes, sorted by ``low``.
+
+    ``levels_by_timeframe`` is the scanner's ``support_resistance`` shape:
+    ``support``/``resistance`` price lists per timeframe, or the detailed
+    ``zones`` dicts of ``SRZoneEngine.levels`` (with ``low``/``high`` bounds
+    and ``side``) when present. Distances are reported in pips of ``pip_size``.
+    """
+
+    def __init__(self, levels_by_timeframe: Mapping[str, Mapping[str, Any]], pip_size: float) -> None:
+        self.pip_size = float(pip_size)
+        levels: List[Level] = []
+        for timeframe, levels_dict in levels_by_timeframe.items():
+            levels.extend(_levels_of(timeframe, levels_dict or {}))
+        levels.sort(key=lambda level: (level.low, level.high, level.timeframe))
+        self.levels = levels
+        self._lows = [level.low for level in levels]
+        self._widest = max((level.high - level.low for level in levels), default=0.0)
+        by_center = sorted(levels, key=lambda level: level.center)
+        self._by_center = by_center
+        self._centers = [level.center for level in by_center]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __repr__(self) -> str:
+        return f"LevelIndex({len(self.levels)} levels)"
+
+    def distance_pips(self, level: Level, price: float) -> float:
+        """Pips from ``price`` to the interval (0 inside it)."""
+        gap = max(level.low - price, price - level.high, 0.0)
+        return gap / self.pip_size
+
+    def within(self, price: float, pips: float, side: Optional[str] = None) -> List[Level]:
+        """Levels whose interval comes within ``pips`` of ``price``, nearest first."""
+        reach = pips * self.pip_size
+        start = bisect_left(self._lows, price - reach - self._widest)
+        end = bisect_right(self._lows, price + reach)
+        found = [
+            level
+            for level in self.levels[start:end]
+            if level.high >= price - reach and (side is None or level.side == side)
+        ]
+        return sorted(found, key=lambda level: (self.distance_pips(level, price), level.timeframe))
+
+    def nearest(self, price: float, side: str) -> Optional[Level]:
+        """Closest level centre below (``support``) or above (``resistance``) ``price``."""
+        if side == "support":
+            position = bisect_left(self._centers, price)
+            return self._by_center[position - 1] if position else None
+        if side == "resistance":
+            position = bisect_right(self._centers, price)
+            return self._by_center[position] if position < len(self._centers) else None
+        raise ValueError(f"Unknown side {side!r}; expected 'support' or 'resistance'.")
+
+    def proximity(self, price: float, pips: float) -> Dict[str, Any]:
+        """What confluence scoring needs for one price: nearby levels and whether each side is close."""
+        nearby = self.within(price, pips)
+        return {
+            "near_support": any(level.side == "support" for level in nearby),
+            "near_resistance": any(level.side == "resistance" for level in nearby),
+            "near_levels": [self._row(level, price) for level in nearby],
+        }
+
+    def annotate(self, patterns: Iterable[Dict[str, Any]], pips: float) -> List[Dict[str, Any]]:
+        """Copies of pattern dicts with ``proximity`` of their price (all timeframes' levels)."""
+        return [dict(pattern, **self.proximity(float(pattern["price"]), pips)) for pattern in patterns]
+
+    def annotate_by_timeframe(
+        self, patterns_by_timeframe: Dict[str, List[Dict[str, Any]]], pips: float
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        return {timeframe: self.annotate(patterns or [], pips) for timeframe, patterns in patterns_by_timeframe.items()}
+
+    def rows(self, price: float) -> List[Dict[str, Any]]:
+        """S/R table rows: every level from highest to lowest with its distance to ``price``."""
+        return [self._row(level, price) for level in reversed(self._by_center)]
+
+    def _row(self, level: Level, price: float) -> Dict[str, Any]:
+        row = level._asdict()
+        row["distance_pips"] = round(self.distance_pips(level, price), 1)
+        return row
+
+
+def _levels_of(timeframe: str, levels_dict: Mapping[str, Any]) -> List[Level]:
+    zones = levels_dict.get("zones")
+    if zones:
+        return [
+            Level(
+                float(zone["low"]),
+                float(zone["high"]),
+                float(zone["center"]),
+                timeframe,
+                zone["side"],
+                zone.get("touches"),
+                zone.get("weight"),
+            )
+            for zone in zones
+        ]
+    return [
+        Level(float(price), float(price), float(price), timeframe, side)
+        for side in SIDES
+        for price in levels_dict.get(side) or []
+    ]
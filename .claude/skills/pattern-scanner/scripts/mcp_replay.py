@@ -0,0 +1,182 @@
+"""
+Local stand-in for the MetaTrader MCP server.
+
+Serves recorded candle payloads over TCP using the JSON-lines request format
+``async_connector`` speaks::
+
+    -> {"id": 1, "method": "get_candles_latest", "params": {"symbol": "EURUSD", "timeframe": "H1", "count": 250}}
+    <- {"id": 1, "result": "time,open,high,..."}
+    -> {"id": 2, "method": "get_symbol_price", "params": {"symbol": "EURUSD"}}
+    <- {"id": 2, "result": {"bid": 1.0849, "ask": 1.0849}}
+    -> {"id": 3, "method": "get_symbol_prices", "params": {"symbols": ["EURUSD", "GBPUSD"]}}
+    <- {"id": 3, "result": {"EURUSD": {"bid": ...}, "GBPUSD": {"bid": ...}}}
+    <- {"id": 4, "error": {"code": -32601, "message": "Unknown method 'get_ticks'"}}
+
+Errors carry JSON-RPC codes: ``-32601`` for methods the server does not
+implement (``methods`` restricts them, to stand in for older bridges),
+``-32602`` for unknown symbols, timeframes or bad parameters.
+
+Every response is delayed by ``latency`` seconds (plus up to ``jitter``) so
+connector throughput can be measured without a broker. Recordings use the
+``--sample-data`` JSON layout, one ``SYMBOL.json`` per symbol.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from candle_series import CandleSeries, timeframe_seconds
+
+METHODS = ("get_candles_latest", "get_symbol_price", "get_symbol_prices")
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class RecordedPayloads:
+    """Parsed recordings keyed by symbol and timeframe."""
+
+    def __init__(self, series: Dict[str, Dict[str, CandleSeries]]) -> None:
+        self.series = {symbol.upper(): {tf.upper(): s for tf, s in by_tf.items()} for symbol, by_tf in series.items()}
+        self._rendered: Dict[Tuple[str, str, int], str] = {}
+
+    @classmethod
+    def from_candles(cls, candles_by_symbol: Dict[str, Dict[str, str]]) -> "RecordedPayloads":
+        return cls(
+            {
+                symbol: {tf: CandleSeries.from_csv(csv_data) for tf, csv_data in candles.items() if csv_data}
+                for symbol, candles in candles_by_symbol.items()
+            }
+        )
+
+    @classmethod
+    def from_directory(cls, directory: Path | str) -> "RecordedPayloads":
+        candles_by_symbol: Dict[str, Dict[str, str]] = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            candles_by_symbol[path.stem] = payload["candles"] if "candles" in payload else payload
+        return cls.from_candles(candles_by_symbol)
+
+    def candles(self, symbol: str, timeframe: str, count: int) -> str:
+        key = (symbol.upper(), timeframe.upper(), count)
+        if key not in self._rendered:
+            series = self._lookup(symbol).get(timeframe.upper())
+            if series is None:
+                raise KeyError(f"No recording for {symbol} {timeframe}")
+            self._rendered[key] = series.tail(count).to_csv()
+        return self._rendered[key]
+
+    def price(self, symbol: str) -> Dict[str, float]:
+        recordings = self._lookup(symbol)
+        fastest = min(recordings, key=timeframe_seconds)
+        close = recordings[fastest].last_close()
+        return {"bid": close, "ask": close}
+
+    def _lookup(self, symbol: str) -> Dict[str, CandleSeries]:
+        try:
+            return self.series[symbol.upper()]
+        except KeyError as exc:
+            raise KeyError(f"No recording for {symbol}") from exc
+
+
+class ReplayServer:
+    """Asyncio TCP server answering connector requests from ``RecordedPayloads``."""
+
+    def __init__(
+        self,
+        payloads: RecordedPayloads,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+        methods: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.payloads = payloads
+        self.methods = set(METHODS if methods is None else methods) & set(METHODS)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.Server] = None
+        self._background: Optional[Tuple[asyncio.AbstractEventLoop, threading.Thread]] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        address = self._server.sockets[0].getsockname()
+        return address[0], address[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            raise RuntimeError("Server not started.")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def start_background(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """Serve from a daemon thread (tests, benchmarks); returns the bound address."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="mcp-replay", daemon=True)
+        thread.start()
+        self._background = (loop, thread)
+        return asyncio.run_coroutine_threadsafe(self.start(host, port), loop).result()
+
+    def stop_background(self) -> None:
+        if self._background is None:
+            return
+        loop, thread = self._background
+        asyncio.run_coroutine_threadsafe(self.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        self._background = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                self.requests += 1
+                delay = self.latency + self._random.uniform(0.0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(json.dumps(self._answer(request), separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled by close(); ending quietly keeps asyncio from logging the handler task.
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        params = request.get("params") or {}
+        if method not in self.methods:
+            message = f"Unknown method {method!r}"
+            return {"id": request.get("id"), "error": {"code": METHOD_NOT_FOUND, "message": message}}
+        try:
+            if method == "get_candles_latest":
+                result: Any = self.payloads.candles(params["symbol"], params["timeframe"], int(params.get("count", 250)))
+            elif method == "get_symbol_price":
+                result = self.payloads.price(params["symbol"])
+            elif method == "get_symbol_prices":
+                result = {symbol: self.payloads.price(symbol) for symbol in params["symbols"]}
+        except (KeyError, ValueError) as exc:
+            message = str(exc.args[0] if exc.args else exc)
+            return {"id": request.get("id"), "error": {"code": INVALID_PARAMS, "message": message}}
+        return {"id": request.get("id"), "result": result}
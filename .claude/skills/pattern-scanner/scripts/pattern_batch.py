@@ -0,0 +1,206 @@
+"""
+Cross-symbol candlestick pattern detection over stacked 2-D blocks.
+
+Scanning symbols one at a time pays the per-call Python overhead (feature
+arrays, one NumPy call per rule) once per symbol. ``pattern_masks`` already
+works along the last axis, so a ``(symbols, bars)`` block of one timeframe is
+evaluated for every symbol in the same handful of array operations.
+
+``CandleBlock.stack`` right-aligns histories of different lengths (newest
+bar in the last column) and remembers where each row's real data starts;
+``batch_masks`` clears padded columns and bars without enough history, and
+``batch_patterns`` turns one ``np.nonzero`` over the stacked masks into
+per-symbol pattern lists identical to ``pattern_kernel.find_patterns`` on
+each series.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from candle_series import PRICE_FIELDS, CandleSeries
+from pattern_dsl import PatternProgram
+from pattern_kernel import BUILTIN, lookback, pattern_masks
+from symbol_metadata import get_symbol_info, to_points
+
+
+class CandleBlock:
+    """Right-aligned time/OHLC matrices of one timeframe; ``start[i]`` is row ``i``'s first real column."""
+
+    __slots__ = ("symbols", "time", "open", "high", "low", "close", "start")
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        time: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        start: np.ndarray,
+    ) -> None:
+        self.symbols = list(symbols)
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.start = start
+
+    @classmethod
+    def stack(cls, series_by_symbol: Mapping[str, Any], bars: Optional[int] = None) -> "CandleBlock":
+        """Stack the last ``bars`` bars (all when None) of each series; shorter rows are NaN-padded on the left."""
+        symbols = list(series_by_symbol)
+        lengths = [len(series_by_symbol[symbol].close) for symbol in symbols]
+        width = max(lengths, default=0)
+        if bars is not None:
+            width = min(width, max(bars, 0))
+        shape = (len(symbols), width)
+        time = np.zeros(shape, dtype=np.int64)
+        prices = {name: np.full(shape, np.nan) for name in PRICE_FIELDS}
+        start = np.empty(len(symbols), dtype=np.int64)
+        for row, (symbol, length) in enumerate(zip(symbols, lengths)):
+            series = series_by_symbol[symbol]
+            count = min(length, width)
+            start[row] = width - count
+            if not count:
+                continue
+            time[row, width - count :] = series.time[length - count :]
+            for name in PRICE_FIELDS:
+                prices[name][row, width - count :] = getattr(series, name)[length - count :]
+        return cls(symbols, time, start=start, **prices)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __repr__(self) -> str:
+        return f"CandleBlock({len(self.symbols)} symbols x {self.width} bars)"
+
+    @property
+    def width(self) -> int:
+        return int(self.time.shape[1]) if self.time.ndim == 2 else 0
+
+    def columns(self, first: int) -> "CandleBlock":
+        """The block from column ``first`` on (row starts shifted to match)."""
+        return CandleBlock(
+            self.symbols,
+            self.time[:, first:],
+            self.open[:, first:],
+            self.high[:, first:],
+            self.low[:, first:],
+            self.close[:, first:],
+            np.maximum(self.start - first, 0),
+        )
+
+    def series(self, symbol: str) -> CandleSeries:
+        """One row without its padding."""
+        row = self.symbols.index(symbol)
+        first = int(self.start[row])
+        return CandleSeries(*(getattr(self, name)[row, first:] for name in ("time",) + PRICE_FIELDS))
+
+
+def batch_masks(
+    block: CandleBlock,
+    names: Optional[Iterable[str]] = None,
+    digits: Optional[Sequence[int]] = None,
+    program: Optional[PatternProgram] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    ``(symbols, bars)`` mask per pattern for every row at once.
+
+    ``digits`` (one per row) compares integer points like ``detect_masks``.
+    Padded columns, and the first ``bars - 1`` real bars of a multi-bar
+    pattern, are always False.
+    """
+    program = program or BUILTIN
+    columns = [getattr(block, name) for name in PRICE_FIELDS]
+    if digits is not None:
+        scale = np.asarray(digits, dtype=np.int64)[:, None]
+        columns = [to_points(np.nan_to_num(values), scale) for values in columns]
+    masks = pattern_masks(*columns, names=names, program=program)
+    position = np.arange(block.width)
+    for name, mask in masks.items():
+        mask &= position >= (block.start + (program.specs[name].bars - 1))[:, None]
+    return masks
+
+
+def batch_patterns(
+    block: CandleBlock,
+    bars: Optional[int] = None,
+    names: Optional[Iterable[str]] = None,
+    digits: Optional[Sequence[int]] = None,
+    program: Optional[PatternProgram] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Per-symbol pattern dicts completing on each row's last ``bars`` bars (all bars when None).
+
+    Every symbol gets a list (possibly empty), oldest first, in the same
+    shape and order as ``find_patterns`` on that symbol's series.
+    """
+    program = program or BUILTIN
+    first = 0
+    if bars is not None:
+        if bars <= 0:
+            return {symbol: [] for symbol in block.symbols}
+        # Only the last ``bars`` columns and the bars their patterns look back over.
+        first = max(block.width - bars - (lookback(program) - 1), 0)
+        block = block.columns(first) if first else block
+    masks = batch_masks(block, names, digits, program)
+    result: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in block.symbols}
+    if not masks:
+        return result
+
+    pattern_names = list(masks)
+    offset = 0 if bars is None else max(block.width - bars, 0)
+    kinds, rows, columns = np.nonzero(np.stack(list(masks.values()))[:, :, offset:])
+    columns += offset
+    order = np.lexsort((kinds, columns, rows))
+    kinds, rows, columns = kinds[order], rows[order], columns[order]
+    if not kinds.size:
+        return result
+
+    stamps = np.char.replace(np.datetime_as_string(block.time[rows, columns].astype("datetime64[s]"), unit="s"), "T", " ")
+    prices = block.close[rows, columns].tolist()
+    specs = [program.specs[name] for name in pattern_names]
+    for kind, row, stamp, price in zip(kinds.tolist(), rows.tolist(), stamps.tolist(), prices):
+        spec = specs[kind]
+        result[block.symbols[row]].append(
+            {
+                "name": spec.name,
+                "type": spec.type,
+                "strength": spec.strength,
+                "bias": spec.bias,
+                "reliability": spec.reliability,
+                "price": price,
+                "time": stamp,
+            }
+        )
+    return result
+
+
+def batch_detect(
+    series_by_symbol: Mapping[str, Any],
+    bars: Optional[int] = 1,
+    names: Optional[Iterable[str]] = None,
+    use_points: bool = True,
+    program: Optional[PatternProgram] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Patterns on the last ``bars`` bars of many symbols of one timeframe (``bars=None``: full history).
+
+    Only the columns those bars need are stacked. With ``use_points`` each
+    symbol is compared in integer points of its quote precision.
+    """
+    program = program or BUILTIN
+    width = None if bars is None else max(bars, 0) + lookback(program) - 1
+    block = CandleBlock.stack(series_by_symbol, width)
+    digits = None
+    if use_points:
+        # Each row's quotes widen the name-based guess for symbols the registry does not know.
+        digits = [
+            get_symbol_info(symbol, row[first:]).digits
+            for symbol, row, first in zip(block.symbols, block.close, block.start.tolist())
+        ]
+    return batch_patterns(block, bars, names, digits, program)
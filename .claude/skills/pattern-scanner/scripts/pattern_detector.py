@@ -0,0 +1,229 @@
+"""
+Incremental candlestick pattern detection for recurring scans.
+
+Between two scans almost every bar is unchanged, so rerunning detection over
+the whole history repeats work whose answer is already known. A pattern only
+depends on the bar that completes it and the few bars before it (at most
+``MAX_PATTERN_BARS - 1`` for the built-ins), so ``PatternDetector`` keeps just
+that window per symbol and timeframe. Each newly closed bar is evaluated against the window (constant
+work per bar, the same ``pattern_kernel`` rules) and only the patterns it
+completes are emitted.
+
+Bars at or before the last one seen are ignored: MT5 never revises closed
+bars, and the payload's in-progress bar should not be fed in. ``state()`` is
+plain JSON, so ``save``/``load`` let a restarted process resume where it
+stopped instead of rescanning history.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from bar_builder import ClosedBar, StreamingBarBuilder
+from candle_series import PRICE_FIELDS, CandleSeries
+from pattern_dsl import PatternProgram
+from pattern_kernel import BUILTIN, find_patterns, lookback, pattern_masks
+from symbol_metadata import get_symbol_info, to_points
+
+STATE_VERSION = 1
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+_COLUMNS = ("time",) + PRICE_FIELDS
+
+
+class _Window:
+    """Time and OHLC arrays of the last bars of one symbol/timeframe, oldest first."""
+
+    __slots__ = _COLUMNS
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        self.time = np.asarray(columns["time"], dtype=np.int64)
+        for name in PRICE_FIELDS:
+            setattr(self, name, np.asarray(columns[name], dtype=np.float64))
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def __getitem__(self, key: slice) -> "_Window":
+        return _Window({name: getattr(self, name)[key] for name in _COLUMNS})
+
+    def extended(self, other: Any) -> "_Window":
+        return _Window({name: np.concatenate([getattr(self, name), getattr(other, name)]) for name in _COLUMNS})
+
+    def to_json(self) -> Dict[str, List[float]]:
+        return {name: getattr(self, name).tolist() for name in _COLUMNS}
+
+
+class PatternDetector:
+    """
+    Stateful per symbol/timeframe detector emitting only newly completed patterns.
+
+    Events are the ``pattern_kernel`` pattern dicts plus ``symbol`` and
+    ``timeframe``. Prices are compared as integer points of the symbol's
+    quote precision (``symbol_metadata``) unless ``use_points`` is False.
+    ``program`` swaps in a compiled ``pattern_dsl`` pattern set; the window
+    then spans its longest pattern.
+    """
+
+    def __init__(
+        self,
+        names: Optional[Iterable[str]] = None,
+        use_points: bool = True,
+        backfill: int = 1,
+        on_event: Optional[EventCallback] = None,
+        program: Optional[PatternProgram] = None,
+    ) -> None:
+        self.program = program or BUILTIN
+        self.names = list(self.program.specs) if names is None else list(names)
+        unknown = [name for name in self.names if name not in self.program]
+        if unknown:
+            raise KeyError(f"Unknown patterns: {unknown}")
+        self.window_bars = lookback(self.program)
+        self.use_points = use_points
+        self.backfill = backfill
+        self.on_event = on_event
+        self.bars_evaluated = 0
+        self.bars_skipped = 0
+        self.events_emitted = 0
+        self._windows: Dict[str, _Window] = {}
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        window = self._windows.get(_key(symbol, timeframe))
+        return None if window is None else int(window.time[-1])
+
+    def update(
+        self,
+        symbol: str,
+        timeframe: str,
+        time: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+    ) -> List[Dict[str, Any]]:
+        """Feed one closed bar; returns the patterns it completes."""
+        bar = _Window({"time": [time], "open": [open], "high": [high], "low": [low], "close": [close]})
+        return self.update_series(symbol, timeframe, bar)
+
+    def update_series(self, symbol: str, timeframe: str, series: CandleSeries | _Window) -> List[Dict[str, Any]]:
+        """
+        Feed closed bars (any overlap with earlier calls is fine); returns new patterns.
+
+        Only bars after the last one seen are evaluated, in one vectorised pass.
+        The first time a stream is seen, events are emitted for its last
+        ``backfill`` bars only; older bars just fill the window.
+        """
+        key = _key(symbol, timeframe)
+        window = self._windows.get(key)
+        skip = 0 if window is None else int(np.searchsorted(series.time, window.time[-1], side="right"))
+        fresh = len(series) - skip
+        self.bars_skipped += skip
+        if fresh <= 0:
+            return []
+
+        new_bars = _Window({name: getattr(series, name)[skip:] for name in _COLUMNS})
+        combined = new_bars if window is None else window.extended(new_bars)
+        self._windows[key] = combined[-self.window_bars :]
+        self.bars_evaluated += fresh
+
+        first_new = len(combined) - fresh
+        if window is None:
+            first_new = max(first_new, len(combined) - self.backfill)
+        # Only the new bars and the bars they can look back over need evaluating.
+        start = max(first_new - (self.window_bars - 1), 0)
+        evaluated = combined[start:]
+        columns = [getattr(evaluated, name) for name in PRICE_FIELDS]
+        if self.use_points:
+            digits = get_symbol_info(symbol, columns[-1]).digits
+            columns = [to_points(values, digits) for values in columns]
+        masks = pattern_masks(*columns, names=self.names, program=self.program)
+
+        # Within the evaluated slice, bars before ``first_new`` were already reported.
+        events = find_patterns(evaluated, start=first_new - start, masks=masks, program=self.program)
+        for event in events:
+            event["symbol"] = symbol.upper()
+            event["timeframe"] = timeframe.upper()
+            if self.on_event:
+                self.on_event(event)
+        self.events_emitted += len(events)
+        return events
+
+    def attach(self, builder: StreamingBarBuilder, symbol: str) -> None:
+        """Evaluate every bar ``builder`` closes (``on_event`` receives the patterns)."""
+
+        def on_close(bar: ClosedBar) -> None:
+            self.update(symbol, bar.timeframe, bar.time, bar.open, bar.high, bar.low, bar.close)
+
+        builder.subscribe(on_close)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "streams": len(self._windows),
+            "bars_evaluated": self.bars_evaluated,
+            "bars_skipped": self.bars_skipped,
+            "events": self.events_emitted,
+        }
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serialisable snapshot of every stream's window (and of a custom pattern set)."""
+        state = {
+            "version": STATE_VERSION,
+            "names": self.names,
+            "use_points": self.use_points,
+            "streams": {key: window.to_json() for key, window in self._windows.items()},
+        }
+        if self.program is not BUILTIN:
+            state["definitions"] = list(self.program.definitions)
+        return state
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        backfill: int = 1,
+        on_event: Optional[EventCallback] = None,
+    ) -> "PatternDetector":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported detector state version: {state.get('version')!r}")
+        definitions = state.get("definitions")
+        program = PatternProgram(definitions) if definitions else None
+        detector = cls(state.get("names"), bool(state.get("use_points", True)), backfill, on_event, program)
+        detector._windows = {
+            key: _Window(columns) for key, columns in state.get("streams", {}).items() if columns["time"]
+        }
+        return detector
+
+    def save(self, path: Path | str) -> Path:
+        """Write ``state()`` atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_text(json.dumps(self.state(), separators=(",", ":")), encoding="utf-8")
+        os.replace(temp, path)
+        return path
+
+    @classmethod
+    def load(
+        cls,
+        path: Path | str,
+        names: Optional[Iterable[str]] = None,
+        use_points: bool = True,
+        backfill: int = 1,
+        on_event: Optional[EventCallback] = None,
+        program: Optional[PatternProgram] = None,
+    ) -> "PatternDetector":
+        """Restore a saved detector (its pattern set wins); a missing file gives a fresh one."""
+        path = Path(path)
+        if not path.exists():
+            return cls(names, use_points, backfill, on_event, program)
+        return cls.from_state(json.loads(path.read_text(encoding="utf-8")), backfill, on_event)
+
+
+def _key(symbol: str, timeframe: str) -> str:
+    return f"{symbol.upper()}|{timeframe.upper()}"
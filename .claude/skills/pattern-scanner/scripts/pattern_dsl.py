@@ -0,0 +1,374 @@
+"""
+Declarative candlestick pattern definitions compiled to vectorised masks.
+
+A pattern is a dict (or a YAML/JSON entry) whose ``when`` conditions are
+Python-syntax expressions over candle features, indexed by bars back from the
+bar that completes the pattern::
+
+    {
+        "name": "Morning Star",
+        "type": "Reversal", "strength": "Very Strong", "bias": "Bullish", "reliability": 78,
+        "params": {"star_ratio": 0.4},
+        "when": [
+            "bearish[2]",
+            "body[1] < body[2] * star_ratio",
+            "bullish and close > mid[2]",
+        ],
+    }
+
+Features: ``open high low close body upper lower range body_ratio body_top
+body_bottom mid bullish bearish`` (a bare name means offset 0). Expressions
+may use ``+ - * /``, comparisons (chained too), ``abs``, ``min`` and ``max``
+over numbers, numeric features and the pattern's ``params``, and ``and or
+not`` over conditions (comparisons, ``bullish``/``bearish``). Every ``when``
+entry must itself be a condition.
+
+``compile_patterns`` parses every condition with ``ast`` and emits one Python
+function for the whole pattern set. Each distinct sub-expression (``body[2]
+* 0.4``, ``bearish[1]``...) becomes a single NumPy operation shared by every
+pattern that uses it, so user-defined patterns cost what the built-ins cost
+and the whole set is evaluated in one pass.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class PatternSpec(NamedTuple):
+    name: str
+    type: str
+    strength: str
+    bias: str
+    reliability: int
+    bars: int
+
+
+class PatternDefinitionError(ValueError):
+    """Raised when a pattern definition cannot be compiled."""
+
+
+class CandleFeatures(NamedTuple):
+    """Per-bar geometry shared by every pattern rule."""
+
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    body: np.ndarray
+    upper: np.ndarray
+    lower: np.ndarray
+    range: np.ndarray
+    body_ratio: np.ndarray
+    body_top: np.ndarray
+    body_bottom: np.ndarray
+    mid: np.ndarray
+    bullish: np.ndarray
+    bearish: np.ndarray
+
+
+FEATURES = CandleFeatures._fields
+_BOOLEAN_FEATURES = ("bullish", "bearish")
+_FUNCTIONS = {"abs": "np.abs", "min": "np.minimum", "max": "np.maximum"}
+_BINARY = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+_COMPARE = {ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=", ast.Eq: "==", ast.NotEq: "!="}
+
+
+def candle_features(open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> CandleFeatures:
+    arrays = [np.asarray(values) for values in (open, high, low, close)]
+    if any(values.dtype.kind in "iu" for values in arrays):
+        arrays = [values.astype(np.int64) for values in arrays]
+    open, high, low, close = arrays
+    body_top = np.maximum(open, close)
+    body_bottom = np.minimum(open, close)
+    body = body_top - body_bottom
+    span = high - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Flat bars (high == low) count as ratio 0: a four-price doji.
+        body_ratio = np.where(span > 0, body / np.where(span > 0, span, 1), 0.0)
+    return CandleFeatures(
+        open=open,
+        high=high,
+        low=low,
+        close=close,
+        body=body,
+        upper=high - body_top,
+        lower=body_bottom - low,
+        range=span,
+        body_ratio=body_ratio,
+        body_top=body_top,
+        body_bottom=body_bottom,
+        mid=(open + close) / 2,
+        bullish=close > open,
+        bearish=close < open,
+    )
+
+
+def shift(values: np.ndarray, bars: int, fill: Any = 0) -> np.ndarray:
+    """``values`` delayed by ``bars`` along the last axis (``out[..., i] = values[..., i - bars]``)."""
+    if not bars:
+        return values
+    out = np.empty_like(values)
+    out[..., :bars] = fill
+    out[..., bars:] = values[..., : values.shape[-1] - bars]
+    return out
+
+
+class PatternProgram:
+    """
+    A compiled pattern set: ``evaluate`` returns one boolean mask per pattern.
+
+    Asking for a subset of ``names`` runs code generated for just those
+    patterns (compiled on first use and cached), so unused rules cost nothing.
+    """
+
+    def __init__(self, definitions: Sequence[Dict[str, Any]]) -> None:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for definition in definitions:
+            if not definition.get("name"):
+                raise PatternDefinitionError("Pattern definition without a name.")
+            merged[str(definition["name"])] = dict(definition)
+        self.definitions: Tuple[Dict[str, Any], ...] = tuple(merged.values())
+        self.specs, self.source, function = _generate(self.definitions)
+        self._compiled: Dict[Tuple[str, ...], Callable[..., List[np.ndarray]]] = {tuple(self.specs): function}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    def evaluate(
+        self,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Masks over the last axis; ``mask[..., i]`` is True when the pattern completes on bar ``i``."""
+        wanted = tuple(self.specs) if names is None else tuple(dict.fromkeys(names))
+        unknown = [name for name in wanted if name not in self.specs]
+        if unknown:
+            raise KeyError(f"Unknown patterns: {unknown}")
+        if not wanted:
+            return {}
+
+        features = candle_features(open, high, low, close)
+        cache: Dict[Tuple[str, int], np.ndarray] = {}
+
+        def feature(name: str, offset: int) -> np.ndarray:
+            key = (name, offset)
+            if key not in cache:
+                fill = False if name in _BOOLEAN_FEATURES else 0
+                cache[key] = shift(getattr(features, name), offset, fill)
+            return cache[key]
+
+        masks: Dict[str, np.ndarray] = {}
+        for name, values in zip(wanted, self._function(wanted)(feature, np)):
+            mask = np.array(np.broadcast_to(values, features.close.shape), dtype=bool)
+            # Bars without enough history cannot complete a multi-bar pattern.
+            mask[..., : self.specs[name].bars - 1] = False
+            masks[name] = mask
+        return masks
+
+    def extend(self, definitions: Sequence[Dict[str, Any]]) -> "PatternProgram":
+        """A new program with ``definitions`` added (a repeated name replaces the earlier pattern)."""
+        return PatternProgram(self.definitions + tuple(definitions))
+
+    def _function(self, names: Tuple[str, ...]) -> Callable[..., List[np.ndarray]]:
+        function = self._compiled.get(names)
+        if function is None:
+            chosen = {definition["name"]: definition for definition in self.definitions}
+            function = _generate([chosen[name] for name in names])[2]
+            self._compiled[names] = function
+        return function
+
+
+def compile_patterns(definitions: Sequence[Dict[str, Any]]) -> PatternProgram:
+    """Compile pattern definitions into a single fused ``PatternProgram``."""
+    return PatternProgram(definitions)
+
+
+def load_pattern_file(path: Path | str) -> List[Dict[str, Any]]:
+    """Pattern definitions from a ``.yaml``/``.yml`` (needs PyYAML) or ``.json`` file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise PatternDefinitionError("YAML pattern files need PyYAML (pip install pyyaml).") from exc
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("patterns", [])
+    if not isinstance(data, list):
+        raise PatternDefinitionError(f"{path}: expected a list of patterns or a 'patterns' key.")
+    return data
+
+
+def _generate(definitions: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, PatternSpec], str, Callable[..., List[np.ndarray]]]:
+    emitter = _Emitter()
+    specs: Dict[str, PatternSpec] = {}
+    outputs: List[str] = []
+    for definition in definitions:
+        name = str(definition["name"])
+        conditions = definition.get("when")
+        if isinstance(conditions, str):
+            conditions = [conditions]
+        if not conditions:
+            raise PatternDefinitionError(f"{name}: 'when' needs at least one condition.")
+        try:
+            params = {key: float(value) for key, value in (definition.get("params") or {}).items()}
+        except (TypeError, ValueError) as exc:
+            raise PatternDefinitionError(f"{name}: params must be numbers.") from exc
+        emitter.begin(name, params)
+        outputs.append(emitter.combine("&", [emitter.condition(_parse(name, condition)) for condition in conditions]))
+        specs[name] = PatternSpec(
+            name,
+            str(definition.get("type", "Reversal")),
+            str(definition.get("strength", "Medium")),
+            str(definition.get("bias", "Neutral")),
+            int(definition.get("reliability", 50)),
+            emitter.max_offset + 1,
+        )
+
+    lines = ["def _evaluate(feature, np):"]
+    lines += [f"    {line}" for line in emitter.lines]
+    lines.append(f"    return [{', '.join(outputs)}]")
+    source = "\n".join(lines) + "\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, "<pattern-dsl>", "exec"), namespace)
+    return specs, source, namespace["_evaluate"]
+
+
+def _parse(name: str, condition: str) -> ast.expr:
+    try:
+        return ast.parse(str(condition), mode="eval").body
+    except SyntaxError as exc:
+        raise PatternDefinitionError(f"{name}: cannot parse {condition!r}: {exc.msg}") from exc
+
+
+def _is_boolean(node: ast.expr) -> bool:
+    """Whether an expression evaluates to a boolean mask (comparisons, bias features, logic over them)."""
+    if isinstance(node, (ast.Compare, ast.BoolOp)):
+        return True
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return True
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    return isinstance(node, ast.Name) and node.id in _BOOLEAN_FEATURES
+
+
+class _Emitter:
+    """Turns condition ASTs into straight-line code, one temporary per distinct sub-expression."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self._known: Dict[str, str] = {}
+        self._pattern = ""
+        self._params: Dict[str, float] = {}
+        self.max_offset = 0
+
+    def begin(self, pattern: str, params: Dict[str, float]) -> None:
+        self._pattern = pattern
+        self._params = params
+        self.max_offset = 0
+
+    def condition(self, node: ast.expr) -> str:
+        """A top-level ``when`` entry: it must be a mask, or ``&`` would combine numbers."""
+        if not _is_boolean(node):
+            raise PatternDefinitionError(
+                f"{self._pattern}: condition {ast.unparse(node)!r} is not a comparison or bullish/bearish"
+            )
+        return self.expression(node)
+
+    def expression(self, node: ast.expr) -> str:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return repr(node.value)
+        if isinstance(node, ast.Name) and node.id in self._params:
+            return repr(self._params[node.id])
+        if isinstance(node, (ast.Name, ast.Subscript)):
+            feature, offset = self._feature(node)
+            self.max_offset = max(self.max_offset, offset)
+            return self._emit(f"feature({feature!r}, {offset})")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            self._require_number(node.operand, "-")
+            return self._emit(f"-{self.expression(node.operand)}")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            # ``~`` is only a logical negation on boolean masks.
+            self._require_boolean(node.operand, "not")
+            return self._emit(f"~{self.expression(node.operand)}")
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            self._require_number(node.left, _BINARY[type(node.op)])
+            self._require_number(node.right, _BINARY[type(node.op)])
+            left, right = self.expression(node.left), self.expression(node.right)
+            return self._emit(f"{left} {_BINARY[type(node.op)]} {right}")
+        if isinstance(node, ast.BoolOp):
+            operator = "&" if isinstance(node.op, ast.And) else "|"
+            for value in node.values:
+                self._require_boolean(value, "and" if operator == "&" else "or")
+            return self.combine(operator, [self.expression(value) for value in node.values])
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+            for operand, op in zip([node.left] + node.comparators, node.ops + node.ops[-1:]):
+                self._require_number(operand, _COMPARE[type(op)])
+            operands = [self.expression(node.left)] + [self.expression(value) for value in node.comparators]
+            terms = [
+                self._emit(f"{left} {_COMPARE[type(op)]} {right}")
+                for left, op, right in zip(operands, node.ops, operands[1:])
+            ]
+            return self.combine("&", terms)
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS
+            and not node.keywords
+            and len(node.args) == (1 if node.func.id == "abs" else 2)
+        ):
+            for argument in node.args:
+                self._require_number(argument, node.func.id)
+            arguments = ", ".join(self.expression(argument) for argument in node.args)
+            return self._emit(f"{_FUNCTIONS[node.func.id]}({arguments})")
+        raise PatternDefinitionError(f"{self._pattern}: unsupported expression {ast.unparse(node)!r}")
+
+    def combine(self, operator: str, terms: List[str]) -> str:
+        if len(terms) == 1:
+            return terms[0]
+        return self._emit(f" {operator} ".join(f"({term})" for term in terms))
+
+    def _require_boolean(self, node: ast.expr, operator: str) -> None:
+        if not _is_boolean(node):
+            raise PatternDefinitionError(
+                f"{self._pattern}: {operator!r} needs a condition, not {ast.unparse(node)!r}"
+            )
+
+    def _require_number(self, node: ast.expr, operator: str) -> None:
+        # ``bullish < 2`` or ``bearish + 1`` would silently compute on 0/1 masks.
+        if _is_boolean(node):
+            raise PatternDefinitionError(
+                f"{self._pattern}: {operator!r} needs a number, not the condition {ast.unparse(node)!r}"
+            )
+
+    def _feature(self, node: ast.expr) -> Tuple[str, int]:
+        offset = 0
+        if isinstance(node, ast.Subscript):
+            index = node.slice
+            if not (isinstance(index, ast.Constant) and isinstance(index.value, int) and index.value >= 0):
+                raise PatternDefinitionError(f"{self._pattern}: bar offsets must be integers >= 0 in {ast.unparse(node)!r}")
+            offset = index.value
+            node = node.value
+        if not isinstance(node, ast.Name) or node.id not in FEATURES:
+            raise PatternDefinitionError(f"{self._pattern}: unknown feature {ast.unparse(node)!r}")
+        return node.id, offset
+
+    def _emit(self, code: str) -> str:
+        variable = self._known.get(code)
+        if variable is None:
+            variable = f"_{len(self._known)}"
+            self._known[code] = variable
+            self.lines.append(f"{variable} = {code}")
+        return variable
@@ -0,0 +1,371 @@
+"""
+Persistent index of historical pattern occurrences.
+
+Questions such as "every H4 Bearish Engulfing on GBPUSD in the last two years
+that formed near resistance" should not rescan raw history. ``PatternIndex``
+keeps one compact record per occurrence (``RECORD_DTYPE``: 30 bytes with
+symbol, timeframe and pattern stored as small integer ids) in a single array
+sorted by time, plus two secondary indexes: record positions grouped by
+pattern and by symbol, each group still in time order. A query picks the most
+selective group list, bisects the time range inside each group and filters
+what is left with vectorised masks, so it touches only candidate records.
+
+S/R proximity is measured when a pattern is indexed: the distance in pips
+from the bar's high to the highest high of the previous ``sr_lookback`` bars
+(``resistance_pips``) and from the bar's low to the lowest low
+(``support_pips``). Negative values mean the bar pierced the level.
+
+``index_series`` only evaluates bars newer than the last one indexed for that
+symbol/timeframe, so rebuilding from archives or feeding closed bars
+(``attach``) is incremental. On disk an index is ``<name>.npy`` (records,
+memory-mapped on load) plus ``<name>.json`` (id tables and per-stream
+progress); the JSON is written last and is the commit point.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bar_builder import ClosedBar, StreamingBarBuilder
+from candle_series import PRICE_FIELDS, CandleSeries
+from pattern_dsl import PatternProgram
+from pattern_kernel import BUILTIN, detect_masks, lookback
+from symbol_metadata import get_symbol_info
+
+INDEX_VERSION = 1
+DEFAULT_SR_LOOKBACK = 50
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("price", "<f8"),
+        ("support_pips", "<f4"),
+        ("resistance_pips", "<f4"),
+        ("symbol", "<u2"),
+        ("timeframe", "<u2"),
+        ("pattern", "<u2"),
+    ]
+)
+
+SR_SIDES = ("support", "resistance")
+
+
+class _Group:
+    """Record positions grouped by one id column; time-ordered inside each group."""
+
+    __slots__ = ("positions", "times", "bounds")
+
+    def __init__(self, records: np.ndarray, field: str, size: int) -> None:
+        self.positions = np.argsort(records[field], kind="stable")
+        self.times = records["time"][self.positions]
+        self.bounds = np.searchsorted(records[field][self.positions], np.arange(size + 1))
+
+    def size(self, ids: np.ndarray) -> int:
+        return int((self.bounds[ids + 1] - self.bounds[ids]).sum())
+
+    def select(self, ids: np.ndarray, start: Optional[int], end: Optional[int]) -> np.ndarray:
+        parts = []
+        for key in ids.tolist():
+            lo, hi = int(self.bounds[key]), int(self.bounds[key + 1])
+            if start is not None:
+                lo += int(np.searchsorted(self.times[lo:hi], start, "left"))
+            if end is not None:
+                hi = lo + int(np.searchsorted(self.times[lo:hi], end, "left"))
+            parts.append(self.positions[lo:hi])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+
+class PatternIndex:
+    """Time-sorted occurrence records with pattern and symbol secondary indexes."""
+
+    def __init__(self, sr_lookback: int = DEFAULT_SR_LOOKBACK, program: Optional[PatternProgram] = None) -> None:
+        self.sr_lookback = sr_lookback
+        self.program = program or BUILTIN
+        self.symbols: List[str] = []
+        self.timeframes: List[str] = []
+        self.patterns: List[str] = list(self.program.specs)
+        self.streams: Dict[str, int] = {}
+        self._records = np.empty(0, dtype=RECORD_DTYPE)
+        self._pending: List[np.ndarray] = []
+        self._derived: Dict[str, Any] = {}  # time column and _Group lookups, rebuilt after changes
+
+    def __len__(self) -> int:
+        return int(self._records.shape[0]) + sum(int(chunk.shape[0]) for chunk in self._pending)
+
+    def __repr__(self) -> str:
+        return f"PatternIndex({len(self)} occurrences, {len(self.symbols)} symbols, {len(self.streams)} streams)"
+
+    @property
+    def records(self) -> np.ndarray:
+        """All records, ascending by time."""
+        self._consolidate()
+        return self._records
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        return self.streams.get(_key(symbol, timeframe))
+
+    def index_series(
+        self,
+        symbol: str,
+        timeframe: str,
+        series: CandleSeries,
+        digits: Optional[int] = None,
+    ) -> int:
+        """
+        Index every pattern completing on a bar newer than the last indexed one.
+
+        ``series`` can be the full history (e.g. a ``HistoryArchive`` slice):
+        only the unseen bars plus the context their patterns and S/R levels
+        need are evaluated. Returns the number of occurrences added.
+        """
+        key = _key(symbol, timeframe)
+        last = self.streams.get(key)
+        first_new = 0 if last is None else int(np.searchsorted(series.time, last, side="right"))
+        if first_new >= len(series):
+            return 0
+        self.streams[key] = int(series.time[-1])
+
+        start = max(first_new - max(lookback(self.program) - 1, self.sr_lookback), 0)
+        window = series[start:] if start else series
+        info = get_symbol_info(symbol, window.close)
+        masks = detect_masks(window, digits=info.digits if digits is None else digits, program=self.program)
+        if not masks:
+            return 0
+        names = list(masks)
+        kinds, bars = np.nonzero(np.stack(list(masks.values()))[:, first_new - start :])
+        if not kinds.size:
+            return 0
+        bars += first_new - start
+        order = np.lexsort((kinds, bars))
+        kinds, bars = kinds[order], bars[order]
+
+        support, resistance = _sr_distances(window, bars, self.sr_lookback, info.pip_size)
+        records = np.empty(kinds.shape[0], dtype=RECORD_DTYPE)
+        records["time"] = window.time[bars]
+        records["price"] = window.close[bars]
+        records["support_pips"] = support
+        records["resistance_pips"] = resistance
+        records["symbol"] = _intern(self.symbols, symbol.upper())
+        records["timeframe"] = _intern(self.timeframes, timeframe.upper())
+        records["pattern"] = np.array([_intern(self.patterns, name) for name in names], dtype=np.uint16)[kinds]
+        self._pending.append(records)
+        self._derived.clear()
+        return int(records.shape[0])
+
+    def attach(self, builder: StreamingBarBuilder, symbol: str) -> None:
+        """Index each bar ``builder`` closes (keeping just the bars its patterns and S/R levels need)."""
+        context = self.sr_lookback + lookback(self.program)
+        buffers: Dict[str, List[ClosedBar]] = {}
+
+        def on_close(bar: ClosedBar) -> None:
+            bars = buffers.setdefault(bar.timeframe, [])
+            bars.append(bar)
+            del bars[:-context]
+            columns = (np.array([getattr(item, name) for item in bars]) for name in ("time",) + PRICE_FIELDS)
+            self.index_series(symbol, bar.timeframe, CandleSeries(*columns))
+
+        builder.subscribe(on_close)
+
+    def query(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        symbols: Optional[Iterable[str]] = None,
+        timeframes: Optional[Iterable[str]] = None,
+        patterns: Optional[Iterable[str]] = None,
+        bias: Optional[str] = None,
+        near: Optional[str] = None,
+        within_pips: float = 10.0,
+    ) -> np.ndarray:
+        """
+        Records with ``start <= time < end`` (epoch seconds) matching every filter, oldest first.
+
+        ``near`` is ``"support"`` or ``"resistance"``: keep occurrences whose
+        bar came within ``within_pips`` of that level (or pierced it).
+        """
+        records = self.records
+        if near is not None and near not in SR_SIDES:
+            raise ValueError(f"near must be one of {SR_SIDES}, got {near!r}")
+        filters = {
+            "symbol": _ids(self.symbols, symbols, str.upper),
+            "timeframe": _ids(self.timeframes, timeframes, str.upper),
+            "pattern": _ids(self.patterns, patterns),
+        }
+        if bias is not None:
+            biased = [i for i, name in enumerate(self.patterns) if self._spec_bias(name) == bias.capitalize()]
+            wanted = filters["pattern"]
+            filters["pattern"] = np.array(
+                biased if wanted is None else sorted(set(biased) & set(wanted.tolist())), dtype=np.intp
+            )
+
+        grouped = [(field, ids) for field, ids in filters.items() if ids is not None and field != "timeframe"]
+        if grouped:
+            field, ids = min(grouped, key=lambda item: self._group(item[0]).size(item[1]))
+            positions = self._group(field).select(ids, start, end)
+            candidates = records[positions]
+        else:
+            times = self._times()
+            lo = 0 if start is None else int(np.searchsorted(times, start, "left"))
+            hi = len(records) if end is None else int(np.searchsorted(times, end, "left"))
+            field, candidates = None, records[lo:hi]
+
+        keep = np.ones(candidates.shape[0], dtype=bool)
+        for name, ids in filters.items():
+            if ids is not None and name != field:
+                keep &= np.isin(candidates[name], ids)
+        if near is not None:
+            keep &= candidates[f"{near}_pips"] <= within_pips
+        return candidates[keep] if not keep.all() else candidates
+
+    def to_dicts(self, records: np.ndarray) -> List[Dict[str, Any]]:
+        """Query results as readable dicts (names instead of ids, ``YYYY-MM-DD HH:MM:SS`` times)."""
+        stamps = np.datetime_as_string(records["time"].astype("datetime64[s]"), unit="s")
+        return [
+            {
+                "symbol": self.symbols[int(record["symbol"])],
+                "timeframe": self.timeframes[int(record["timeframe"])],
+                "pattern": self.patterns[int(record["pattern"])],
+                "bias": self._spec_bias(self.patterns[int(record["pattern"])]),
+                "time": str(stamp).replace("T", " "),
+                "price": float(record["price"]),
+                "support_pips": _optional(record["support_pips"]),
+                "resistance_pips": _optional(record["resistance_pips"]),
+            }
+            for record, stamp in zip(records, stamps)
+        ]
+
+    def save(self, path: Path | str) -> Path:
+        """Write ``<path>.npy`` and ``<path>.json`` (each via temp file + rename, JSON last)."""
+        meta_path, records_path = _paths(path)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        records = self.records
+        if isinstance(records, np.memmap):
+            # Release the mapping first: Windows cannot replace a mapped file.
+            records = self._records = np.array(records)
+        temp = records_path.with_name(records_path.name + ".tmp")
+        with temp.open("wb") as handle:
+            np.save(handle, records)
+        os.replace(temp, records_path)
+        meta = {
+            "version": INDEX_VERSION,
+            "count": int(records.shape[0]),
+            "sr_lookback": self.sr_lookback,
+            "symbols": self.symbols,
+            "timeframes": self.timeframes,
+            "patterns": self.patterns,
+            "streams": self.streams,
+        }
+        if self.program is not BUILTIN:
+            meta["definitions"] = list(self.program.definitions)
+        temp = meta_path.with_name(meta_path.name + ".tmp")
+        temp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp, meta_path)
+        return meta_path
+
+    @classmethod
+    def load(cls, path: Path | str, sr_lookback: int = DEFAULT_SR_LOOKBACK) -> "PatternIndex":
+        """Open a saved index (records memory-mapped); a missing index gives an empty one."""
+        meta_path, records_path = _paths(path)
+        if not meta_path.exists():
+            return cls(sr_lookback)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported pattern index version: {meta.get('version')!r}")
+        definitions = meta.get("definitions")
+        index = cls(int(meta["sr_lookback"]), PatternProgram(definitions) if definitions else None)
+        records = np.load(records_path, mmap_mode="r")
+        if records.dtype != RECORD_DTYPE or records.shape[0] != meta["count"]:
+            raise ValueError(f"{records_path} does not match {meta_path}.")
+        index._records = records
+        index.symbols = list(meta["symbols"])
+        index.timeframes = list(meta["timeframes"])
+        index.patterns = list(meta["patterns"])
+        index.streams = {key: int(value) for key, value in meta["streams"].items()}
+        return index
+
+    def _consolidate(self) -> None:
+        if not self._pending:
+            return
+        chunks = [self._records] + self._pending
+        merged = np.concatenate(chunks)
+        self._pending = []
+        # Appending bars newer than everything indexed keeps the order; otherwise
+        # sort by (time, symbol, timeframe, pattern) so the result does not depend
+        # on the order streams were fed in.
+        boundaries = np.cumsum([chunk.shape[0] for chunk in chunks])[:-1]
+        heads, tails = merged["time"][boundaries], merged["time"][boundaries - 1]
+        if boundaries.size and not (heads > tails).all():
+            merged = merged[np.lexsort((merged["pattern"], merged["timeframe"], merged["symbol"], merged["time"]))]
+        self._records = merged
+        self._derived.clear()
+
+    def _times(self) -> np.ndarray:
+        # A contiguous copy: bisecting the strided record field would copy it on every query.
+        times = self._derived.get("time")
+        if times is None:
+            times = self._derived["time"] = np.ascontiguousarray(self.records["time"])
+        return times
+
+    def _group(self, field: str) -> _Group:
+        group = self._derived.get(field)
+        if group is None:
+            size = len(self.symbols) if field == "symbol" else len(self.patterns)
+            group = self._derived[field] = _Group(self.records, field, size)
+        return group
+
+    def _spec_bias(self, name: str) -> str:
+        spec = self.program.specs.get(name)
+        return spec.bias if spec else "Neutral"
+
+
+def _sr_distances(series: Any, bars: np.ndarray, sr_lookback: int, pip_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Pips from each bar's low/high to the lowest low/highest high of the ``sr_lookback`` bars before it."""
+    support = np.full(bars.shape[0], np.nan, dtype=np.float32)
+    resistance = np.full(bars.shape[0], np.nan, dtype=np.float32)
+    if sr_lookback <= 0 or len(series) <= sr_lookback:
+        return support, resistance
+    ready = bars >= sr_lookback
+    windows = bars[ready] - sr_lookback
+    highs = sliding_window_view(np.asarray(series.high, dtype=np.float64), sr_lookback)
+    lows = sliding_window_view(np.asarray(series.low, dtype=np.float64), sr_lookback)
+    resistance[ready] = (highs[windows].max(axis=1) - series.high[bars[ready]]) / pip_size
+    support[ready] = (series.low[bars[ready]] - lows[windows].min(axis=1)) / pip_size
+    return support, resistance
+
+
+def _intern(table: List[str], value: str) -> int:
+    try:
+        return table.index(value)
+    except ValueError:
+        table.append(value)
+        return len(table) - 1
+
+
+def _ids(table: Sequence[str], values: Optional[Iterable[str]], normalise: Any = None) -> Optional[np.ndarray]:
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    wanted = {normalise(value) if normalise else value for value in values}
+    return np.array([i for i, name in enumerate(table) if name in wanted], dtype=np.intp)
+
+
+def _optional(value: Any) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def _paths(path: Path | str) -> Tuple[Path, Path]:
+    path = Path(path)
+    if path.suffix in (".json", ".npy"):
+        path = path.with_suffix("")
+    return path.with_name(path.name + ".json"), path.with_name(path.name + ".npy")
+
+
+def _key(symbol: str, timeframe: str) -> str:
+    return f"{symbol.upper()}|{timeframe.upper()}"
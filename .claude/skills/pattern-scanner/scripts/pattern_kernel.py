@@ -0,0 +1,171 @@
+"""
+Vectorised candlestick pattern detection over whole series.
+
+Candle geometry (body, shadows, range, direction) is computed once per series
+and every pattern is a boolean mask over all bars, built from those arrays and
+copies shifted by one or two bars. Detecting the latest bar is a slice of the
+masks and scanning the full history costs the same handful of array
+operations.
+
+Shifts run along the last axis, so ``pattern_masks`` accepts 1-D columns or
+2-D ``(symbols, bars)`` blocks alike. Rules and thresholds follow the
+``identify_candlestick_patterns`` helpers in ``examples/``; integer point
+columns (``CandleSeries.to_points``) work as well as float prices.
+
+The built-in rules are ``pattern_dsl`` definitions compiled once at import
+(``BUILTIN``). Every entry point takes an optional ``program`` so user
+patterns (``compile_patterns`` / ``BUILTIN.extend``) run through the same
+code path.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from pattern_dsl import PatternProgram, PatternSpec, compile_patterns
+from symbol_metadata import to_points
+
+# Bars a pattern may look back over (current bar included).
+MAX_PATTERN_BARS = 3
+
+_SMALL_STAR = "body[1] < body[2] * 0.4"
+_NO_SHADOWS = ["upper < body * 0.15", "lower < body * 0.15", "body_ratio > 0.7"]
+
+
+def _pattern(name: str, type: str, strength: str, bias: str, reliability: int, *when: str) -> Dict[str, Any]:
+    return {"name": name, "type": type, "strength": strength, "bias": bias, "reliability": reliability, "when": list(when)}
+
+
+BUILTIN_DEFINITIONS: List[Dict[str, Any]] = [
+    _pattern("Bullish Engulfing", "Reversal", "Very Strong", "Bullish", 80,
+             "bearish[1]", "bullish", "close > open[1]", "open < close[1]"),
+    _pattern("Bearish Engulfing", "Reversal", "Very Strong", "Bearish", 79,
+             "bullish[1]", "bearish", "close < open[1]", "open > close[1]"),
+    _pattern("Morning Star", "Reversal", "Very Strong", "Bullish", 78,
+             "bearish[2]", _SMALL_STAR, "bullish", "close > mid[2]"),
+    _pattern("Evening Star", "Reversal", "Very Strong", "Bearish", 72,
+             "bullish[2]", _SMALL_STAR, "bearish", "close < mid[2]"),
+    _pattern("Hammer", "Reversal", "Strong", "Bullish", 60,
+             "lower > body * 2", "upper < body * 0.5", "body_ratio < 0.3"),
+    _pattern("Shooting Star", "Reversal", "Strong", "Bearish", 59,
+             "upper > body * 2", "lower < body * 0.5", "body_ratio < 0.3"),
+    _pattern("Doji", "Indecision", "Medium", "Neutral", 50,
+             "body_ratio < 0.1"),
+    _pattern("Bullish Harami", "Reversal", "Medium", "Bullish", 53,
+             "bearish[1]", "bullish", "open > close[1]", "close < open[1]"),
+    _pattern("Bearish Harami", "Reversal", "Medium", "Bearish", 53,
+             "bullish[1]", "bearish", "open < close[1]", "close > open[1]"),
+    _pattern("Three White Soldiers", "Continuation", "Very Strong", "Bullish", 82,
+             "bullish[2] and bullish[1] and bullish", "close[2] < close[1] < close"),
+    _pattern("Three Black Crows", "Continuation", "Very Strong", "Bearish", 78,
+             "bearish[2] and bearish[1] and bearish", "close[2] > close[1] > close"),
+    _pattern("Spinning Top", "Indecision", "Weak", "Neutral", 45,
+             "body_ratio < 0.25", "upper > body * 0.5", "lower > body * 0.5"),
+    _pattern("Bullish Marubozu", "Continuation", "Strong", "Bullish", 65,
+             "bullish", *_NO_SHADOWS),
+    _pattern("Bearish Marubozu", "Continuation", "Strong", "Bearish", 65,
+             "bearish", *_NO_SHADOWS),
+    _pattern("Piercing Line", "Reversal", "Strong", "Bullish", 64,
+             "bearish[1]", "bullish", "open < close[1]", "mid[1] < close < open[1]"),
+    _pattern("Dark Cloud Cover", "Reversal", "Strong", "Bearish", 60,
+             "bullish[1]", "bearish", "open > close[1]", "open[1] < close < mid[1]"),
+]
+
+BUILTIN: PatternProgram = compile_patterns(BUILTIN_DEFINITIONS)
+PATTERNS: Dict[str, PatternSpec] = BUILTIN.specs
+
+
+def pattern_masks(
+    open: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    names: Optional[Iterable[str]] = None,
+    program: Optional[PatternProgram] = None,
+) -> Dict[str, np.ndarray]:
+    """Boolean mask per pattern; ``mask[..., i]`` is True when the pattern completes on bar ``i``."""
+    return (program or BUILTIN).evaluate(open, high, low, close, names)
+
+
+def detect_masks(
+    series: Any,
+    names: Optional[Iterable[str]] = None,
+    digits: Optional[int] = None,
+    program: Optional[PatternProgram] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    ``pattern_masks`` for anything with ``open``/``high``/``low``/``close`` columns.
+
+    With ``digits`` the prices are compared as exact integer points, so ties
+    (a shadow exactly twice the body) do not depend on float rounding.
+    """
+    columns = [series.open, series.high, series.low, series.close]
+    if digits is not None:
+        columns = [to_points(values, digits) for values in columns]
+    return pattern_masks(*columns, names=names, program=program)
+
+
+def lookback(program: Optional[PatternProgram] = None) -> int:
+    """Bars the longest pattern of ``program`` spans (``MAX_PATTERN_BARS`` for the built-ins)."""
+    if program is None:
+        return MAX_PATTERN_BARS
+    return max((spec.bars for spec in program.specs.values()), default=1)
+
+
+def pattern_record(series: Any, name: str, index: int, program: Optional[PatternProgram] = None) -> Dict[str, Any]:
+    """Pattern dict in the shape the confluence calculator and reports consume (price series only)."""
+    spec = (program or BUILTIN).specs[name]
+    stamp = np.datetime_as_string(np.int64(series.time[index]).astype("datetime64[s]"), unit="s")
+    return {
+        "name": name,
+        "type": spec.type,
+        "strength": spec.strength,
+        "bias": spec.bias,
+        "reliability": spec.reliability,
+        "price": float(series.close[index]),
+        "time": stamp.replace("T", " "),
+    }
+
+
+def find_patterns(
+    series: Any,
+    start: int = 0,
+    masks: Optional[Dict[str, np.ndarray]] = None,
+    names: Optional[Sequence[str]] = None,
+    digits: Optional[int] = None,
+    program: Optional[PatternProgram] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Every pattern completing on bar ``start`` or later, oldest first.
+
+    Without precomputed ``masks`` only the bars from ``start`` back to the
+    longest pattern's first bar are evaluated.
+    """
+    if start < 0:
+        start = max(start + len(series.close), 0)
+    first = 0
+    if masks is None:
+        first = max(start - (lookback(program) - 1), 0)
+        masks = detect_masks(series[first:] if first else series, names, digits, program)
+    if not masks:
+        return []
+    pattern_names = list(masks)
+    kinds, bars = np.nonzero(np.stack(list(masks.values()))[:, start - first :])
+    bars += start
+    order = np.lexsort((kinds, bars))
+    return [pattern_record(series, pattern_names[kinds[i]], int(bars[i]), program) for i in order]
+
+
+def latest_patterns(
+    series: Any,
+    bars: int = 1,
+    names: Optional[Sequence[str]] = None,
+    digits: Optional[int] = None,
+    program: Optional[PatternProgram] = None,
+) -> List[Dict[str, Any]]:
+    """Patterns completing on the last ``bars`` bars (a slice of the full-history masks)."""
+    if bars <= 0:
+        return []
+    return find_patterns(series, start=-bars, names=names, digits=digits, program=program)
@@ -0,0 +1,409 @@
+"""
+Empirical pattern reliability from forward returns over full history.
+
+The ``reliability`` of a ``PatternSpec`` is a fixed textbook number. This
+module measures it instead: every occurrence in a symbol/timeframe history
+(``pattern_kernel`` masks) is followed forward, and per pattern the engine
+accumulates
+
+- forward returns after each of ``horizons`` bars, signed by the pattern's
+  bias (a bearish pattern gains when price falls),
+- directional hits (signed return > 0) per horizon,
+- maximum favourable / adverse excursion (MFE/MAE) within the longest horizon.
+
+Everything is array work: occurrences come from one ``np.nonzero`` over the
+masks, outcomes are gathered with fancy indexing and reduced with
+``np.bincount`` per pattern. The results are sums, so per-stream statistics
+merge into per-timeframe and overall tables without revisiting bars.
+
+``ReliabilityEngine`` caches each stream's statistics on disk under a data
+version (a hash of the bars) plus the engine settings, so a rebuild only
+recomputes histories that changed. ``ReliabilityTable.apply`` swaps the
+constant ``reliability`` of pattern dicts for the measured hit rate before
+they reach the confluence calculator.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pattern_dsl import PatternProgram
+from pattern_kernel import BUILTIN, detect_masks
+from symbol_metadata import get_symbol_info
+
+STATS_VERSION = 1
+DEFAULT_HORIZONS = (1, 3, 5, 10, 20)
+# Horizon (bars) whose hit rate becomes the pattern's reliability.
+RELIABILITY_HORIZON = 5
+# Hit rates are shrunk towards 50% as if this many coin-flip samples were seen.
+PRIOR_SAMPLES = 20
+# Fewer samples than this and a coarser table (timeframe, then overall) is used.
+MIN_SAMPLES = 30
+
+_DIRECTION = {"Bullish": 1, "Bearish": -1}
+ALL = "*"
+
+
+class PatternStats:
+    """
+    Mergeable outcome sums of one pattern; per-horizon arrays follow ``horizons``.
+
+    Neutral patterns (``directional`` False) have no favourable direction:
+    returns and MFE are measured upwards and no hit rate is reported.
+    """
+
+    __slots__ = ("horizons", "directional", "count", "samples", "return_sum", "hits", "excursions", "mfe_sum", "mae_sum")
+
+    def __init__(self, horizons: Sequence[int], directional: bool = True) -> None:
+        self.horizons = tuple(int(h) for h in horizons)
+        self.directional = directional
+        self.count = 0
+        self.samples = np.zeros(len(self.horizons), dtype=np.int64)
+        self.return_sum = np.zeros(len(self.horizons))
+        self.hits = np.zeros(len(self.horizons), dtype=np.int64)
+        self.excursions = 0
+        self.mfe_sum = 0.0
+        self.mae_sum = 0.0
+
+    def merge(self, other: "PatternStats") -> "PatternStats":
+        if other.horizons != self.horizons:
+            raise ValueError(f"Cannot merge horizons {other.horizons} into {self.horizons}.")
+        self.count += other.count
+        self.samples += other.samples
+        self.return_sum += other.return_sum
+        self.hits += other.hits
+        self.excursions += other.excursions
+        self.mfe_sum += other.mfe_sum
+        self.mae_sum += other.mae_sum
+        return self
+
+    def mean_returns(self) -> Dict[int, Optional[float]]:
+        return {h: _ratio(total, n) for h, total, n in zip(self.horizons, self.return_sum, self.samples)}
+
+    def hit_rates(self) -> Dict[int, Optional[float]]:
+        if not self.directional:
+            return {h: None for h in self.horizons}
+        return {h: _ratio(hits, n) for h, hits, n in zip(self.horizons, self.hits, self.samples)}
+
+    def hit_rate(self, horizon: int = RELIABILITY_HORIZON) -> Tuple[int, int]:
+        """(hits, samples) at ``horizon`` (the nearest measured horizon if it was not measured)."""
+        column = int(np.argmin([abs(h - horizon) for h in self.horizons]))
+        return int(self.hits[column]), int(self.samples[column])
+
+    def reliability(self, horizon: int = RELIABILITY_HORIZON) -> Optional[int]:
+        """Hit rate in percent, shrunk towards 50 by ``PRIOR_SAMPLES`` for small samples (None when neutral)."""
+        if not self.directional:
+            return None
+        hits, samples = self.hit_rate(horizon)
+        return int(round(100 * (hits + PRIOR_SAMPLES / 2) / (samples + PRIOR_SAMPLES)))
+
+    def summary(self, horizon: int = RELIABILITY_HORIZON) -> Dict[str, Any]:
+        return {
+            "occurrences": self.count,
+            "mean_return": self.mean_returns(),
+            "hit_rate": self.hit_rates(),
+            "mfe": _ratio(self.mfe_sum, self.excursions),
+            "mae": _ratio(self.mae_sum, self.excursions),
+            "reliability": self.reliability(horizon),
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "directional": self.directional,
+            "count": self.count,
+            "samples": self.samples.tolist(),
+            "return_sum": self.return_sum.tolist(),
+            "hits": self.hits.tolist(),
+            "excursions": self.excursions,
+            "mfe_sum": self.mfe_sum,
+            "mae_sum": self.mae_sum,
+        }
+
+    @classmethod
+    def from_json(cls, horizons: Sequence[int], data: Dict[str, Any]) -> "PatternStats":
+        stats = cls(horizons, bool(data.get("directional", True)))
+        stats.count = int(data["count"])
+        stats.samples = np.asarray(data["samples"], dtype=np.int64)
+        stats.return_sum = np.asarray(data["return_sum"], dtype=np.float64)
+        stats.hits = np.asarray(data["hits"], dtype=np.int64)
+        stats.excursions = int(data["excursions"])
+        stats.mfe_sum = float(data["mfe_sum"])
+        stats.mae_sum = float(data["mae_sum"])
+        return stats
+
+
+def measure_series(
+    series: Any,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    program: Optional[PatternProgram] = None,
+    digits: Optional[int] = None,
+) -> Dict[str, PatternStats]:
+    """Outcome statistics of every pattern occurring in ``series`` (anything with time/OHLC columns)."""
+    program = program or BUILTIN
+    horizons = tuple(sorted(int(h) for h in horizons))
+    if not horizons or horizons[0] <= 0:
+        raise ValueError(f"Horizons must be positive bar counts, got {horizons}.")
+    masks = detect_masks(series, digits=digits, program=program)
+    names = list(masks)
+    result = {name: PatternStats(horizons, program.specs[name].bias in _DIRECTION) for name in names}
+    if not names or not len(series.close):
+        return result
+
+    kinds, bars = np.nonzero(np.stack(list(masks.values())))
+    size = len(names)
+    close = np.asarray(series.close, dtype=np.float64)
+    last = close.shape[0] - 1
+    entry = close[bars]
+    direction = np.array([_DIRECTION.get(program.specs[name].bias, 0) for name in names])[kinds]
+    # Neutral patterns keep raw (upward) returns and score no hits.
+    sign = np.where(direction == 0, 1, direction)
+    directional = direction != 0
+
+    counts = np.bincount(kinds, minlength=size)
+    samples = np.zeros((size, len(horizons)), dtype=np.int64)
+    return_sum = np.zeros((size, len(horizons)))
+    hits = np.zeros((size, len(horizons)), dtype=np.int64)
+    for column, horizon in enumerate(horizons):
+        valid = bars + horizon <= last
+        change = (close[np.minimum(bars + horizon, last)] - entry) / entry * sign
+        samples[:, column] = np.bincount(kinds[valid], minlength=size)
+        return_sum[:, column] = np.bincount(kinds[valid], weights=change[valid], minlength=size)
+        hits[:, column] = np.bincount(kinds[valid & directional & (change > 0)], minlength=size)
+
+    longest = horizons[-1]
+    valid = bars + longest <= last
+    ahead_high = _forward_extreme(np.asarray(series.high, dtype=np.float64), longest, np.maximum)
+    ahead_low = _forward_extreme(np.asarray(series.low, dtype=np.float64), longest, np.minimum)
+    at, price, side = bars[valid], entry[valid], direction[valid]
+    up = (ahead_high[at] - price) / price
+    down = (price - ahead_low[at]) / price
+    excursions = np.bincount(kinds[valid], minlength=size)
+    mfe = np.bincount(kinds[valid], weights=np.where(side < 0, down, up), minlength=size)
+    mae = np.bincount(kinds[valid], weights=np.where(side < 0, up, down), minlength=size)
+
+    for row, name in enumerate(names):
+        stats = result[name]
+        stats.count = int(counts[row])
+        stats.samples = samples[row]
+        stats.return_sum = return_sum[row]
+        stats.hits = hits[row]
+        stats.excursions = int(excursions[row])
+        stats.mfe_sum = float(mfe[row])
+        stats.mae_sum = float(mae[row])
+    return result
+
+
+def data_version(series: Any) -> str:
+    """Hash of the time and OHLC columns: changes whenever any bar does."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in ("time", "open", "high", "low", "close"):
+        digest.update(np.ascontiguousarray(getattr(series, name)).tobytes())
+    return digest.hexdigest()
+
+
+class ReliabilityTable:
+    """
+    Pattern statistics per symbol/timeframe, plus per-timeframe and overall merges.
+
+    Keys are ``(symbol, timeframe, pattern)`` with ``ALL`` (``"*"``) for the
+    merged levels.
+    """
+
+    def __init__(self, horizons: Sequence[int] = DEFAULT_HORIZONS) -> None:
+        self.horizons = tuple(sorted(int(h) for h in horizons))
+        self.stats: Dict[Tuple[str, str, str], PatternStats] = {}
+        self._streams: set = set()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def add(self, symbol: str, timeframe: str, stats: Dict[str, PatternStats]) -> None:
+        symbol, timeframe = symbol.upper(), timeframe.upper()
+        if (symbol, timeframe) in self._streams:
+            raise ValueError(f"{symbol} {timeframe} is already in the table.")
+        self._streams.add((symbol, timeframe))
+        for pattern, values in stats.items():
+            self.stats[(symbol, timeframe, pattern)] = values
+            for key in ((ALL, timeframe, pattern), (ALL, ALL, pattern)):
+                self.stats.setdefault(key, PatternStats(self.horizons, values.directional)).merge(values)
+
+    def streams(self) -> List[Tuple[str, str]]:
+        return sorted(self._streams)
+
+    def get(self, pattern: str, timeframe: str = ALL, symbol: str = ALL) -> Optional[PatternStats]:
+        return self.stats.get((symbol.upper(), timeframe.upper(), pattern))
+
+    def reliability(
+        self,
+        pattern: str,
+        timeframe: str = ALL,
+        symbol: str = ALL,
+        min_samples: int = MIN_SAMPLES,
+        horizon: int = RELIABILITY_HORIZON,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        ``(reliability, samples)`` from the most specific table with enough samples.
+
+        Tries symbol+timeframe, then the timeframe across symbols, then every
+        stream. None for neutral patterns and patterns never measured.
+        """
+        for level_symbol, level_timeframe in ((symbol, timeframe), (ALL, timeframe), (ALL, ALL)):
+            stats = self.get(pattern, level_timeframe, level_symbol)
+            if stats is None:
+                continue
+            samples = stats.hit_rate(horizon)[1]
+            if stats.directional and samples >= min_samples:
+                return stats.reliability(horizon), samples
+        return None
+
+    def apply(
+        self,
+        patterns: Iterable[Dict[str, Any]],
+        timeframe: str = ALL,
+        symbol: str = ALL,
+        min_samples: int = MIN_SAMPLES,
+    ) -> List[Dict[str, Any]]:
+        """Copies of pattern dicts with measured ``reliability`` (and ``reliability_samples``) where known."""
+        result = []
+        for pattern in patterns:
+            measured = self.reliability(str(pattern.get("name")), timeframe, symbol, min_samples)
+            if measured is not None:
+                pattern = dict(pattern, reliability=measured[0], reliability_samples=measured[1])
+            result.append(pattern)
+        return result
+
+    def apply_by_timeframe(
+        self,
+        patterns_by_timeframe: Dict[str, List[Dict[str, Any]]],
+        symbol: str = ALL,
+        min_samples: int = MIN_SAMPLES,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            timeframe: self.apply(patterns or [], timeframe, symbol, min_samples)
+            for timeframe, patterns in patterns_by_timeframe.items()
+        }
+
+    def rows(self, timeframe: str = ALL, symbol: str = ALL) -> List[Dict[str, Any]]:
+        """Summary per pattern for one table level, most reliable first."""
+        rows = [
+            dict(pattern=pattern, **stats.summary())
+            for (row_symbol, row_timeframe, pattern), stats in self.stats.items()
+            if row_symbol == symbol.upper() and row_timeframe == timeframe.upper() and stats.count
+        ]
+        return sorted(rows, key=lambda row: (-(row["reliability"] or 0), row["pattern"]))
+
+    def to_json(self) -> Dict[str, Any]:
+        streams: Dict[str, Dict[str, Any]] = {}
+        for (symbol, timeframe, pattern), stats in self.stats.items():
+            if symbol != ALL:
+                streams.setdefault(f"{symbol}|{timeframe}", {})[pattern] = stats.to_json()
+        return {"version": STATS_VERSION, "horizons": list(self.horizons), "streams": streams}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ReliabilityTable":
+        if data.get("version") != STATS_VERSION:
+            raise ValueError(f"Unsupported reliability table version: {data.get('version')!r}")
+        table = cls(data["horizons"])
+        for key, patterns in data.get("streams", {}).items():
+            symbol, _, timeframe = key.partition("|")
+            table.add(
+                symbol,
+                timeframe,
+                {pattern: PatternStats.from_json(table.horizons, values) for pattern, values in patterns.items()},
+            )
+        return table
+
+    def save(self, path: Path | str) -> Path:
+        return _write_json(Path(path), self.to_json())
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ReliabilityTable":
+        return cls.from_json(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class ReliabilityEngine:
+    """Measures streams into a ``ReliabilityTable``, reusing cached results per data version."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path | str] = None,
+        horizons: Sequence[int] = DEFAULT_HORIZONS,
+        program: Optional[PatternProgram] = None,
+        use_points: bool = True,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.horizons = tuple(sorted(int(h) for h in horizons))
+        self.program = program or BUILTIN
+        self.use_points = use_points
+        self.hits = 0
+        self.misses = 0
+        settings = {
+            "version": STATS_VERSION,
+            "horizons": self.horizons,
+            "use_points": use_points,
+            "definitions": list(self.program.definitions),
+        }
+        self._settings = hashlib.blake2b(json.dumps(settings, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+    def measure(self, symbol: str, timeframe: str, series: Any) -> Dict[str, PatternStats]:
+        """Statistics of one symbol/timeframe history (from the cache when its bars are unchanged)."""
+        key = f"{data_version(series)}-{self._settings}"
+        path = None
+        if self.cache_dir:
+            path = self.cache_dir / f"{symbol.upper()}_{timeframe.upper()}.json"
+            cached = _read_json(path)
+            if cached and cached.get("key") == key:
+                self.hits += 1
+                return {name: PatternStats.from_json(self.horizons, values) for name, values in cached["patterns"].items()}
+        self.misses += 1
+        digits = get_symbol_info(symbol, series.close).digits if self.use_points else None
+        stats = measure_series(series, self.horizons, self.program, digits)
+        if path is not None:
+            _write_json(path, {"key": key, "patterns": {name: values.to_json() for name, values in stats.items()}})
+        return stats
+
+    def build(self, streams: Iterable[Tuple[str, str, Any]]) -> ReliabilityTable:
+        """Table over ``(symbol, timeframe, series)`` streams."""
+        table = ReliabilityTable(self.horizons)
+        for symbol, timeframe, series in streams:
+            table.add(symbol, timeframe, self.measure(symbol, timeframe, series))
+        return table
+
+
+def _forward_extreme(values: np.ndarray, horizon: int, reduce: Any) -> np.ndarray:
+    """``out[i] = reduce(values[i + 1 : i + 1 + horizon])`` (meaningful where the window is complete)."""
+    out = np.empty_like(values)
+    out[:-1] = values[1:]
+    out[-1:] = values[-1:]
+    span = 1
+    # Doubling: after each pass ``out`` covers ``span`` bars ahead; overlap the last pass to hit ``horizon`` exactly.
+    while span < horizon:
+        step = min(span, horizon - span)
+        out[:-step] = reduce(out[:-step], out[step:])
+        span += step
+    return out
+
+
+def _ratio(total: Any, count: Any) -> Optional[float]:
+    return float(total) / int(count) if count else None
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(temp, path)
+    return path
@@ -0,0 +1,127 @@
+"""
+Current-price cache with bounded staleness.
+
+Scans only need a price that is recent enough, not one fetched for this very
+scan. ``PriceCache`` keeps the last price per symbol with the time it was
+observed (from a refresh, a connector payload or a streamed tick) and serves
+it while it is younger than ``max_staleness`` seconds. Stale or unknown
+symbols are refreshed together: with a ``fetch_many`` adapter (one broker
+round-trip for the whole list) or, failing that, ``fetch_one`` per symbol.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_STALENESS = 5.0
+
+FetchOne = Callable[[str], float]
+FetchMany = Callable[[List[str]], Dict[str, float]]
+
+
+class PriceCache:
+    """Thread-safe symbol -> (price, observed_at) map with batch refresh."""
+
+    def __init__(
+        self,
+        max_staleness: float = DEFAULT_MAX_STALENESS,
+        fetch_one: Optional[FetchOne] = None,
+        fetch_many: Optional[FetchMany] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_staleness = max_staleness
+        self.fetch_one = fetch_one
+        self.fetch_many = fetch_many
+        self.hits = 0
+        self.misses = 0
+        self.batch_refreshes = 0
+        self.single_refreshes = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._prices: Dict[str, Tuple[float, float]] = {}
+
+    def update(self, symbol: str, price: float, observed_at: Optional[float] = None) -> None:
+        """Record a price seen elsewhere (connector payload, streamed tick); older observations are ignored."""
+        if not price:
+            return
+        at = self._clock() if observed_at is None else observed_at
+        key = symbol.upper()
+        with self._lock:
+            current = self._prices.get(key)
+            if current is None or current[1] <= at:
+                self._prices[key] = (float(price), at)
+
+    def update_many(self, prices: Dict[str, float], observed_at: Optional[float] = None) -> None:
+        at = self._clock() if observed_at is None else observed_at
+        for symbol, price in prices.items():
+            self.update(symbol, price, at)
+
+    def age(self, symbol: str) -> Optional[float]:
+        with self._lock:
+            entry = self._prices.get(symbol.upper())
+        return None if entry is None else self._clock() - entry[1]
+
+    def get(self, symbol: str, max_staleness: Optional[float] = None) -> Optional[float]:
+        """The cached price when it is fresh enough, without refreshing."""
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        with self._lock:
+            entry = self._prices.get(symbol.upper())
+            if entry is not None and self._clock() - entry[1] <= limit:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return None
+
+    def price(self, symbol: str, max_staleness: Optional[float] = None) -> float:
+        return self.prices([symbol], max_staleness)[symbol]
+
+    def prices(self, symbols: Iterable[str], max_staleness: Optional[float] = None) -> Dict[str, float]:
+        """Fresh prices for ``symbols``, refreshing every stale one in a single batch."""
+        symbols = list(symbols)
+        result: Dict[str, float] = {}
+        stale: List[str] = []
+        for symbol in symbols:
+            cached = self.get(symbol, max_staleness)
+            if cached is None:
+                stale.append(symbol)
+            else:
+                result[symbol] = cached
+        if stale:
+            refreshed = self.refresh(stale)
+            for symbol in stale:
+                if symbol.upper() not in refreshed:
+                    raise KeyError(f"No price available for {symbol}")
+                result[symbol] = refreshed[symbol.upper()]
+        return result
+
+    def refresh(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Fetch prices for ``symbols`` now (one round-trip with ``fetch_many``)."""
+        wanted = [symbol.upper() for symbol in dict.fromkeys(symbols)]
+        if not wanted:
+            return {}
+        if self.fetch_many is not None:
+            fetched = {symbol.upper(): float(price) for symbol, price in self.fetch_many(wanted).items() if price}
+            self.batch_refreshes += 1
+        elif self.fetch_one is not None:
+            fetched = {}
+            for symbol in wanted:
+                price = float(self.fetch_one(symbol) or 0.0)
+                if price:
+                    fetched[symbol] = price
+            self.single_refreshes += len(wanted)
+        else:
+            raise RuntimeError("PriceCache has no price adapter to refresh from.")
+        self.update_many(fetched)
+        return fetched
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "symbols": len(self._prices),
+                "hits": self.hits,
+                "misses": self.misses,
+                "batch_refreshes": self.batch_refreshes,
+                "single_refreshes": self.single_refreshes,
+            }
@@ -0,0 +1,111 @@
+"""
+Local timeframe resampling from lower-timeframe bars.
+
+H1/H4/D1 (or any multiple of the base timeframe) can be derived from one M1 or
+M15 fetch instead of one ``get_candles_latest`` call per timeframe. Bars are
+bucketed by ``(time + anchor) // period`` and aggregated with
+``ufunc.reduceat`` over the bucket boundaries; no per-bar Python loop runs.
+
+``bucket_anchor`` is ``day_offset``, the broker day boundary in seconds east
+of the bar clock. MT5 reports bar times in broker server time already, so MCP
+payloads need the default of 0; pass e.g. ``7200`` for true-UTC bars from a
+UTC+2 broker so D1 and H4 buckets open at 22:00 UTC. Weekly periods subtract
+another three days (the epoch fell on a Thursday), so W1 buckets open on
+Sunday like MT5 W1 bars. Weekend gaps need no special handling because only buckets that contain
+bars are emitted; a bucket is never filled with synthetic candles.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from candle_series import CandleSeries, timeframe_seconds
+
+
+WEEK_SECONDS = 7 * 86400
+# 1970-01-01 was a Thursday; weekly buckets are anchored three days later.
+_SUNDAY_ANCHOR = 3 * 86400
+
+
+def bucket_anchor(period: int, day_offset: int = 0) -> int:
+    """Shift that aligns ``(time + anchor) % period == 0`` with a bucket open."""
+    return day_offset - (_SUNDAY_ANCHOR if period % WEEK_SECONDS == 0 else 0)
+
+
+def bucket_starts(times: np.ndarray, period: int, day_offset: int = 0) -> np.ndarray:
+    """Opening time (epoch seconds) of the ``period`` bucket each bar falls into."""
+    anchor = bucket_anchor(period, day_offset)
+    shifted = times + anchor
+    return shifted - shifted % period - anchor
+
+
+def resample(
+    series: CandleSeries,
+    period: int,
+    day_offset: int = 0,
+    complete_only: bool = False,
+    base_period: Optional[int] = None,
+) -> CandleSeries:
+    """
+    Aggregate ``series`` into ``period``-second bars.
+
+    With ``complete_only`` the last bucket is dropped unless the base bars
+    reach its end (``base_period`` is inferred from the smallest bar spacing
+    when not given).
+    """
+    if series.is_empty:
+        return series
+    buckets = bucket_starts(series.time, period, day_offset)
+    boundaries = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(series)])) - 1
+
+    result = CandleSeries(
+        time=buckets[starts],
+        open=series.open[starts],
+        high=np.maximum.reduceat(series.high, starts),
+        low=np.minimum.reduceat(series.low, starts),
+        close=series.close[ends],
+        tick_volume=np.add.reduceat(series.tick_volume, starts),
+        spread=np.minimum.reduceat(series.spread, starts),
+        real_volume=np.add.reduceat(series.real_volume, starts),
+    )
+    if complete_only:
+        step = base_period or _infer_base_period(series)
+        if series.time[-1] + step < result.time[-1] + period:
+            result = result[:-1]
+    return result
+
+
+def resample_timeframe(
+    series: CandleSeries,
+    base_timeframe: str,
+    target_timeframe: str,
+    day_offset: int = 0,
+) -> CandleSeries:
+    base = timeframe_seconds(base_timeframe)
+    target = timeframe_seconds(target_timeframe)
+    if target % base:
+        raise ValueError(f"{target_timeframe} is not a multiple of {base_timeframe}.")
+    if target == base:
+        return series
+    return resample(series, target, day_offset=day_offset)
+
+
+def derive_timeframes(
+    series: CandleSeries,
+    base_timeframe: str,
+    targets: Iterable[str],
+    day_offset: int = 0,
+) -> Dict[str, CandleSeries]:
+    """Build every target timeframe from one base-timeframe series."""
+    return {tf: resample_timeframe(series, base_timeframe, tf, day_offset) for tf in targets}
+
+
+def _infer_base_period(series: CandleSeries) -> int:
+    if len(series) < 2:
+        return 0
+    steps = np.diff(series.time)
+    return int(steps[steps > 0].min(initial=0))
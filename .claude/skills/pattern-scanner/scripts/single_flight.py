@@ -0,0 +1,112 @@
+"""
+Single-flight request coalescing with a short result TTL.
+
+Threads asking for the same key while a fetch for it is in flight wait for
+that fetch instead of issuing their own, and results stay reusable for
+``ttl`` seconds to absorb bursts (overlapping batch watchlists, schedulers
+firing several scans at once). ``do_many`` handles a batch of keys: cached and
+in-flight keys are shared, and all the remaining keys go out in a single
+``fetch`` call, so one connector request still covers several timeframes.
+
+Failures are propagated to every waiter and never cached; neither are values
+the optional ``cacheable`` predicate rejects (an empty payload, say).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+DEFAULT_TTL = 2.0
+
+
+class SingleFlight:
+    """Thread-safe coalescing cache; ``stats()`` reports hits, misses and coalesced waits."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        return self.do_many([key], lambda keys: {key: func()})[key]
+
+    def do_many(
+        self,
+        keys: Sequence[Hashable],
+        fetch: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Dict[Hashable, Any]:
+        """Values for ``keys``; ``fetch`` receives only the keys nobody else has or is fetching."""
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, Future] = {}
+        owned: List[Hashable] = []
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] > now:
+                    results[key] = entry[1]
+                    self.hits += 1
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                    self.coalesced += 1
+                else:
+                    self._cache.pop(key, None)
+                    self._inflight[key] = Future()
+                    owned.append(key)
+                    self.misses += 1
+
+        if owned:
+            try:
+                fetched = fetch(owned)
+                missing = [key for key in owned if key not in fetched]
+                if missing:
+                    raise KeyError(f"fetch did not return {missing}")
+            except BaseException as exc:
+                self._settle(owned, error=exc)
+                raise
+            self._settle(owned, values=fetched, cacheable=cacheable)
+            results.update((key, fetched[key]) for key in owned)
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return {key: results[key] for key in keys}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "round_trips_saved": self.hits + self.coalesced,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _settle(
+        self,
+        keys: List[Hashable],
+        values: Dict[Hashable, Any] | None = None,
+        error: BaseException | None = None,
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> None:
+        with self._lock:
+            expires = self._clock() + self.ttl
+            for key in keys:
+                future = self._inflight.pop(key)
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+                if self.ttl > 0 and (cacheable is None or cacheable(values[key])):
+                    self._cache[key] = (expires, values[key])
+                future.set_result(values[key])
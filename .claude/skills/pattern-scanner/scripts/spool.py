@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Spool file handoff for ``run_pattern_scan``.
+
+Instead of generating ``temp_scan_{timestamp}.py`` with every CSV embedded as
+a Python string literal (which the interpreter must compile before the scan
+starts), the MCP results are written to a spool file and read back as data::
+
+    {"key": "price", "data": {"bid": 1.0849, "ask": 1.0851}}
+    {"key": "candles_m15", "data": "time,open,high,..."}
+    {"key": "candles_h1", "data": {"result": "time,open,high,..."}}
+
+One JSON object per line, one line per ``mcp_data`` entry; the file may be
+gzip-compressed (detected from its magic bytes, not the suffix) and may be
+passed by path or on stdin (``-``). A plain JSON object holding the whole
+``mcp_data`` dict is accepted as well. Usage::
+
+    python .claude/skills/pattern-scanner/scripts/spool.py EURUSD mcp_data.jsonl.gz
+    cat mcp_data.jsonl | python .claude/skills/pattern-scanner/scripts/spool.py EURUSD -
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Optional
+
+GZIP_MAGIC = b"\x1f\x8b"
+STDIN = "-"
+
+
+def write_spool(path: Path | str, mcp_data: Dict[str, Any], compress: Optional[bool] = None) -> Path:
+    """Write ``mcp_data`` as JSON lines; gzip when ``compress`` is set or the path ends in ``.gz``."""
+    path = Path(path)
+    if compress is None:
+        compress = path.suffix == ".gz"
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8", newline="\n") as handle:
+        for key, value in mcp_data.items():
+            handle.write(json.dumps({"key": key, "data": value}, separators=(",", ":")))
+            handle.write("\n")
+    return path
+
+
+def read_spool(source: Path | str | IO[bytes]) -> Dict[str, Any]:
+    """Load ``mcp_data`` from a spool path, ``"-"`` (stdin) or a binary stream."""
+    if isinstance(source, (str, Path)):
+        if str(source) == STDIN:
+            raw = sys.stdin.buffer.read()
+        else:
+            raw = Path(source).read_bytes()
+    else:
+        raw = source.read()
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return _decode(raw.decode("utf-8-sig"))
+
+
+def run_pattern_scan_from_spool(
+    symbol: str,
+    source: Path | str | IO[bytes],
+    scan: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    **kwargs: Any,
+) -> Any:
+    """Read ``mcp_data`` from ``source`` and hand it to ``run_scan.run_pattern_scan``."""
+    if scan is None:
+        from run_scan import run_pattern_scan as scan
+    return scan(symbol, read_spool(source), **kwargs)
+
+
+def _decode(text: str) -> Dict[str, Any]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("Spool is empty.")
+    try:
+        first = json.loads(lines[0])
+    except json.JSONDecodeError:
+        first = None
+    if not _is_record(first):
+        document = json.loads(text)
+        if not isinstance(document, dict):
+            raise ValueError("Spool must contain JSON lines or a JSON object.")
+        return document
+
+    mcp_data: Dict[str, Any] = {first["key"]: first["data"]}
+    for number, line in enumerate(lines[1:], start=2):
+        record = json.loads(line)
+        if not _is_record(record):
+            raise ValueError(f"Spool line {number} is not a {{\"key\", \"data\"}} record.")
+        mcp_data[record["key"]] = record["data"]
+    return mcp_data
+
+
+def _is_record(value: Any) -> bool:
+    return isinstance(value, dict) and set(value) == {"key", "data"} and isinstance(value["key"], str)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        raise SystemExit("Uso: spool.py SYMBOL SPOOL_FILE|-")
+    result = run_pattern_scan_from_spool(sys.argv[1].upper(), sys.argv[2])
+    print(f"Report: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Support/resistance zones from a histogram of swing-point touches.
+
+Rolling extremes and raw swing prices give a new set of levels every scan,
+often several a few pips apart for what the chart shows as one area.
+``SRZoneEngine`` bins every confirmed ZigZag swing of a stream on a fixed
+price grid (bin width a fraction of the ATR) with ``np.bincount``, so adding
+swings is O(new swings) and reading zones is O(bins). Zones grow greedily
+from the heaviest bins, merging touches within ``zone_bins`` bins into one
+weighted zone with its touch counts.
+
+Streams are keyed by (symbol, timeframe) and remember the last bar they
+consumed: a repeat scan with the same last bar is a cache hit, newer bars
+resume the ZigZag pass from its saved state, and only unrelated data (a gap
+or older history) triggers a rebuild. Swings that scroll out of a sliding
+fetch window stay in the histogram. ``save``/``load`` persist every stream
+as JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from candle_series import CandleSeries
+from swings import HIGH, LOW, ZigZagState, average_true_range, reversal_threshold, zigzag_pass
+
+ZONES_VERSION = 1
+DEFAULT_BIN_ATR = 0.25
+DEFAULT_ZONE_BINS = 2
+
+
+class Zone(NamedTuple):
+    low: float
+    high: float
+    center: float
+    touches: int
+    weight: float
+    support_touches: int
+    resistance_touches: int
+    last_touch: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        zone = self._asdict()
+        zone["last_touch"] = str(np.datetime64(self.last_touch, "s")).replace("T", " ")
+        return zone
+
+
+class ZoneHistogram:
+    """Swing touches on a fixed grid: bin ``origin + i`` covers ``[(origin + i) * bin_size, ...)``."""
+
+    __slots__ = ("bin_size", "origin", "touches", "weight", "price_sum", "highs", "last_time")
+
+    def __init__(self, bin_size: float) -> None:
+        self.bin_size = float(bin_size)
+        self.origin = 0
+        self.touches = np.zeros(0, dtype=np.int64)
+        self.weight = np.zeros(0)
+        self.price_sum = np.zeros(0)
+        self.highs = np.zeros(0, dtype=np.int64)
+        self.last_time = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.touches)
+
+    def add(self, times: np.ndarray, prices: np.ndarray, kinds: np.ndarray, weights: np.ndarray) -> None:
+        if not len(prices):
+            return
+        ids = np.floor(prices / self.bin_size).astype(np.int64)
+        self._cover(int(ids.min()), int(ids.max()))
+        position = ids - self.origin
+        size = len(self.touches)
+        self.touches += np.bincount(position, minlength=size)
+        self.weight += np.bincount(position, weights, minlength=size)
+        self.price_sum += np.bincount(position, weights * prices, minlength=size)
+        self.highs += np.bincount(position[kinds == HIGH], minlength=size)
+        np.maximum.at(self.last_time, position, times)
+
+    def _cover(self, first: int, last: int) -> None:
+        if not len(self.touches):
+            self.origin = first
+        before = max(self.origin - first, 0)
+        after = max(last - (self.origin + len(self.touches) - 1), 0)
+        if before or after:
+            for name in ("touches", "weight", "price_sum", "highs", "last_time"):
+                setattr(self, name, np.pad(getattr(self, name), (before, after)))
+            self.origin -= before
+
+    def zones(self, radius: int = DEFAULT_ZONE_BINS) -> List[Zone]:
+        """Zones grown from the heaviest untaken bin over touched bins within ``radius``, lowest price first."""
+        touched = np.flatnonzero(self.touches)
+        taken = np.zeros(len(self.touches), dtype=bool)
+        zones: List[Zone] = []
+        for peak in touched[np.argsort(-self.weight[touched], kind="stable")]:
+            if taken[peak]:
+                continue
+            window = slice(max(peak - radius, 0), peak + radius + 1)
+            members = np.flatnonzero((self.touches[window] > 0) & ~taken[window]) + window.start
+            taken[members] = True
+            weight = float(self.weight[members].sum())
+            touches = int(self.touches[members].sum())
+            highs = int(self.highs[members].sum())
+            zones.append(
+                Zone(
+                    low=float((self.origin + members[0]) * self.bin_size),
+                    high=float((self.origin + members[-1] + 1) * self.bin_size),
+                    center=float(self.price_sum[members].sum() / weight),
+                    touches=touches,
+                    weight=weight,
+                    support_touches=touches - highs,
+                    resistance_touches=highs,
+                    last_touch=int(self.last_time[members].max()),
+                )
+            )
+        return sorted(zones, key=lambda zone: zone.center)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "bin_size": self.bin_size,
+            "origin": self.origin,
+            **{name: getattr(self, name).tolist() for name in ("touches", "weight", "price_sum", "highs", "last_time")},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ZoneHistogram":
+        histogram = cls(data["bin_size"])
+        histogram.origin = int(data["origin"])
+        histogram.touches = np.asarray(data["touches"], dtype=np.int64)
+        histogram.weight = np.asarray(data["weight"], dtype=np.float64)
+        histogram.price_sum = np.asarray(data["price_sum"], dtype=np.float64)
+        histogram.highs = np.asarray(data["highs"], dtype=np.int64)
+        histogram.last_time = np.asarray(data["last_time"], dtype=np.int64)
+        return histogram
+
+
+class _Stream:
+    """One (symbol, timeframe): histogram, ZigZag state and the last bar consumed."""
+
+    __slots__ = ("histogram", "zigzag", "last_bar", "last_high", "last_low", "_zones")
+
+    def __init__(self, histogram: ZoneHistogram) -> None:
+        self.histogram = histogram
+        self.zigzag: Optional[ZigZagState] = None
+        self.last_bar = 0
+        self.last_high = float("nan")
+        self.last_low = float("nan")
+        self._zones: Optional[List[Zone]] = None
+
+    def consume(self, series: CandleSeries, reversal: np.ndarray) -> None:
+        times, prices, kinds, self.zigzag = zigzag_pass(
+            series.time.tolist(), series.high.tolist(), series.low.tolist(), reversal.tolist(), self.zigzag
+        )
+        self.last_bar = int(series.time[-1])
+        if not times:
+            return
+        prices_array = np.asarray(prices)
+        kinds_array = np.asarray(kinds, dtype=np.int8)
+        previous = np.concatenate(([self.last_high if kinds[0] == LOW else self.last_low], prices_array[:-1]))
+        # Each touch weighs the leg that ran into it, in bins (at least one).
+        legs = np.abs(prices_array - previous) / self.histogram.bin_size
+        weights = np.maximum(np.nan_to_num(legs, nan=1.0), 1.0)
+        self.histogram.add(np.asarray(times, dtype=np.int64), prices_array, kinds_array, weights)
+        highs, lows = prices_array[kinds_array == HIGH], prices_array[kinds_array == LOW]
+        self.last_high = float(highs[-1]) if len(highs) else self.last_high
+        self.last_low = float(lows[-1]) if len(lows) else self.last_low
+        self._zones = None
+
+    def zones(self, radius: int) -> List[Zone]:
+        if self._zones is None:
+            self._zones = self.histogram.zones(radius)
+        return self._zones
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "histogram": self.histogram.to_json(),
+            "zigzag": self.zigzag.to_json() if self.zigzag else None,
+            "last_bar": self.last_bar,
+            "last_high": self.last_high,
+            "last_low": self.last_low,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "_Stream":
+        stream = cls(ZoneHistogram.from_json(data["histogram"]))
+        stream.zigzag = ZigZagState.from_json(data["zigzag"]) if data.get("zigzag") else None
+        stream.last_bar = int(data["last_bar"])
+        stream.last_high = float(data["last_high"])
+        stream.last_low = float(data["last_low"])
+        return stream
+
+
+class SRZoneEngine:
+    """
+    Cached, incrementally updated swing-histogram zones per (symbol, timeframe).
+
+    ``threshold``/``mode``/``atr_period`` configure the ZigZag (see
+    ``swings.zigzag``); bins are ``bin_atr`` ATRs wide, fixed when a stream
+    is first built, and zones merge touched bins within ``zone_bins``.
+
+    Streams only take closed bars: a bar consumed with its partial
+    high/low would never be read again. With ``forming=True`` (live MCP
+    series) the last bar is left out and consumed, final, by a later update.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 3.0,
+        mode: str = "atr",
+        atr_period: int = 14,
+        bin_atr: float = DEFAULT_BIN_ATR,
+        zone_bins: int = DEFAULT_ZONE_BINS,
+    ) -> None:
+        self.threshold = threshold
+        self.mode = mode
+        self.atr_period = atr_period
+        self.bin_atr = bin_atr
+        self.zone_bins = zone_bins
+        self._streams: Dict[str, _Stream] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.updates = 0
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def update(self, symbol: str, timeframe: str, series: CandleSeries, forming: bool = False) -> List[Zone]:
+        """Zones of the stream after ``series``; bars already consumed are skipped."""
+        key = _key(symbol, timeframe)
+        if forming:
+            series = series[:-1]
+        with self._lock:
+            if not len(series):
+                stream = self._streams.get(key)
+                return stream.zones(self.zone_bins) if stream else []
+            stream = self._streams.get(key)
+            last = int(series.time[-1])
+            if stream is not None and stream.last_bar == last:
+                self.hits += 1
+                return stream.zones(self.zone_bins)
+            resume = 0
+            if stream is not None and int(series.time[0]) <= stream.last_bar < last:
+                resume = int(np.searchsorted(series.time, stream.last_bar, side="right"))
+                if series.time[resume - 1] != stream.last_bar:
+                    resume = 0
+            if resume:
+                # The ATR of the first new bars needs the bars before them.
+                warmup = max(resume - self.atr_period, 0)
+                reversal = self._reversal(series[warmup:])[resume - warmup :]
+                stream.consume(series[resume:], reversal)
+                self.updates += 1
+            else:
+                stream = _Stream(ZoneHistogram(self._bin_size(series)))
+                stream.consume(series, self._reversal(series))
+                self._streams[key] = stream
+                self.rebuilds += 1
+            return stream.zones(self.zone_bins)
+
+    def levels(
+        self, symbol: str, timeframe: str, series: CandleSeries, price: float, count: int = 3, forming: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Nearest zones around ``price`` in the ``levels_by_timeframe`` shape.
+
+        ``support``/``resistance`` are zone centres below/above ``price``,
+        nearest first, with the zones themselves (and their ``side``) under
+        ``zones``; ``pivot``
+        is the floor pivot of the last confirmed swing high, swing low and
+        ``price``.
+        """
+        zones = self.update(symbol, timeframe, series, forming)
+        below = sorted((zone for zone in zones if zone.center < price), key=lambda zone: price - zone.center)[:count]
+        above = sorted((zone for zone in zones if zone.center > price), key=lambda zone: zone.center - price)[:count]
+        stream = self._streams.get(_key(symbol, timeframe))
+        pivot = None
+        if stream is not None and not np.isnan(stream.last_high) and not np.isnan(stream.last_low):
+            pivot = (stream.last_high + stream.last_low + price) / 3.0
+        return {
+            "support": [zone.center for zone in below],
+            "resistance": [zone.center for zone in above],
+            "pivot": pivot,
+            "zones": [dict(zone.to_dict(), side="support") for zone in below]
+            + [dict(zone.to_dict(), side="resistance") for zone in above],
+        }
+
+    def levels_by_timeframe(
+        self,
+        symbol: str,
+        series_by_timeframe: Mapping[str, CandleSeries],
+        price: float,
+        count: int = 3,
+        forming: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        return {
+            timeframe: self.levels(symbol, timeframe, series, price, count, forming)
+            for timeframe, series in series_by_timeframe.items()
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {"streams": len(self._streams), "hits": self.hits, "updates": self.updates, "rebuilds": self.rebuilds}
+
+    def _reversal(self, series: CandleSeries) -> np.ndarray:
+        return reversal_threshold(series, self.threshold, self.mode, self.atr_period)
+
+    def _bin_size(self, series: CandleSeries) -> float:
+        atr = float(np.mean(average_true_range(series.high, series.low, series.close, self.atr_period)))
+        if atr > 0:
+            return atr * self.bin_atr
+        return max(float(np.abs(series.close).mean()) * 1e-4, 1e-9)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "version": ZONES_VERSION,
+            "settings": {
+                "threshold": self.threshold,
+                "mode": self.mode,
+                "atr_period": self.atr_period,
+                "bin_atr": self.bin_atr,
+                "zone_bins": self.zone_bins,
+            },
+            "streams": {key: stream.to_json() for key, stream in self._streams.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SRZoneEngine":
+        if state.get("version") != ZONES_VERSION:
+            raise ValueError(f"Unsupported zone state version: {state.get('version')!r}")
+        engine = cls(**state.get("settings", {}))
+        engine._streams = {key: _Stream.from_json(data) for key, data in state.get("streams", {}).items()}
+        return engine
+
+    def save(self, path: Path | str) -> Path:
+        """Write ``state()`` atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(path.name + ".tmp")
+        with self._lock:
+            temp.write_text(json.dumps(self.state(), separators=(",", ":")), encoding="utf-8")
+        os.replace(temp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path | str) -> "SRZoneEngine":
+        """Restore a saved engine (its settings win); a missing file gives a fresh one."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        return cls.from_state(json.loads(path.read_text(encoding="utf-8")))
+
+
+def _key(symbol: str, timeframe: str) -> str:
+    return f"{symbol.upper()}|{timeframe.upper()}"
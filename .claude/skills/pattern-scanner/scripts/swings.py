@@ -0,0 +1,336 @@
+"""
+Swing highs/lows (fractals and ZigZag) shared by S/R, Fibonacci and chart-pattern code.
+
+Rolling ``max``/``min`` windows only say where the extreme of the last N bars
+is; they move every bar and ignore market structure. Swing points are the
+turning points themselves: computed once per series, they give support and
+resistance levels, the leg a Fibonacci retracement is drawn on, and the
+high/low sequence chart patterns (double tops, triangles, head and shoulders)
+are matched against.
+
+``zigzag`` is a single pass over the bars: it follows the running extreme of
+the current leg and confirms it as a swing once price reverses by the
+threshold (percent of price, ATR multiple or fixed points). ``fractal_swings``
+marks bars whose high/low beats ``left`` bars before and ``right`` bars after,
+vectorised over a sliding window. Both return ``SwingPoints``: compact,
+strictly alternating index/time/price/kind arrays.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from candle_series import CandleSeries
+
+HIGH = 1
+LOW = -1
+THRESHOLD_MODES = ("percent", "atr", "points")
+FIB_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+
+
+class SwingPoints:
+    """
+    Alternating swing highs (``kind == 1``) and lows (``kind == -1``), oldest first.
+
+    ``pending`` marks the last point as the running extreme of the current,
+    not yet reversed leg; it may still move as new bars arrive.
+    """
+
+    __slots__ = ("index", "time", "price", "kind", "pending")
+
+    def __init__(self, index: np.ndarray, time: np.ndarray, price: np.ndarray, kind: np.ndarray, pending: bool = False) -> None:
+        self.index = np.asarray(index, dtype=np.int64)
+        self.time = np.asarray(time, dtype=np.int64)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.pending = bool(pending) and len(self.index) > 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return f"SwingPoints({len(self)} points{', last pending' if self.pending else ''})"
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self.price[self.kind == HIGH]
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self.price[self.kind == LOW]
+
+    def confirmed(self) -> "SwingPoints":
+        """Without the pending point."""
+        if not self.pending:
+            return self
+        return SwingPoints(self.index[:-1], self.time[:-1], self.price[:-1], self.kind[:-1])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        stamps = np.datetime_as_string(self.time.astype("datetime64[s]"), unit="s")
+        return [
+            {
+                "index": index,
+                "time": stamp.replace("T", " "),
+                "price": price,
+                "type": "high" if kind == HIGH else "low",
+                "pending": self.pending and position == len(self) - 1,
+            }
+            for position, (index, stamp, price, kind) in enumerate(
+                zip(self.index.tolist(), stamps.tolist(), self.price.tolist(), self.kind.tolist())
+            )
+        ]
+
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple moving average of the true range; the first ``period - 1`` bars average what is available."""
+    high, low, close = (np.asarray(values, dtype=np.float64) for values in (high, low, close))
+    if not len(close):
+        return np.empty(0)
+    previous = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum(high, previous) - np.minimum(low, previous)
+    total = np.concatenate(([0.0], np.cumsum(true_range)))
+    ends = np.arange(1, len(close) + 1)
+    starts = np.maximum(ends - period, 0)
+    return (total[ends] - total[starts]) / (ends - starts)
+
+
+def reversal_threshold(
+    series: CandleSeries,
+    threshold: float,
+    mode: str = "percent",
+    atr_period: int = 14,
+) -> np.ndarray:
+    """Per-bar price move that confirms a swing at that bar."""
+    if mode == "percent":
+        return series.close * (threshold / 100.0)
+    if mode == "atr":
+        return average_true_range(series.high, series.low, series.close, atr_period) * threshold
+    if mode == "points":
+        return np.full(len(series), float(threshold))
+    raise ValueError(f"Unknown threshold mode {mode!r}; expected one of {', '.join(THRESHOLD_MODES)}.")
+
+
+class ZigZagState(NamedTuple):
+    """Where a ZigZag pass stopped: leg direction (0 before the first swing), running extremes, last swing price."""
+
+    direction: int
+    top_time: int
+    top_price: float
+    top_reversal: float
+    bottom_time: int
+    bottom_price: float
+    bottom_reversal: float
+    last_price: float
+    last_time: int
+
+    def to_json(self) -> List[Any]:
+        return list(self)
+
+    @classmethod
+    def from_json(cls, values: Sequence[Any]) -> "ZigZagState":
+        return cls(*values)
+
+
+def zigzag_pass(
+    time: Sequence[int],
+    high: Sequence[float],
+    low: Sequence[float],
+    reversal: Sequence[float],
+    state: Optional[ZigZagState] = None,
+) -> Tuple[List[int], List[float], List[int], Optional[ZigZagState]]:
+    """
+    Confirmed swings (times, prices, kinds) of these bars, continuing from ``state``.
+
+    Feeding a series in consecutive chunks, each with the state the previous
+    chunk returned, gives the same swings as one pass over the whole series.
+    """
+    times: List[int] = []
+    prices: List[float] = []
+    kinds: List[int] = []
+    bars = zip(time, high, low, reversal)
+    if state is None:
+        first = next(bars, None)
+        if first is None:
+            return times, prices, kinds, None
+        bar_time, bar_high, bar_low, bar_reversal = first
+        state = ZigZagState(0, bar_time, bar_high, bar_reversal, bar_time, bar_low, bar_reversal, float("nan"), bar_time)
+    direction, top_time, top, top_rev, bottom_time, bottom, bottom_rev, last, last_time = state
+
+    for bar_time, bar_high, bar_low, bar_reversal in bars:
+        if direction > 0:
+            if bar_high > top:
+                top_time, top, top_rev = bar_time, bar_high, bar_reversal
+            elif top - bar_low >= top_rev or bar_low < last:
+                times.append(top_time)
+                prices.append(top)
+                kinds.append(HIGH)
+                direction, last, last_time = -1, top, top_time
+                bottom_time, bottom, bottom_rev = bar_time, bar_low, bar_reversal
+        elif direction < 0:
+            if bar_low < bottom:
+                bottom_time, bottom, bottom_rev = bar_time, bar_low, bar_reversal
+            elif bar_high - bottom >= bottom_rev or bar_high > last:
+                times.append(bottom_time)
+                prices.append(bottom)
+                kinds.append(LOW)
+                direction, last, last_time = 1, bottom, bottom_time
+                top_time, top, top_rev = bar_time, bar_high, bar_reversal
+        else:
+            # No leg yet: the first move of threshold size from either extreme sets the direction.
+            if bar_high > top:
+                top_time, top, top_rev = bar_time, bar_high, bar_reversal
+            if bar_low < bottom:
+                bottom_time, bottom, bottom_rev = bar_time, bar_low, bar_reversal
+            if top_time > bottom_time and top - bottom >= bottom_rev:
+                times.append(bottom_time)
+                prices.append(bottom)
+                kinds.append(LOW)
+                direction, last, last_time = 1, bottom, bottom_time
+            elif bottom_time > top_time and top - bottom >= top_rev:
+                times.append(top_time)
+                prices.append(top)
+                kinds.append(HIGH)
+                direction, last, last_time = -1, top, top_time
+    state = ZigZagState(direction, top_time, top, top_rev, bottom_time, bottom, bottom_rev, last, last_time)
+    return times, prices, kinds, state
+
+
+def zigzag(
+    series: CandleSeries,
+    threshold: float = 3.0,
+    mode: str = "atr",
+    atr_period: int = 14,
+    include_pending: bool = True,
+) -> SwingPoints:
+    """
+    ZigZag swings: a leg's extreme is confirmed once price reverses from it by the threshold.
+
+    ``mode`` reads ``threshold`` as a percent of the close, an ATR multiple
+    (the default, so one setting suits every timeframe) or absolute points,
+    measured at the extreme's bar. Breaking the previous swing's extreme
+    also ends a leg, so every leg spans its own high and low even when the
+    threshold varies between bars. One O(n) pass over plain lists
+    (``zigzag_pass``); the running extreme of the last leg is appended as
+    pending unless ``include_pending`` is False.
+    """
+    reversal = reversal_threshold(series, threshold, mode, atr_period)
+    times, prices, kinds, state = zigzag_pass(
+        series.time.tolist(), series.high.tolist(), series.low.tolist(), reversal.tolist()
+    )
+    pending = include_pending and state is not None and state.direction != 0
+    if pending:
+        up = state.direction > 0
+        times.append(state.top_time if up else state.bottom_time)
+        prices.append(state.top_price if up else state.bottom_price)
+        kinds.append(HIGH if up else LOW)
+    time = np.asarray(times, dtype=np.int64)
+    return SwingPoints(np.searchsorted(series.time, time), time, prices, kinds, pending)
+
+
+def _alternate(index: np.ndarray, kind: np.ndarray, price: np.ndarray) -> np.ndarray:
+    """Positions keeping the most extreme point of every run of same-kind swings."""
+    if not len(index):
+        return index
+    run = np.concatenate(([0], np.cumsum(kind[1:] != kind[:-1])))
+    # Within a run: highest high / lowest low first, earliest bar on ties.
+    order = np.lexsort((index, -price * kind, run))
+    first = np.concatenate(([True], run[order][1:] != run[order][:-1]))
+    return np.sort(order[first])
+
+
+def fractal_swings(series: CandleSeries, left: int = 2, right: int = 2) -> SwingPoints:
+    """
+    Williams-style fractals reduced to alternating swings.
+
+    A swing high is a bar whose high beats the ``left`` previous highs and is
+    not exceeded by the ``right`` next ones (ties go to the earliest bar);
+    lows mirror it. Consecutive highs (or lows) keep only the most extreme.
+    """
+    width = left + right + 1
+    if len(series) < width:
+        return SwingPoints([], [], [], [])
+    windows_high = np.lib.stride_tricks.sliding_window_view(series.high, width)
+    windows_low = np.lib.stride_tricks.sliding_window_view(series.low, width)
+    is_high = np.argmax(windows_high, axis=1) == left
+    is_low = np.argmin(windows_low, axis=1) == left
+    high_index = np.flatnonzero(is_high) + left
+    low_index = np.flatnonzero(is_low) + left
+
+    index = np.concatenate((high_index, low_index))
+    kind = np.concatenate((np.full(len(high_index), HIGH, np.int8), np.full(len(low_index), LOW, np.int8)))
+    # A bar that is both (outside bar) sorts high-then-low; alternation keeps what fits.
+    order = np.lexsort((-kind, index))
+    index, kind = index[order], kind[order]
+    price = np.where(kind == HIGH, series.high[index], series.low[index])
+    keep = _alternate(index, kind, price)
+    index, kind, price = index[keep], kind[keep], price[keep]
+    return SwingPoints(index, series.time[index], price, kind)
+
+
+def detect_swings(series: CandleSeries, method: str = "zigzag", **options: Any) -> SwingPoints:
+    """``zigzag`` (default) or ``fractal`` swings with that function's options."""
+    if method == "zigzag":
+        return zigzag(series, **options)
+    if method == "fractal":
+        return fractal_swings(series, **options)
+    raise ValueError(f"Unknown swing method {method!r}; expected 'zigzag' or 'fractal'.")
+
+
+def swings_by_timeframe(series_by_timeframe: Mapping[str, CandleSeries], **options: Any) -> Dict[str, SwingPoints]:
+    return {timeframe: detect_swings(series, **options) for timeframe, series in series_by_timeframe.items()}
+
+
+def swing_levels(swings: SwingPoints, price: float, count: int = 3, tolerance: float = 0.0) -> Dict[str, Any]:
+    """
+    Nearest swing-based levels around ``price`` in the ``levels_by_timeframe`` shape.
+
+    ``resistance``: confirmed swing prices above ``price``, nearest first;
+    ``support``: those below. Levels closer than ``tolerance`` to an already
+    listed, nearer one are merged into it. ``pivot`` is the floor pivot of the
+    last confirmed swing high, swing low and ``price``.
+    """
+    confirmed = swings.confirmed()
+    above = np.sort(confirmed.price[confirmed.price > price])
+    below = np.sort(confirmed.price[confirmed.price < price])[::-1]
+    highs, lows = confirmed.highs, confirmed.lows
+    pivot = float(highs[-1] + lows[-1] + price) / 3.0 if len(highs) and len(lows) else None
+    return {
+        "resistance": _distinct(above, count, tolerance),
+        "support": _distinct(below, count, tolerance),
+        "pivot": pivot,
+    }
+
+
+def _distinct(levels: Sequence[float], count: int, tolerance: float) -> List[float]:
+    kept: List[float] = []
+    for level in levels:
+        if len(kept) == count:
+            break
+        if not kept or abs(level - kept[-1]) > tolerance:
+            kept.append(float(level))
+    return kept
+
+
+def levels_by_timeframe(
+    swings: Mapping[str, SwingPoints], price: float, count: int = 3, tolerance: float = 0.0
+) -> Dict[str, Dict[str, Any]]:
+    return {timeframe: swing_levels(points, price, count, tolerance) for timeframe, points in swings.items()}
+
+
+def fibonacci_levels(swings: SwingPoints, ratios: Iterable[float] = FIB_RATIOS) -> Optional[Dict[str, Any]]:
+    """
+    Retracement prices of the last leg (pending extreme included), or None with fewer than two swings.
+
+    An up leg (low -> high) retraces downwards from the high; a down leg upwards from the low.
+    """
+    if len(swings) < 2:
+        return None
+    start, end = float(swings.price[-2]), float(swings.price[-1])
+    return {
+        "direction": "up" if end > start else "down",
+        "start": start,
+        "end": end,
+        "levels": {ratio: end - (end - start) * ratio for ratio in ratios},
+    }
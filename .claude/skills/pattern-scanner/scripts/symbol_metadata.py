@@ -0,0 +1,190 @@
+"""
+Per-symbol price metadata and integer point conversion.
+
+A flat ``price_delta * 10000`` pip conversion only holds for 5-digit FX
+majors: JPY crosses quote 3 digits, gold 2, indices 1 or 0.
+``SymbolInfo`` records what MT5 reports for each symbol (``digits``, point,
+pip size, contract size) and ``SymbolRegistry`` resolves it for a name,
+falling back to name rules (``*JPY``, ``XAU*``...) and, when sample prices are
+available, to the decimals actually quoted.
+
+``to_points`` turns float prices into exact int64 multiples of the point
+(``1.1638600000000001`` -> ``116386``), so rules and clustering can compare
+integers instead of noisy floats; ``CandleSeries.to_points`` builds the
+columnar form.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional, Set
+
+import numpy as np
+
+DEFAULT_DIGITS = 5
+MAX_DIGITS = 8
+
+
+class SymbolInfo(NamedTuple):
+    symbol: str
+    digits: int
+    pip_size: float
+    contract_size: float = 100000.0
+
+    @property
+    def point(self) -> float:
+        return 10.0 ** -self.digits
+
+    @property
+    def points_per_pip(self) -> int:
+        return int(round(self.pip_size / self.point))
+
+    def pips(self, distance: float) -> float:
+        """Price distance expressed in pips."""
+        return distance / self.pip_size
+
+    def format_price(self, price: float) -> str:
+        return f"{price:.{self.digits}f}"
+
+
+def _fx(symbol: str, digits: int = 5) -> SymbolInfo:
+    # FX convention: a pip is the fourth decimal (second for JPY), i.e. 10 points on fractional quotes.
+    return SymbolInfo(symbol, digits, 10.0 ** -(digits - 1 if digits in (3, 5) else digits))
+
+
+KNOWN_SYMBOLS: Dict[str, SymbolInfo] = {
+    info.symbol: info
+    for info in (
+        _fx("EURUSD"),
+        _fx("GBPUSD"),
+        _fx("AUDUSD"),
+        _fx("NZDUSD"),
+        _fx("USDCHF"),
+        _fx("USDCAD"),
+        _fx("EURGBP"),
+        _fx("EURCHF"),
+        _fx("USDJPY", 3),
+        _fx("EURJPY", 3),
+        _fx("GBPJPY", 3),
+        _fx("AUDJPY", 3),
+        SymbolInfo("XAUUSD", 2, 0.1, 100.0),
+        SymbolInfo("XAGUSD", 3, 0.01, 5000.0),
+        SymbolInfo("BTCUSD", 2, 1.0, 1.0),
+        SymbolInfo("US30", 1, 1.0, 1.0),
+        SymbolInfo("NAS100", 1, 1.0, 1.0),
+        SymbolInfo("SPX500", 1, 1.0, 1.0),
+    )
+}
+
+
+def guess_symbol_info(symbol: str) -> SymbolInfo:
+    """Best guess from the symbol name alone (broker suffixes like ``.m`` are ignored)."""
+    name = symbol.upper().split(".")[0]
+    if name in KNOWN_SYMBOLS:
+        return KNOWN_SYMBOLS[name]._replace(symbol=symbol.upper())
+    if name.startswith("XAU"):
+        return KNOWN_SYMBOLS["XAUUSD"]._replace(symbol=symbol.upper())
+    if name.startswith("XAG"):
+        return KNOWN_SYMBOLS["XAGUSD"]._replace(symbol=symbol.upper())
+    return _fx(symbol.upper(), 3 if "JPY" in name else DEFAULT_DIGITS)
+
+
+def infer_digits(prices: Iterable[float] | np.ndarray, max_digits: int = MAX_DIGITS) -> Optional[int]:
+    """Fewest decimals that represent every price exactly (``None`` if more than ``max_digits``)."""
+    values = np.asarray(prices if isinstance(prices, np.ndarray) else list(prices), dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    for digits in range(max_digits + 1):
+        scaled = values * 10.0 ** digits
+        if np.all(np.abs(scaled - np.rint(scaled)) <= 1e-9 * np.maximum(1.0, np.abs(scaled))):
+            return digits
+    return None
+
+
+class SymbolRegistry:
+    """Thread-safe symbol -> ``SymbolInfo`` map (broker data, then known table, then name rules)."""
+
+    def __init__(self, symbols: Optional[Dict[str, SymbolInfo]] = None) -> None:
+        self._lock = threading.Lock()
+        self._symbols: Dict[str, SymbolInfo] = {}
+        self._guessed: Set[str] = set()
+        for info in (symbols or {}).values():
+            self.register(info)
+
+    def register(self, info: SymbolInfo) -> None:
+        if not 0 <= info.digits <= MAX_DIGITS or info.pip_size <= 0:
+            raise ValueError(f"Invalid metadata for {info.symbol}: digits={info.digits}, pip={info.pip_size}")
+        with self._lock:
+            self._symbols[info.symbol.upper()] = info._replace(symbol=info.symbol.upper())
+            self._guessed.discard(info.symbol.upper())
+
+    def register_broker_info(self, symbol: str, payload: Dict[str, object]) -> SymbolInfo:
+        """Register from an MT5 ``symbol_info``-style dict (``digits``, ``point``, ``trade_contract_size``)."""
+        guess = guess_symbol_info(symbol)
+        if "digits" in payload:
+            digits = int(payload["digits"])  # type: ignore[arg-type]
+        elif payload.get("point"):
+            digits = int(round(-np.log10(float(payload["point"]))))  # type: ignore[arg-type]
+        else:
+            digits = guess.digits
+        # The pip is a quoting convention (4th decimal, 2nd for JPY), not the broker's precision.
+        pip_size = max(guess.pip_size, 10.0 ** -digits)
+        contract = payload.get("trade_contract_size") or payload.get("contract_size") or guess.contract_size
+        info = SymbolInfo(symbol.upper(), digits, pip_size, float(contract))  # type: ignore[arg-type]
+        self.register(info)
+        return info
+
+    def get(self, symbol: str, prices: Optional[Iterable[float] | np.ndarray] = None) -> SymbolInfo:
+        """
+        Metadata for ``symbol``; unknown symbols are guessed from the name, widened to fit ``prices``.
+
+        Only guesses that have seen prices are kept, and a later call whose
+        prices quote more decimals widens them again; a name-only guess is
+        never cached, so it cannot pin the digits of a symbol too low.
+        """
+        key = symbol.upper()
+        with self._lock:
+            info = self._symbols.get(key)
+            guessed = key in self._guessed
+        if info is not None and (not guessed or prices is None):
+            return info
+        info = info or guess_symbol_info(key)
+        if prices is None:
+            return info
+        digits = infer_digits(prices)
+        if digits is not None and digits > info.digits:
+            info = info._replace(digits=digits)
+        with self._lock:
+            current = self._symbols.get(key)
+            if current is not None and (key not in self._guessed or current.digits >= info.digits):
+                return current
+            self._symbols[key] = info
+            self._guessed.add(key)
+            return info
+
+    def __contains__(self, symbol: str) -> bool:
+        with self._lock:
+            return symbol.upper() in self._symbols
+
+
+_default_registry = SymbolRegistry()
+
+
+def get_symbol_info(symbol: str, prices: Optional[Iterable[float] | np.ndarray] = None) -> SymbolInfo:
+    """``SymbolRegistry.get`` on the process-wide registry."""
+    return _default_registry.get(symbol, prices)
+
+
+def register_symbol(info: SymbolInfo) -> None:
+    _default_registry.register(info)
+
+
+def to_points(prices: np.ndarray | float, digits: int) -> np.ndarray:
+    """Prices as exact int64 multiples of ``10**-digits`` (rounded half away from zero)."""
+    scaled = np.asarray(prices, dtype=np.float64) * 10.0 ** digits
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+def from_points(points: np.ndarray | int, digits: int) -> np.ndarray:
+    return np.asarray(points, dtype=np.int64) / 10.0 ** digits
@@ -0,0 +1,175 @@
+"""
+Fixed-format timestamp decoding straight to int64 epoch seconds.
+
+MT5 bar times arrive as ``YYYY-MM-DD HH:MM:SS`` with an optional ``+HH:MM`` /
+``-HH:MM`` UTC offset. Instead of handing those strings to ``pd.to_datetime``
+(or NumPy's generic ISO parser) ``decode_timestamps`` views a ``(rows, width)``
+byte matrix as packed little-endian words, decodes two or four digits per
+word with SWAR arithmetic and converts the civil date with the days-from-civil
+formula, so the whole column costs a few dozen integer array operations.
+Inputs are validated (digit positions, separators, month/day/hour ranges);
+anything else raises ``ValueError`` so callers can fall back to a general
+parser.
+
+Datetime objects are only needed at presentation edges (HTML reports, console
+output); everything in between keeps int64 epoch seconds.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+TIMESTAMP_WIDTH = 19  # "YYYY-MM-DD HH:MM:SS"
+OFFSET_WIDTH = 6  # "+HH:MM"
+
+# Fields are read as little-endian words straight out of each row (a
+# structured view, no copy).
+_FIELDS = {
+    "names": [
+        "year", "month", "day", "hour", "minute", "second",
+        "sep_date1", "sep_date2", "sep_day", "sep_time1", "sep_time2",
+    ],
+    "formats": ["<u4", "<u2", "<u2", "<u2", "<u2", "<u2", "u1", "u1", "u1", "u1", "u1"],
+    "offsets": [0, 5, 8, 11, 14, 17, 4, 7, 10, 13, 16],
+}
+_OFFSET_FIELDS = {
+    "names": ["sign", "offset_hours", "colon", "offset_minutes"],
+    "formats": ["u1", "<u2", "u1", "<u2"],
+    "offsets": [0, 1, 3, 4],
+}
+_SEPARATORS = {"sep_date1": b"-", "sep_date2": b"-", "sep_time1": b":", "sep_time2": b":"}
+_DAY_SEPARATORS = (ord(" "), ord("T"))
+_DAYS_IN_MONTH = np.array([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int32)
+
+
+def decode_timestamps(chars: np.ndarray) -> np.ndarray:
+    """
+    Epoch seconds for a ``(rows, 19)`` or ``(rows, 25)`` ``uint8`` matrix of timestamps.
+
+    The 25-byte form carries a ``+HH:MM``/``-HH:MM`` suffix that is applied
+    to get UTC; the 19-byte form is taken as UTC already.
+    """
+    chars = np.ascontiguousarray(chars, dtype=np.uint8)
+    if chars.ndim != 2 or chars.shape[1] not in (TIMESTAMP_WIDTH, TIMESTAMP_WIDTH + OFFSET_WIDTH):
+        raise ValueError("Timestamps must be a (rows, 19) or (rows, 25) byte matrix.")
+    if not chars.shape[0]:
+        return np.empty(0, dtype=np.int64)
+
+    rows = chars.view(_ROW_DTYPES[chars.shape[1]]).ravel()
+    for name, separator in _SEPARATORS.items():
+        if (rows[name] != ord(separator)).any():
+            raise ValueError("Unexpected timestamp separator.")
+    day_separator = rows["sep_day"]
+    if ((day_separator != _DAY_SEPARATORS[0]) & (day_separator != _DAY_SEPARATORS[1])).any():
+        raise ValueError("Unexpected date/time separator.")
+
+    year = _four_digits(rows["year"])
+    month = _two_digits(rows["month"])
+    day = _two_digits(rows["day"])
+    hour = _two_digits(rows["hour"])
+    minute = _two_digits(rows["minute"])
+    second = _two_digits(rows["second"])
+
+    if ((month < 1) | (month > 12)).any():
+        raise ValueError("Month out of range.")
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _DAYS_IN_MONTH[month] - ((month == 2) & ~leap)
+    if ((day < 1) | (day > month_days) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        raise ValueError("Timestamp field out of range.")
+
+    seconds = hour * 3600 + minute * 60 + second
+    if chars.shape[1] > TIMESTAMP_WIDTH:
+        seconds -= _offset_seconds(rows)
+    return days_from_civil(year, month, day).astype(np.int64) * 86400 + seconds
+
+
+def decode_offsets(chars: np.ndarray) -> np.ndarray:
+    """Seconds east of UTC for a ``(rows, 6)`` matrix of ``+HH:MM`` / ``-HH:MM`` suffixes."""
+    chars = np.ascontiguousarray(chars, dtype=np.uint8)
+    if chars.ndim != 2 or chars.shape[1] != OFFSET_WIDTH:
+        raise ValueError("Offsets must be a (rows, 6) byte matrix.")
+    return _offset_seconds(chars.view(_OFFSET_DTYPE).ravel())
+
+
+def _row_dtype(width: int) -> np.dtype:
+    fields = {key: list(values) for key, values in _FIELDS.items()}
+    if width > TIMESTAMP_WIDTH:
+        fields["names"] += _OFFSET_FIELDS["names"]
+        fields["formats"] += _OFFSET_FIELDS["formats"]
+        fields["offsets"] += [TIMESTAMP_WIDTH + offset for offset in _OFFSET_FIELDS["offsets"]]
+    return np.dtype(dict(fields, itemsize=width))
+
+
+_ROW_DTYPES = {width: _row_dtype(width) for width in (TIMESTAMP_WIDTH, TIMESTAMP_WIDTH + OFFSET_WIDTH)}
+_OFFSET_DTYPE = np.dtype(dict(_OFFSET_FIELDS, itemsize=OFFSET_WIDTH))
+
+
+def _offset_seconds(rows: np.ndarray) -> np.ndarray:
+    sign = rows["sign"]
+    # "+00:00" is by far the common case; skip the digit work when every row has it.
+    if (sign == ord("+")).all() and (rows["offset_hours"] == 0x3030).all() and (rows["offset_minutes"] == 0x3030).all():
+        if (rows["colon"] != ord(":")).any():
+            raise ValueError("Bad UTC offset.")
+        return np.zeros(len(rows), dtype=np.int32)
+    minus = sign == ord("-")
+    if not (minus | (sign == ord("+"))).all() or (rows["colon"] != ord(":")).any():
+        raise ValueError("Bad UTC offset.")
+    hours, minutes = _two_digits(rows["offset_hours"]), _two_digits(rows["offset_minutes"])
+    if ((hours > 23) | (minutes > 59)).any():
+        raise ValueError("Bad UTC offset.")
+    return np.where(minus, -1, 1).astype(np.int32) * (hours * 3600 + minutes * 60)
+
+
+def _two_digits(words: np.ndarray) -> np.ndarray:
+    """Decode two ASCII digits packed little-endian in a ``uint16`` ('1','2' -> 12)."""
+    # High nibble 3 and no carry into it when adding 6 <=> every byte is '0'..'9'.
+    if (((words & 0xF0F0) != 0x3030) | (((words + 0x0606) & 0xF0F0) != 0x3030)).any():
+        raise ValueError("Non-digit character in timestamp.")
+    digits = (words - np.uint16(0x3030)).astype(np.int32)
+    return (digits & 0xFF) * 10 + (digits >> 8)
+
+
+def _four_digits(words: np.ndarray) -> np.ndarray:
+    """Decode four ASCII digits packed little-endian in a ``uint32`` ('2025' -> 2025)."""
+    if (((words & 0xF0F0F0F0) != 0x30303030) | (((words + 0x06060606) & 0xF0F0F0F0) != 0x30303030)).any():
+        raise ValueError("Non-digit character in timestamp.")
+    digits = words - np.uint32(0x30303030)
+    pairs = (digits * np.uint32(10) + (digits >> np.uint32(8))) & np.uint32(0x00FF00FF)
+    return ((pairs & np.uint32(0xFFFF)) * np.uint32(100) + (pairs >> np.uint32(16))).astype(np.int32)
+
+
+def days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 for proleptic Gregorian dates (H. Hinnant's algorithm)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_timestamps(values: Iterable[str] | Sequence[bytes] | np.ndarray) -> np.ndarray:
+    """Epoch seconds for timestamp strings (mixed with/without offset is fine)."""
+    array = np.asarray(values if isinstance(values, np.ndarray) else list(values))
+    if array.dtype.kind == "U":
+        try:
+            array = np.char.encode(array, "ascii")
+        except UnicodeEncodeError as exc:
+            raise ValueError("Non-ASCII timestamp.") from exc
+    if array.dtype.kind != "S":
+        raise ValueError("Timestamps must be strings.")
+    if not array.shape[0]:
+        return np.empty(0, dtype=np.int64)
+
+    lengths = np.char.str_len(array)
+    epoch = np.empty(array.shape[0], dtype=np.int64)
+    for width in (TIMESTAMP_WIDTH, TIMESTAMP_WIDTH + OFFSET_WIDTH):
+        rows = lengths == width
+        if rows.any():
+            chars = np.ascontiguousarray(array[rows].astype(f"S{width}")).view(np.uint8).reshape(-1, width)
+            epoch[rows] = decode_timestamps(chars)
+    if not ((lengths == TIMESTAMP_WIDTH) | (lengths == TIMESTAMP_WIDTH + OFFSET_WIDTH)).all():
+        raise ValueError("Unexpected timestamp width.")
+    return epoch
@@ -0,0 +1,389 @@
+"""
+Single-pass NumPy indicator engine with shared intermediates.
+
+The SMA/EMA/RSI/MACD/Bollinger/Stochastic/ATR helpers copied between the
+analysis scripts each rebuild their own windows: Bollinger recomputes the
+SMA, MACD recomputes EMA(12) and EMA(26) next to any EMA request, and every
+rolling mean walks its window again. ``IndicatorEngine`` turns a requested
+indicator set into a dependency graph of small nodes (rolling sums from one
+prefix sum per source, EMAs, true range, rolling extremes), deduplicates
+identical nodes and evaluates the graph once in topological order. Values
+match the pandas definitions used by those scripts (``rolling().mean()``,
+``ewm(span, adjust=False)``, sample standard deviation, SMA-smoothed RSI
+and ATR), including pandas' exact results for windows of equal values.
+
+Indicator specs are ``kind`` or ``kind:param:param``::
+
+    sma:20  ema:12  rsi[:14]  macd[:12:26:9]  bb[:20:2]  stoch[:14:3]  atr[:14]
+
+Output names follow the scripts' column names: ``sma_20``, ``ema_12``,
+``rsi``, ``macd``/``macd_signal``/``macd_hist``, ``bb_upper``/``bb_middle``/
+``bb_lower``, ``stoch_k``/``stoch_d``, ``atr``; non-default parameters are
+appended (``rsi_7``, ``bb_50_2.5_upper``).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Node = Tuple[Any, ...]
+
+DEFAULT_INDICATORS = ("sma:20", "sma:50", "sma:200", "ema:12", "ema:26", "rsi", "macd", "bb", "stoch", "atr")
+# Largest growth of the scaled EMA terms inside one block (bounds cancellation error).
+EMA_BLOCK_RANGE = 1e3
+
+CLOSE: Node = ("input", "close")
+HIGH: Node = ("input", "high")
+LOW: Node = ("input", "low")
+
+
+def _column(data: Any, name: str) -> np.ndarray:
+    try:
+        values = data[name]
+    except (KeyError, TypeError, IndexError):
+        values = getattr(data, name)
+    return np.asarray(values, dtype=np.float64)
+
+
+# -- kernels -----------------------------------------------------------------
+
+
+def _prefix(values: np.ndarray) -> Tuple[int, float, np.ndarray, np.ndarray, np.ndarray]:
+    """From the first finite value: (first, reference, cumsum of x - reference, cumsum of bad values, finite tail)."""
+    finite = np.isfinite(values)
+    first = int(np.argmax(finite)) if finite.any() else len(values)
+    tail = values[first:]
+    good = finite[first:]
+    reference = float(tail[good].mean()) if good.any() else 0.0
+    centred = np.where(good, tail - reference, 0.0)
+    bad = np.concatenate(([0], np.cumsum(~good)))
+    return first, reference, np.concatenate(([0.0], np.cumsum(centred))), bad, centred
+
+
+def _window(prefix: np.ndarray, bad: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Window sums of a prefix array and the mask of windows without missing values."""
+    sums = prefix[period:] - prefix[:-period]
+    clean = (bad[period:] - bad[:-period]) == 0
+    return sums, clean
+
+
+def _runs(values: np.ndarray) -> np.ndarray:
+    """Length of the run of equal values ending at each bar (pandas returns windows inside one exactly)."""
+    index = np.arange(len(values))
+    if not len(values):
+        return index
+    change = np.ones(len(values), dtype=bool)
+    change[1:] = values[1:] != values[:-1]
+    return index - np.maximum.accumulate(np.where(change, index, 0)) + 1
+
+
+def _place(size: int, first: int, period: int, values: np.ndarray, clean: np.ndarray) -> np.ndarray:
+    out = np.full(size, np.nan)
+    if len(values):
+        out[first + period - 1 :] = np.where(clean, values, np.nan)
+    return out
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    """``ewm(span, adjust=False).mean()`` from the first finite value, evaluated block-wise in closed form."""
+    out = np.full(len(values), np.nan)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return out
+    first = int(np.argmax(finite))
+    x = values[first:]
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    out[first] = x[0]
+    x = x[1:]
+    if not len(x):
+        return out
+    # Inside a block y_k = decay^(k+1) * carry + alpha * sum_j decay^(k-j) x_j: one cumsum per block row.
+    block = max(1, min(len(x), int(math.log(EMA_BLOCK_RANGE) / -math.log(decay)) if decay > 0 else 1))
+    rows = -(-len(x) // block)
+    padded = np.zeros(rows * block)
+    padded[: len(x)] = x
+    steps = np.arange(block)
+    local = alpha * decay**steps * np.cumsum(padded.reshape(rows, block) * decay ** -steps, axis=1)
+    carries = np.empty(rows)
+    carry = float(out[first])
+    tail_decay = decay**block
+    ends = local[:, -1].tolist()
+    for row in range(rows):
+        carries[row] = carry
+        carry = tail_decay * carry + ends[row]
+    result = decay ** (steps + 1) * carries[:, None] + local
+    out[first + 1 :] = result.ravel()[: len(x)]
+    return out
+
+
+def _rolling_extreme(values: np.ndarray, period: int, ufunc: np.ufunc, fill: float) -> np.ndarray:
+    """Rolling max/min in O(n): within blocks of ``period`` bars, combine a suffix scan with the next block's prefix scan."""
+    out = np.full(len(values), np.nan)
+    size = len(values)
+    if size < period:
+        return out
+    rows = -(-size // period)
+    padded = np.full(rows * period, fill)
+    padded[:size] = values
+    grid = padded.reshape(rows, period)
+    forward = ufunc.accumulate(grid, axis=1).ravel()
+    backward = ufunc.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[period - 1 :] = ufunc(backward[: size - period + 1], forward[period - 1 : size])
+    return out
+
+
+# -- graph nodes -------------------------------------------------------------
+# Each kind has a dependency function and an evaluator reading computed nodes.
+
+
+def _deps(node: Node) -> List[Node]:
+    kind, args = node[0], node[1:]
+    if kind == "input":
+        return []
+    if kind in ("prefix", "ema", "max", "min", "delta", "runs"):
+        return [args[0]]
+    if kind == "prefix_sq":
+        return [("prefix", args[0])]
+    if kind == "sum":
+        return [("prefix", args[0])]
+    if kind == "sumsq":
+        return [("prefix_sq", args[0]), ("prefix", args[0])]
+    if kind == "mean":
+        return [args[0], ("sum", args[0], args[1]), ("runs", args[0])]
+    if kind == "std":
+        return [("sum", args[0], args[1]), ("sumsq", args[0], args[1]), ("runs", args[0])]
+    if kind in ("gain", "loss"):
+        return [("delta", args[0])]
+    if kind == "rsi":
+        return [("mean", ("gain", args[0]), args[1]), ("mean", ("loss", args[0]), args[1])]
+    if kind == "sub":
+        return [args[0], args[1]]
+    if kind == "band":
+        return [args[0], args[1]]
+    if kind == "stoch_k":
+        return [CLOSE, ("min", LOW, args[0]), ("max", HIGH, args[0])]
+    if kind == "tr":
+        return [HIGH, LOW, CLOSE]
+    raise ValueError(f"Unknown indicator node {node!r}")
+
+
+def _evaluate(node: Node, values: Dict[Node, Any], data: Any) -> Any:
+    kind, args = node[0], node[1:]
+    if kind == "input":
+        return _column(data, args[0])
+    if kind == "prefix":
+        return _prefix(values[args[0]])
+    if kind == "prefix_sq":
+        centred = values[("prefix", args[0])][4]
+        return np.concatenate(([0.0], np.cumsum(centred * centred)))
+    if kind == "sum":
+        source, period = args
+        first, reference, prefix, bad, _ = values[("prefix", source)]
+        size = len(values[source])
+        if size - first < period:
+            return np.full(size, np.nan)
+        sums, clean = _window(prefix, bad, period)
+        return _place(size, first, period, sums + period * reference, clean)
+    if kind == "sumsq":
+        # Window sums of (x - reference)^2; ``std`` combines them with the centred sums.
+        source, period = args
+        first, reference, prefix, bad, _ = values[("prefix", source)]
+        size = len(values[source])
+        if size - first < period:
+            return np.full(size, np.nan)
+        sums, clean = _window(values[("prefix_sq", source)], bad, period)
+        return _place(size, first, period, sums, clean)
+    if kind == "runs":
+        return _runs(values[args[0]])
+    if kind == "mean":
+        # Differences of one prefix sum leave round-off where the window is flat; pandas gives the value itself.
+        source, period = args
+        flat = values[("runs", source)] >= period
+        return np.where(flat, values[source], values[("sum", source, period)] / period)
+    if kind == "std":
+        source, period = args
+        reference = values[("prefix", source)][1]
+        centred_sum = values[("sum", source, period)] - period * reference
+        squares = values[("sumsq", source, period)]
+        if period < 2:
+            return np.full(len(squares), np.nan)
+        variance = (squares - centred_sum * centred_sum / period) / (period - 1)
+        return np.where(values[("runs", source)] >= period, 0.0, np.sqrt(np.maximum(variance, 0.0)))
+    if kind == "ema":
+        return _ema(values[args[0]], args[1])
+    if kind == "max":
+        return _rolling_extreme(values[args[0]], args[1], np.maximum, -np.inf)
+    if kind == "min":
+        return _rolling_extreme(values[args[0]], args[1], np.minimum, np.inf)
+    if kind == "delta":
+        source = values[args[0]]
+        return np.concatenate(([np.nan], np.diff(source))) if len(source) else source
+    if kind == "gain":
+        delta = values[("delta", args[0])]
+        return np.where(delta > 0, delta, 0.0)
+    if kind == "loss":
+        delta = values[("delta", args[0])]
+        return np.where(delta < 0, -delta, 0.0)
+    if kind == "rsi":
+        gain = values[("mean", ("gain", args[0]), args[1])]
+        loss = values[("mean", ("loss", args[0]), args[1])]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 100.0 - 100.0 / (1.0 + gain / loss)
+    if kind == "sub":
+        return values[args[0]] - values[args[1]]
+    if kind == "band":
+        return values[args[0]] + values[args[1]] * args[2]
+    if kind == "stoch_k":
+        close, lowest, highest = values[CLOSE], values[("min", LOW, args[0])], values[("max", HIGH, args[0])]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 100.0 * (close - lowest) / (highest - lowest)
+    if kind == "tr":
+        high, low, close = values[HIGH], values[LOW], values[CLOSE]
+        if not len(close):
+            return close
+        previous = np.concatenate(([np.nan], close[:-1]))
+        # Like ``pd.concat([...]).max(axis=1)``: the first bar has only high - low.
+        return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    raise ValueError(f"Unknown indicator node {node!r}")
+
+
+# -- indicator specs ---------------------------------------------------------
+
+
+def _name(kind: str, params: Tuple[Any, ...], defaults: Tuple[Any, ...], part: str = "") -> str:
+    suffix = "" if params == defaults else "_" + "_".join(f"{p:g}" if isinstance(p, float) else str(p) for p in params)
+    return f"{kind}{suffix}{'_' + part if part else ''}"
+
+
+def _sma(period: int) -> Dict[str, Node]:
+    return {f"sma_{period}": ("mean", CLOSE, period)}
+
+
+def _ema_spec(period: int) -> Dict[str, Node]:
+    return {f"ema_{period}": ("ema", CLOSE, period)}
+
+
+def _rsi(period: int = 14) -> Dict[str, Node]:
+    return {_name("rsi", (period,), (14,)): ("rsi", CLOSE, period)}
+
+
+def _macd(fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, Node]:
+    line = ("sub", ("ema", CLOSE, fast), ("ema", CLOSE, slow))
+    smoothed = ("ema", line, signal)
+    params, defaults = (fast, slow, signal), (12, 26, 9)
+    return {
+        _name("macd", params, defaults): line,
+        _name("macd", params, defaults, "signal"): smoothed,
+        _name("macd", params, defaults, "hist"): ("sub", line, smoothed),
+    }
+
+
+def _bollinger(period: int = 20, width: float = 2.0) -> Dict[str, Node]:
+    middle = ("mean", CLOSE, period)
+    deviation = ("std", CLOSE, period)
+    params, defaults = (period, float(width)), (20, 2.0)
+    return {
+        _name("bb", params, defaults, "upper"): ("band", middle, deviation, float(width)),
+        _name("bb", params, defaults, "middle"): middle,
+        _name("bb", params, defaults, "lower"): ("band", middle, deviation, -float(width)),
+    }
+
+
+def _stochastic(period: int = 14, smoothing: int = 3) -> Dict[str, Node]:
+    k = ("stoch_k", period)
+    params, defaults = (period, smoothing), (14, 3)
+    return {_name("stoch", params, defaults, "k"): k, _name("stoch", params, defaults, "d"): ("mean", k, smoothing)}
+
+
+def _atr(period: int = 14) -> Dict[str, Node]:
+    return {_name("atr", (period,), (14,)): ("mean", ("tr",), period)}
+
+
+INDICATORS: Dict[str, Tuple[Callable[..., Dict[str, Node]], Tuple[type, ...]]] = {
+    "sma": (_sma, (int,)),
+    "ema": (_ema_spec, (int,)),
+    "rsi": (_rsi, (int,)),
+    "macd": (_macd, (int, int, int)),
+    "bb": (_bollinger, (int, float)),
+    "stoch": (_stochastic, (int, int)),
+    "atr": (_atr, (int,)),
+}
+
+
+def parse_indicator(spec: str) -> Dict[str, Node]:
+    """Output names and graph nodes of one ``kind:param:...`` spec."""
+    kind, *raw = spec.strip().lower().split(":")
+    if kind not in INDICATORS:
+        raise ValueError(f"Unknown indicator {kind!r}; expected one of {', '.join(sorted(INDICATORS))}.")
+    builder, types = INDICATORS[kind]
+    if len(raw) > len(types) or (kind in ("sma", "ema") and not raw):
+        raise ValueError(f"Invalid parameters for {kind!r}: {spec!r}")
+    try:
+        params = [cast(value) for cast, value in zip(types, raw)]
+    except ValueError as exc:
+        raise ValueError(f"Invalid parameters for {kind!r}: {spec!r}") from exc
+    if any(value <= 0 for value in params):
+        raise ValueError(f"Indicator parameters must be positive: {spec!r}")
+    return builder(*params)
+
+
+class IndicatorEngine:
+    """
+    One evaluation plan for a set of indicators.
+
+    Identical intermediates are planned once: ``bb`` reuses ``sma:20``'s
+    window sum, ``macd`` reuses ``ema:12``/``ema:26``, every rolling mean of
+    a source shares its prefix sum. ``compute`` runs the plan over any
+    object exposing ``high``/``low``/``close`` (a ``CandleSeries``, a
+    DataFrame, a dict of arrays).
+    """
+
+    def __init__(self, indicators: Iterable[str] = DEFAULT_INDICATORS) -> None:
+        self.indicators = tuple(indicators)
+        self.outputs: Dict[str, Node] = {}
+        self._plan: List[Node] = []
+        planned: set = set()
+        for spec in self.indicators:
+            for name, node in parse_indicator(spec).items():
+                self.outputs[name] = node
+                self._require(node, planned)
+
+    def _require(self, node: Node, planned: set) -> None:
+        if node in planned:
+            return
+        for dependency in _deps(node):
+            self._require(dependency, planned)
+        planned.add(node)
+        self._plan.append(node)
+
+    @property
+    def nodes(self) -> int:
+        """Distinct intermediate and output computations in the plan."""
+        return len(self._plan)
+
+    def compute(self, data: Any) -> Dict[str, np.ndarray]:
+        """Every requested indicator as an array aligned with the input bars (NaN while warming up)."""
+        values: Dict[Node, Any] = {}
+        for node in self._plan:
+            values[node] = _evaluate(node, values, data)
+        return {name: values[node] for name, node in self.outputs.items()}
+
+    def latest(self, data: Any) -> Dict[str, Optional[float]]:
+        """Last value of every indicator (None while still warming up)."""
+        latest: Dict[str, Optional[float]] = {}
+        for name, values in self.compute(data).items():
+            value = float(values[-1]) if len(values) else math.nan
+            latest[name] = value if math.isfinite(value) else None
+        return latest
+
+
+def indicator_snapshot(data: Any, indicators: Iterable[str] = DEFAULT_INDICATORS) -> Dict[str, Optional[float]]:
+    """Latest values of ``indicators`` plus the close, from one engine evaluation (for snapshot builders)."""
+    snapshot = IndicatorEngine(indicators).latest(data)
+    close = _column(data, "close")
+    snapshot["price"] = float(close[-1]) if len(close) else None
+    return snapshot
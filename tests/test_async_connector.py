@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from async_connector import (  # type: ignore  # noqa: E402
+    METHOD_NOT_FOUND,
+    AsyncMcpConnector,
+    AsyncMcpPool,
+    McpError,
+    fetch_many,
+    parse_address,
+)
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from mcp_replay import RecordedPayloads, ReplayServer  # type: ignore  # noqa: E402
+
+TIMEFRAMES = ["M15", "H1", "H4"]
+
+
+@pytest.fixture
+def recordings():
+    return RecordedPayloads.from_candles(
+        {
+            symbol: {tf: synthetic_payload(300, seconds, seed=index) for tf, seconds in zip(TIMEFRAMES, (900, 3600, 14400))}
+            for index, symbol in enumerate(["EURUSD", "GBPUSD", "USDJPY"])
+        }
+    )
+
+
+def test_fetch_many_is_concurrent_over_a_bounded_pool(recordings):
+    async def scenario():
+        server = ReplayServer(recordings, latency=0.05)
+        host, port = await server.start()
+        async with AsyncMcpPool(host, port, size=4) as pool:
+            start = time.perf_counter()
+            results = await fetch_many(pool, ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD"], TIMEFRAMES, count=120)
+            elapsed = time.perf_counter() - start
+            opened = pool.sessions_opened
+        await server.close()
+        return results, elapsed, opened, server.requests
+
+    results, elapsed, opened, requests = asyncio.run(scenario())
+
+    candles, price = results["GBPUSD"]
+    assert set(candles) == set(TIMEFRAMES)
+    assert len(parse_mcp_csv(candles["H1"])) == 120
+    assert price == parse_mcp_csv(candles["M15"]).last_close()
+    assert isinstance(results["XAUUSD"], McpError)
+    assert opened == 4
+    # 16 requests at 50 ms each over 4 sessions: about 4 rounds instead of 16.
+    assert requests == 16
+    assert elapsed < 16 * 0.05 / 2
+
+
+def test_timeouts_discard_the_session(recordings):
+    async def scenario():
+        server = ReplayServer(recordings, latency=0.3)
+        host, port = await server.start()
+        async with AsyncMcpPool(host, port, size=2, timeout=0.05) as pool:
+            with pytest.raises(McpError, match="timed out"):
+                await pool.candles("EURUSD", "H1")
+            server.latency = 0.0
+            assert (await pool.price("EURUSD")) > 0
+            stats = pool.timeouts, pool.sessions_opened
+        await server.close()
+        return stats
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_batch_prices_fall_back_once_on_method_not_found(recordings):
+    async def scenario():
+        server = ReplayServer(recordings, methods=["get_candles_latest", "get_symbol_price"])
+        host, port = await server.start()
+        async with AsyncMcpPool(host, port, size=2) as pool:
+            first = await pool.prices(["EURUSD", "GBPUSD"])
+            after_first = server.requests
+            second = await pool.prices(["EURUSD", "GBPUSD"])
+            with pytest.raises(McpError) as missing:
+                await pool.call("get_ticks", {})
+        await server.close()
+        return first, second, after_first, server.requests, missing.value.code
+
+    first, second, after_first, requests, code = asyncio.run(scenario())
+
+    assert first == second and first["GBPUSD"] == recordings.price("GBPUSD")["bid"]
+    # One rejected batch call and two quotes, then only quotes.
+    assert (after_first, requests - 1) == (3, 5)
+    assert code == METHOD_NOT_FOUND
+
+
+def test_other_errors_do_not_switch_off_batch_prices(recordings):
+    async def scenario():
+        server = ReplayServer(recordings)
+        host, port = await server.start()
+        async with AsyncMcpPool(host, port, size=1) as pool:
+            with pytest.raises(McpError):
+                await pool.prices(["EURUSD", "XAUUSD"])
+            prices = await pool.prices(["EURUSD"])
+        await server.close()
+        return prices, server.requests
+
+    prices, requests = asyncio.run(scenario())
+    assert prices["EURUSD"] > 0 and requests == 2
+
+
+def test_sync_adapter_matches_connector_shape(recordings):
+    server = ReplayServer(recordings)
+    host, port = server.start_background()
+    try:
+        with AsyncMcpConnector(host, port, pool_size=2) as connector:
+            data = connector.get_symbol_data("EURUSD", ["H1", "H4"], count=60)
+    finally:
+        server.stop_background()
+
+    assert set(data) == {"candles", "current_price"}
+    assert len(parse_mcp_csv(data["candles"]["H4"])) == 60
+    assert parse_address("10.0.0.5:9000") == ("10.0.0.5", 9000)
+    assert parse_address("localhost") == ("localhost", 8765)
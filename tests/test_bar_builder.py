@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from bar_builder import (  # type: ignore  # noqa: E402
+    FileReplayTickSource,
+    ScannerFeed,
+    StreamingBarBuilder,
+    Tick,
+    synthetic_ticks,
+    write_tick_file,
+)
+from candle_series import FIELDS  # type: ignore  # noqa: E402
+from resampler import resample  # type: ignore  # noqa: E402
+
+
+def test_higher_timeframes_match_resampled_m1():
+    builder = StreamingBarBuilder(["M1", "M15", "H1"], history=5000)
+    builder.run(synthetic_ticks(50_000))
+    builder.flush()
+
+    m1 = builder.series("M1")
+    for timeframe, period in (("M15", 900), ("H1", 3600)):
+        expected = resample(m1, period)
+        built = builder.series(timeframe)
+        for name in FIELDS:
+            assert np.array_equal(getattr(built, name), getattr(expected, name)), (timeframe, name)
+
+
+def test_closed_bar_events_and_late_ticks():
+    closed = []
+    builder = StreamingBarBuilder(["M1"], on_close=closed.append)
+    builder.push(Tick(60.2, 1.10000, 1.10010, 2))
+    builder.push(Tick(75.0, 1.10030, 1.10035, 1))
+    builder.push(Tick(90.0, 1.09990, 1.10002, 1))
+    assert closed == []
+    builder.push(Tick(121.0, 1.10005, 1.10015, 1))
+    builder.push(Tick(119.0, 1.2, 1.3, 1))
+
+    assert len(closed) == 1
+    bar = closed[0]
+    assert (bar.time, bar.open, bar.high, bar.low, bar.close) == (60, 1.1, 1.1003, 1.0999, 1.0999)
+    assert (bar.tick_volume, bar.spread, bar.real_volume) == (3, 5, 4)
+    assert builder.late_ticks == 1
+    assert builder.forming("M1").open == 1.10005
+
+
+def test_file_replay_feeds_scanner(tmp_path):
+    ticks = synthetic_ticks(5000)
+    path = write_tick_file(tmp_path / "ticks.csv.gz", ticks)
+    assert list(FileReplayTickSource(path)) == ticks
+
+    calls, closes = [], []
+    builder = StreamingBarBuilder(["M15", "M5"])
+    ScannerFeed(
+        builder,
+        "eurusd",
+        ["M15"],
+        scan=lambda **kwargs: calls.append(kwargs) or {},
+        on_result=lambda bar, result: closes.append(bar),
+    )
+    builder.run(FileReplayTickSource(path))
+
+    assert len(calls) == len(builder.series("M15"))
+    assert calls[-1]["symbol"] == "EURUSD"
+    assert set(calls[-1]["candles_data"]) == {"M5", "M15"}
+    for count, (call, bar) in enumerate(zip(calls, closes), start=1):
+        for timeframe, csv in call["candles_data"].items():
+            stamps = [line.split(",", 1)[0] for line in csv.splitlines()[1:]]
+            assert len(stamps) == len(set(stamps)), (count, timeframe)
+        # Every closed M15 bar once, then the bar the closing tick opened.
+        rows = call["candles_data"]["M15"].splitlines()[1:]
+        assert len(rows) == count + 1
+        assert rows[-2] == builder.series("M15").to_csv().splitlines()[count]
+        assert rows[-2].split(",")[1:5] == [repr(value) for value in (bar.open, bar.high, bar.low, bar.close)]
+        assert rows[-1].split(",", 1)[0] != rows[-2].split(",", 1)[0]
+
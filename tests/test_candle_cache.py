@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_cache import CandleDiskCache  # type: ignore  # noqa: E402
+from candle_series import broker_now  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+
+
+def test_first_fill_then_incremental_append(tmp_path):
+    cache = CandleDiskCache(tmp_path)
+    history = parse_mcp_csv(synthetic_payload(300, 3600))
+
+    assert cache.merge("EURUSD", "H1", history[:250]) == 250
+    assert cache.bars_to_fetch("EURUSD", "H1", int(history.time[259]), 250) == 11
+    assert cache.merge("EURUSD", "H1", history[248:260]) == 10
+
+    cached = cache.load("EURUSD", "H1")
+    assert np.array_equal(cached.time, history.time[:260])
+    assert np.array_equal(cached.close, history.close[:260])
+    assert len(cache.load("EURUSD", "H1", count=5)) == 5
+
+
+def test_in_progress_bar_is_repaired_in_place(tmp_path):
+    cache = CandleDiskCache(tmp_path)
+    history = parse_mcp_csv(synthetic_payload(20, 900))
+    cache.merge("EURUSD", "M15", history)
+
+    revised = history[-2:]
+    revised.close[-1] += 0.001
+    revised.high[-1] = max(revised.high[-1], revised.close[-1])
+    assert cache.merge("EURUSD", "M15", revised) == 0
+
+    cached = cache.load("EURUSD", "M15")
+    assert cache.bar_count("EURUSD", "M15") == 20
+    assert cached.close[-1] == revised.close[-1]
+    assert cached.close[-2] == history.close[-2]
+
+
+def test_empty_cache_requests_full_history(tmp_path):
+    cache = CandleDiskCache(tmp_path)
+
+    assert cache.last_time("GBPUSD", "D1") is None
+    assert cache.bars_to_fetch("GBPUSD", "D1", 1_700_000_000, 250) == 250
+    assert cache.load("GBPUSD", "D1").is_empty
+
+
+def test_broker_clock_ahead_of_utc_is_caught_up(tmp_path):
+    cache = CandleDiskCache(tmp_path)
+    history = parse_mcp_csv(synthetic_payload(300, 3600))
+    cache.merge("EURUSD", "H1", history[:250])
+    # Bar 259 is forming on a UTC+3 server; the wall clock reads three hours earlier.
+    utc = int(history.time[259]) - 3 * 3600
+
+    assert cache.bars_to_fetch("EURUSD", "H1", broker_now(10800, utc), 250) == 11
+    short = history[260 - cache.bars_to_fetch("EURUSD", "H1", broker_now(0, utc), 250) : 260]
+    assert cache.leaves_gap("EURUSD", "H1", short)
+    assert not cache.leaves_gap("EURUSD", "H1", history[249:260])
+    assert not CandleDiskCache(tmp_path / "empty").leaves_gap("EURUSD", "H1", short)
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_context import CandleContext  # type: ignore  # noqa: E402
+from mcp_csv import synthetic_payload  # type: ignore  # noqa: E402
+
+
+def test_each_payload_is_parsed_once_per_context():
+    candles = {"H1": synthetic_payload(120, 3600), "H4": synthetic_payload(60, 14400)}
+    context = CandleContext()
+
+    payloads = context.register("EURUSD", candles)
+    payloads["H1"].last_close()
+    for _ in range(3):
+        context.series("EURUSD", "H1")
+        context.series("eurusd", "h1", candles["H1"])
+    context.series_by_timeframe("EURUSD", ["H1", "H4"])
+
+    stats = context.debug_stats()
+    assert stats["payloads"] == 2
+    assert stats["full_parses"] == 2
+    assert stats["max_parses_per_payload"] == 1
+    assert stats["tail_reads"] == 1
+
+
+def test_changed_payload_gets_its_own_entry():
+    context = CandleContext()
+    first = context.payload("EURUSD", "H1", synthetic_payload(10, 3600, seed=1))
+    second = context.payload("EURUSD", "H1", synthetic_payload(10, 3600, seed=2))
+
+    assert first is not second
+    assert context.series("EURUSD", "H1") is second.series
+
+
+def test_registered_series_is_not_parsed_back_from_its_csv():
+    context = CandleContext()
+    series = CandleContext().series("EURUSD", "H1", synthetic_payload(300, 3600))
+
+    csv_data = context.register_series("EURUSD", "H1", series)
+    context.register("EURUSD", {"H1": csv_data})
+
+    assert context.series("EURUSD", "H1") is series
+    assert context.payload("EURUSD", "H1", csv_data).last_close() == series.last_close()
+    assert context.debug_stats()["full_parses"] == 0
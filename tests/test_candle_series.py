@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_payload import CandlePayload  # type: ignore  # noqa: E402
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+
+MCP_CSV = """time,open,high,low,close,tick_volume,spread,real_volume
+2,2025-10-29 16:00:00+00:00,1.16342,1.16458,1.16336,1.16386,8090,0,0
+1,2025-10-29 15:00:00+00:00,1.1639599999999999,1.1645,1.16276,1.16341,9666,0,0
+0,2025-10-29 14:00:00+00:00,1.16472,1.16486,1.1633,1.16397,6899,0,0
+"""
+
+
+def test_from_csv_sorts_ascending_into_typed_columns():
+    series = CandleSeries.from_csv(MCP_CSV)
+
+    assert len(series) == 3
+    assert series.time.dtype == np.int64
+    assert series.close.dtype == np.float64
+    assert series.close.flags["C_CONTIGUOUS"]
+    assert list(np.diff(series.time)) == [3600, 3600]
+    assert series.last_close() == 1.16386
+    assert series.tick_volume.tolist() == [6899, 9666, 8090]
+
+
+def test_to_pandas_shares_buffers():
+    series = CandleSeries.from_csv(MCP_CSV)
+    frame = series.to_pandas()
+
+    assert list(frame.columns[:5]) == ["time", "open", "high", "low", "close"]
+    assert np.shares_memory(frame["close"].to_numpy(), series.close)
+    assert str(frame["time"].iloc[-1]) == "2025-10-29 16:00:00"
+
+
+def test_slices_are_views():
+    series = CandleSeries.from_csv(MCP_CSV)
+    tail = series.tail(2)
+
+    assert len(tail) == 2
+    assert np.shares_memory(tail.high, series.high)
+    assert CandleSeries.from_csv("").is_empty
+
+
+def test_payload_tail_reads_newest_rows_without_full_parse():
+    payload = CandlePayload(MCP_CSV)
+
+    assert payload.last_close() == 1.16386
+    assert payload.latest(2).close.tolist() == [1.16341, 1.16386]
+    assert not payload.is_materialized
+    assert len(payload.series) == 3
+    assert payload.is_materialized
+
+
+def test_payload_tail_handles_oldest_first_rows():
+    header, *rows = MCP_CSV.strip().split("\n")
+    payload = CandlePayload("\n".join([header] + rows[::-1]))
+
+    assert payload.row_count() == 3
+    assert payload.latest(1).close.tolist() == [1.16386]
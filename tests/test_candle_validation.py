@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_series import FIELDS, CandleSeries, broker_now  # type: ignore  # noqa: E402
+from candle_validation import CandleIssue, repair_series, validate_timeframes  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+
+
+def _copy(series: CandleSeries) -> CandleSeries:
+    return CandleSeries(*(getattr(series, name).copy() for name in FIELDS))
+
+
+def test_clean_payload_has_empty_masks():
+    series = parse_mcp_csv(synthetic_payload(500, 3600))
+    report = validate_timeframes({"H1": series, "H4": series[:10]})
+
+    assert report["H1"] == CandleIssue.NONE
+    assert report["H4"] == CandleIssue.INSUFFICIENT
+    assert not report.usable("H4")
+
+
+def test_flags_are_kept_per_timeframe_and_repaired():
+    clean = parse_mcp_csv(synthetic_payload(300, 900))
+    bad = _copy(clean)
+    bad.time[10] = bad.time[9]
+    bad.time[[50, 51]] = bad.time[[51, 50]]
+    bad.high[100] = bad.low[100] - 0.001
+    bad.close[150] = np.nan
+
+    report = validate_timeframes({"M15": bad, "H1": parse_mcp_csv(synthetic_payload(300, 3600))})
+    expected = CandleIssue.DUPLICATE_TIME | CandleIssue.NON_MONOTONIC | CandleIssue.OHLC_INCONSISTENT | CandleIssue.BAD_PRICE
+    assert report["M15"] & expected == expected
+    assert report["H1"] == CandleIssue.NONE
+    assert report.issue_counts("M15")["duplicate_time"] == 1
+
+    repaired = repair_series(bad)
+    assert validate_timeframes({"M15": repaired})["M15"] & ~CandleIssue.GAP == CandleIssue.NONE
+    assert len(repaired) == len(bad) - 2
+
+
+def test_weekend_gaps_and_stale_last_bar():
+    friday = np.datetime64("2024-03-01T00:00", "s").astype(np.int64)
+    times = np.concatenate([friday + np.arange(96) * 900, friday + 3 * 86400 + np.arange(96) * 900])
+    prices = np.full(times.shape[0], 1.1)
+    series = CandleSeries(times, prices, prices, prices, prices)
+
+    assert validate_timeframes({"M15": series})["M15"] == CandleIssue.NONE
+    holed = CandleSeries(*(getattr(series, name)[np.arange(len(series)) != 120] for name in FIELDS))
+    assert validate_timeframes({"M15": holed})["M15"] == CandleIssue.GAP
+
+    last = int(times[-1])
+    assert validate_timeframes({"M15": series}, now=last + 900)["M15"] == CandleIssue.NONE
+    assert validate_timeframes({"M15": series}, now=last + 86400)["M15"] == CandleIssue.STALE
+
+
+def test_stale_check_runs_on_the_broker_clock():
+    start = np.datetime64("2024-03-04T00:00", "s").astype(np.int64)
+    times = start + np.arange(96) * 900
+    prices = np.full(times.shape[0], 1.1)
+    series = CandleSeries(times, prices, prices, prices, prices)
+    # Two hours after the last M15 bar on a UTC+3 server: the UTC wall clock is still an hour before it.
+    utc = int(times[-1]) + 2 * 3600 - 3 * 3600
+
+    assert validate_timeframes({"M15": series}, now=broker_now(10800, utc))["M15"] == CandleIssue.STALE
+    assert validate_timeframes({"M15": series}, now=broker_now(0, utc))["M15"] == CandleIssue.NONE
@@ -0,0 +1,44 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from history_archive import HistoryArchive, archive_from_sample_json, write_archive  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+
+
+def test_date_range_slices_are_zero_copy(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(5000, 900))
+    path = write_archive(tmp_path / "EURUSD_M15.tsa", "EURUSD", "M15", series, index_stride=256)
+    archive = HistoryArchive(path)
+
+    window = archive.slice(int(series.time[1000]), int(series.time[1500]))
+    assert np.array_equal(window.time, series.time[1000:1500])
+    assert np.array_equal(window.close, series.close[1000:1500])
+    assert np.shares_memory(window.close, archive.slice().close)
+    assert (archive.symbol, archive.timeframe, len(archive)) == ("EURUSD", "M15", 5000)
+
+
+def test_locate_matches_searchsorted_across_index_blocks(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(1000, 3600))
+    archive = HistoryArchive(write_archive(tmp_path / "a.tsa", "EURUSD", "H1", series, index_stride=64))
+
+    probes = series.time[[0, 63, 64, 65, 500, 999]].tolist() + [int(series.time[0]) - 1, int(series.time[-1]) + 1, int(series.time[64]) + 7]
+    for probe in probes:
+        assert archive.locate(probe) == np.searchsorted(series.time, probe)
+        assert archive.locate(probe, "right") == np.searchsorted(series.time, probe, "right")
+
+
+def test_sample_json_converter(tmp_path):
+    sample = tmp_path / "EURUSD.json"
+    sample.write_text(json.dumps({"candles": {"H1": synthetic_payload(40, 3600), "H4": synthetic_payload(20, 14400)}}))
+
+    paths = archive_from_sample_json(sample, tmp_path / "archives", "eurusd")
+
+    assert sorted(path.name for path in paths) == ["EURUSD_H1.tsa", "EURUSD_H4.tsa"]
+    assert len(HistoryArchive(paths[0]).tail(10)) == 10
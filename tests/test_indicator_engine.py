@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+INDICATOR_PATH = REPO_ROOT / ".claude" / "skills" / "technical-analysis" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+sys.path.insert(0, str(INDICATOR_PATH))  # noqa: E402, N806
+
+from indicator_engine import IndicatorEngine, indicator_snapshot, parse_indicator  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+
+
+def _frame(rows=3000, seed=3):
+    series = parse_mcp_csv(synthetic_payload(rows, 3600, seed=seed))
+    return series, pd.DataFrame({"high": series.high, "low": series.low, "close": series.close})
+
+
+def _pandas_reference(df):
+    """The indicator definitions of the legacy analysis scripts."""
+    close = df["close"]
+    out = {f"sma_{n}": close.rolling(n).mean() for n in (20, 50, 200)}
+    out.update({f"ema_{n}": close.ewm(span=n, adjust=False).mean() for n in (12, 26)})
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    out["rsi"] = 100 - 100 / (1 + gain / loss)
+    macd = out["ema_12"] - out["ema_26"]
+    signal = macd.ewm(span=9, adjust=False).mean()
+    out.update(macd=macd, macd_signal=signal, macd_hist=macd - signal)
+    middle, deviation = close.rolling(20).mean(), close.rolling(20).std()
+    out.update(bb_upper=middle + 2 * deviation, bb_middle=middle, bb_lower=middle - 2 * deviation)
+    lowest, highest = df["low"].rolling(14).min(), df["high"].rolling(14).max()
+    k = 100 * (close - lowest) / (highest - lowest)
+    out.update(stoch_k=k, stoch_d=k.rolling(3).mean())
+    true_range = pd.concat(
+        [df["high"] - df["low"], (df["high"] - close.shift()).abs(), (df["low"] - close.shift()).abs()], axis=1
+    ).max(axis=1)
+    out["atr"] = true_range.rolling(14).mean()
+    return out
+
+
+def test_default_set_matches_the_pandas_definitions():
+    series, df = _frame()
+    computed = IndicatorEngine().compute(series)
+    expected = _pandas_reference(df)
+
+    assert sorted(computed) == sorted(expected)
+    for name, reference in expected.items():
+        # MACD values sit near zero, so compare on the price scale.
+        np.testing.assert_allclose(computed[name], reference.to_numpy(), rtol=1e-9, atol=1e-11, err_msg=name)
+
+
+def test_flat_stretches_match_pandas_exactly():
+    _, df = _frame(rows=600, seed=5)
+    df.iloc[300:340] = df.iloc[300]["close"]
+    computed = IndicatorEngine().compute({name: df[name].to_numpy() for name in df})
+    expected = _pandas_reference(df)
+
+    for name, reference in expected.items():
+        # NaN positions must agree too: a flat RSI window is 0 / 0, not a residue of the prefix sums.
+        np.testing.assert_allclose(computed[name], reference.to_numpy(), rtol=1e-9, atol=1e-11, err_msg=name)
+    assert np.isnan(computed["rsi"][320:340]).all()
+    assert (computed["bb_upper"][319:340] == computed["bb_lower"][319:340]).all()
+
+
+def test_shared_intermediates_are_planned_once():
+    alone = IndicatorEngine(["sma:20"]).nodes
+    with_bands = IndicatorEngine(["sma:20", "bb"]).nodes
+    # Bollinger adds only its squared sums, deviation and two bands; the window sum and mean are reused.
+    assert with_bands - alone == 5
+
+    emas = IndicatorEngine(["ema:12", "ema:26"]).nodes
+    assert IndicatorEngine(["ema:12", "ema:26", "macd"]).nodes - emas == 3
+    assert IndicatorEngine(["rsi", "rsi"]).nodes == IndicatorEngine(["rsi"]).nodes
+
+
+def test_custom_parameters_and_names():
+    series, df = _frame(rows=500)
+    engine = IndicatorEngine(["rsi:7", "bb:50:2.5", "stoch:5:5", "atr:7", "macd:5:35:5"])
+    computed = engine.compute({"high": df["high"], "low": df["low"], "close": df["close"]})
+
+    assert {"rsi_7", "bb_50_2.5_upper", "stoch_5_5_d", "atr_7", "macd_5_35_5_hist"} <= set(computed)
+    reference = df["close"].rolling(50).mean() - 2.5 * df["close"].rolling(50).std()
+    np.testing.assert_allclose(computed["bb_50_2.5_lower"], reference.to_numpy(), rtol=1e-9)
+
+
+def test_short_and_gappy_inputs():
+    close = np.array([np.nan, 1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0])
+    computed = IndicatorEngine(["sma:3", "ema:3"]).compute({"high": close, "low": close, "close": close})
+    reference = pd.Series(close)
+
+    np.testing.assert_allclose(computed["sma_3"], reference.rolling(3).mean().to_numpy())
+    assert np.isnan(computed["ema_3"][0]) and computed["ema_3"][1] == 1.0
+    assert IndicatorEngine(["sma:20"]).compute({"high": close, "low": close, "close": close})["sma_20"].size == 8
+
+
+def test_snapshot_reports_latest_values_and_warmup_as_none():
+    series, df = _frame(rows=100)
+    snapshot = indicator_snapshot(series, ["sma:20", "sma:200", "rsi"])
+
+    assert snapshot["price"] == pytest.approx(float(df["close"].iloc[-1]))
+    assert snapshot["sma_20"] == pytest.approx(float(df["close"].tail(20).mean()))
+    assert snapshot["sma_200"] is None
+    assert snapshot["rsi"] is not None
+
+
+@pytest.mark.parametrize("spec", ["vwap", "sma", "rsi:x", "ema:0", "macd:1:2:3:4"])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_indicator(spec)
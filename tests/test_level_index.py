@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from level_index import LevelIndex  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from sr_zones import SRZoneEngine  # type: ignore  # noqa: E402
+
+PIP = 0.0001
+
+
+def _zone_levels(seed=0):
+    engine = SRZoneEngine()
+    timeframes = {"M15": 900, "H1": 3600, "H4": 14400, "D1": 86400}
+    series = {tf: parse_mcp_csv(synthetic_payload(2000, seconds, seed=seed + i)) for i, (tf, seconds) in enumerate(timeframes.items())}
+    price = float(series["H1"].close[-1])
+    return engine.levels_by_timeframe("EURUSD", series, price, count=50), price
+
+
+def test_within_matches_a_scan_of_every_level():
+    levels, price = _zone_levels()
+    index = LevelIndex(levels, PIP)
+    everything = index.levels
+
+    for probe in np.linspace(price - 0.02, price + 0.02, 41):
+        for pips in (0, 3, 15):
+            expected = [level for level in everything if level.low - pips * PIP <= probe <= level.high + pips * PIP]
+            assert sorted(index.within(probe, pips)) == sorted(expected), (probe, pips)
+
+
+def test_plain_level_lists_and_nearest_side():
+    index = LevelIndex(
+        {
+            "H1": {"support": [1.1150, 1.1100], "resistance": [1.1300], "pivot": 1.12},
+            "H4": {"support": [1.1148], "resistance": [1.1305, 1.1400]},
+        },
+        PIP,
+    )
+
+    assert len(index) == 6
+    near = index.within(1.1152, 5)
+    assert [(level.timeframe, level.center) for level in near] == [("H1", 1.1150), ("H4", 1.1148)]
+    assert index.distance_pips(near[1], 1.1152) == pytest.approx(4.0)
+    assert index.nearest(1.1200, "support").center == 1.1150
+    assert index.nearest(1.1200, "resistance").center == 1.1300
+    assert index.nearest(1.1000, "support") is None
+    assert [row["center"] for row in index.rows(1.12)] == [1.14, 1.1305, 1.13, 1.115, 1.1148, 1.11]
+
+
+def test_annotate_marks_patterns_near_each_side():
+    index = LevelIndex({"H1": {"support": [1.1150], "resistance": [1.1300]}}, PIP)
+    patterns = {
+        "H1": [{"name": "Hammer", "price": 1.1155}, {"name": "Doji", "price": 1.1220}],
+        "H4": [{"name": "Shooting Star", "price": 1.1296}],
+    }
+
+    annotated = index.annotate_by_timeframe(patterns, 10)
+
+    hammer, doji = annotated["H1"]
+    assert hammer["near_support"] and not hammer["near_resistance"]
+    assert hammer["near_levels"][0]["distance_pips"] == pytest.approx(5.0)
+    assert not doji["near_support"] and not doji["near_resistance"] and doji["near_levels"] == []
+    assert annotated["H4"][0]["near_resistance"]
+    assert "near_support" not in patterns["H1"][0]
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import parse_mcp_csv, parse_with_pandas, synthetic_payload  # type: ignore  # noqa: E402
+
+
+def test_fast_path_matches_pandas():
+    for rows in (50, 2000):
+        payload = synthetic_payload(rows)
+        fast = parse_mcp_csv(payload)
+        reference = parse_with_pandas(payload)
+
+        for name in ("time", "tick_volume", "spread"):
+            assert np.array_equal(getattr(fast, name), getattr(reference, name)), name
+        for name in ("open", "high", "low", "close"):
+            np.testing.assert_array_max_ulp(getattr(fast, name), getattr(reference, name), maxulp=1)
+        assert (np.diff(fast.time) > 0).all()
+
+
+def test_plain_dialect_without_index_or_offset():
+    payload = """time,open,high,low,close,tick_volume,spread,real_volume
+2025-10-29 16:00:00,1.16342,1.16458,1.16336,1.16386,8090,0,0
+2025-10-29 15:00:00,1.16396,1.16450,1.16276,1.16341,9666,0,0
+"""
+    series = parse_mcp_csv(payload)
+
+    assert series.close.tolist() == [1.16341, 1.16386]
+    assert str(series.datetimes()[-1]) == "2025-10-29T16:00:00"
+
+
+def test_offsets_are_normalised_to_utc():
+    payload = """time,open,high,low,close,tick_volume,spread,real_volume
+0,2025-10-29 18:00:00+02:00,1.1,1.2,1.0,1.15,10,0,0
+"""
+    series = parse_mcp_csv(payload)
+
+    assert str(series.datetimes()[0]) == "2025-10-29T16:00:00"
+
+
+def test_unexpected_payload_falls_back_to_pandas():
+    payload = """time,open,high,low,close,tick_volume,spread,real_volume
+2025-10-29 16:00:00,1.16342,1.16458,1.16336,1e0,8090,0,0
+"""
+    series = parse_mcp_csv(payload)
+
+    assert series.close.tolist() == [1.0]
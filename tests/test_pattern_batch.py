@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_batch import CandleBlock, batch_detect, batch_masks, batch_patterns  # type: ignore  # noqa: E402
+from pattern_dsl import compile_patterns  # type: ignore  # noqa: E402
+from pattern_kernel import detect_masks, find_patterns, latest_patterns  # type: ignore  # noqa: E402
+
+
+def _universe(count=25, seed=0):
+    lengths = np.random.default_rng(seed).integers(1, 300, count)
+    return {f"SYM{i:02d}": parse_mcp_csv(synthetic_payload(int(n), 3600, seed=i)) for i, n in enumerate(lengths)}
+
+
+def test_stack_right_aligns_and_round_trips_each_series():
+    universe = _universe()
+    block = CandleBlock.stack(universe)
+
+    assert block.width == max(len(series) for series in universe.values())
+    for symbol, series in universe.items():
+        row = block.series(symbol)
+        assert np.array_equal(row.time, series.time) and np.array_equal(row.close, series.close)
+    assert CandleBlock.stack(universe, bars=10).width == 10
+
+
+def test_masks_ignore_padding_and_match_per_series():
+    universe = _universe()
+    block = CandleBlock.stack(universe)
+
+    masks = batch_masks(block, digits=[5] * len(block))
+
+    for row, (symbol, series) in enumerate(universe.items()):
+        expected = detect_masks(series, digits=5)
+        start = block.start[row]
+        for name, mask in masks.items():
+            assert not mask[row, :start].any()
+            assert np.array_equal(mask[row, start:], expected[name]), (symbol, name)
+
+
+@pytest.mark.parametrize("bars", [None, 1, 3, 50])
+def test_batch_records_equal_per_symbol_detection(bars):
+    universe = _universe()
+
+    found = batch_detect(universe, bars=bars, use_points=False)
+
+    for symbol, series in universe.items():
+        expected = find_patterns(series) if bars is None else latest_patterns(series, bars)
+        assert found[symbol] == expected, symbol
+
+
+def test_custom_programs_and_points_follow_the_per_series_api():
+    universe = _universe(8, seed=3)
+    program = compile_patterns([{"name": "Inside Bar", "when": ["high < high[1]", "low > low[1]"]}])
+
+    found = batch_patterns(CandleBlock.stack(universe), digits=[5] * 8, program=program)
+
+    assert any(found.values())
+    assert all(found[s] == find_patterns(series, digits=5, program=program) for s, series in universe.items())
+    assert batch_patterns(CandleBlock.stack(universe), bars=0) == {symbol: [] for symbol in universe}
+
+
+def test_no_matches_give_empty_lists():
+    universe = _universe(4, seed=5)
+
+    found = batch_detect(universe, bars=2, names=["Three White Soldiers"], use_points=False)
+
+    expected = {symbol: latest_patterns(series, 2, names=["Three White Soldiers"]) for symbol, series in universe.items()}
+    assert found == expected
+    assert batch_detect({"EURUSD": universe["SYM00"][:0]}, bars=1) == {"EURUSD": []}
@@ -0,0 +1,90 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from bar_builder import StreamingBarBuilder, synthetic_ticks  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_detector import PatternDetector  # type: ignore  # noqa: E402
+from pattern_kernel import find_patterns  # type: ignore  # noqa: E402
+
+
+def _strip(events):
+    return [{key: value for key, value in event.items() if key not in ("symbol", "timeframe")} for event in events]
+
+
+def test_bar_by_bar_matches_full_history_scan():
+    series = parse_mcp_csv(synthetic_payload(1500))
+    detector = PatternDetector(backfill=0)
+    assert detector.update_series("EURUSD", "M15", series[:500]) == []
+
+    events = []
+    for index in range(500, len(series)):
+        bar = series[index : index + 1]
+        events += detector.update("eurusd", "m15", int(bar.time[0]), bar.open[0], bar.high[0], bar.low[0], bar.close[0])
+
+    assert _strip(events) == find_patterns(series, start=500, digits=5)
+    assert {(event["symbol"], event["timeframe"]) for event in events} == {("EURUSD", "M15")}
+    assert detector.stats()["bars_evaluated"] == 1500
+
+
+def test_overlapping_payloads_only_emit_new_bars():
+    series = parse_mcp_csv(synthetic_payload(800))
+    detector = PatternDetector(backfill=0)
+    detector.update_series("EURUSD", "H1", series[:300])
+
+    first = detector.update_series("EURUSD", "H1", series[:600])
+    again = detector.update_series("EURUSD", "H1", series[:600])
+
+    assert _strip(first) == find_patterns(series[:600], start=300, digits=5)
+    assert again == []
+    assert detector.last_time("EURUSD", "H1") == int(series.time[599])
+
+
+def test_first_sight_only_reports_backfill_bars():
+    series = parse_mcp_csv(synthetic_payload(400))
+
+    events = PatternDetector(backfill=5).update_series("EURUSD", "M15", series)
+
+    assert _strip(events) == find_patterns(series, start=-5, digits=5)
+
+
+def test_state_round_trip_resumes_without_rescanning(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(1000))
+    path = tmp_path / "detector.json"
+    detector = PatternDetector(names=["Doji", "Bullish Engulfing", "Morning Star"], backfill=0)
+    detector.update_series("EURUSD", "M15", series[:700])
+    detector.save(path)
+
+    resumed = PatternDetector.load(path)
+    events = resumed.update_series("EURUSD", "M15", series)
+
+    assert json.loads(path.read_text())["version"] == 1
+    assert resumed.names == ["Doji", "Bullish Engulfing", "Morning Star"]
+    assert resumed.stats()["bars_evaluated"] == 300
+    assert _strip(events) == find_patterns(series, start=700, names=resumed.names, digits=5)
+
+
+def test_missing_state_file_gives_fresh_detector_and_bad_version_is_rejected(tmp_path):
+    assert PatternDetector.load(tmp_path / "missing.json").stats()["streams"] == 0
+    with pytest.raises(ValueError):
+        PatternDetector.from_state({"version": 99})
+
+
+def test_attached_to_streaming_builder():
+    builder = StreamingBarBuilder(["M15", "H1"])
+    seen = []
+    detector = PatternDetector(on_event=seen.append)
+    detector.attach(builder, "EURUSD")
+
+    closed = builder.run(synthetic_ticks(30000))
+
+    assert detector.stats()["bars_evaluated"] == closed
+    assert seen and {event["timeframe"] for event in seen} <= {"M15", "H1"}
+    h1_events = [event for event in seen if event["timeframe"] == "H1"]
+    assert _strip(h1_events) == find_patterns(builder.series("H1"), digits=5)
@@ -0,0 +1,139 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_detector import PatternDetector  # type: ignore  # noqa: E402
+from pattern_dsl import PatternDefinitionError, compile_patterns, load_pattern_file  # type: ignore  # noqa: E402
+from pattern_kernel import BUILTIN, PATTERNS, find_patterns, pattern_masks  # type: ignore  # noqa: E402
+
+INSIDE_BAR = {"name": "Inside Bar", "bias": "Neutral", "reliability": 48, "when": ["high < high[1]", "low > low[1]"]}
+THREE_INSIDE_UP = {
+    "name": "Three Inside Up",
+    "type": "Reversal",
+    "bias": "Bullish",
+    "params": {"depth": 0.5},
+    "when": ["bearish[2]", "bullish[1] and close[1] > close[2] + body[2] * depth", "close > open[2]"],
+}
+
+
+def _random_bars(size=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    o = rng.integers(1000, 1100, size)
+    c = o + rng.integers(-40, 41, size)
+    h = np.maximum(o, c) + rng.integers(0, 30, size)
+    l = np.minimum(o, c) - rng.integers(0, 30, size)
+    return o, h, l, c
+
+
+def test_user_patterns_match_hand_written_masks():
+    o, h, l, c = _random_bars()
+    program = compile_patterns([INSIDE_BAR, THREE_INSIDE_UP])
+
+    masks = program.evaluate(o, h, l, c)
+
+    inside = np.zeros(len(o), dtype=bool)
+    inside[1:] = (h[1:] < h[:-1]) & (l[1:] > l[:-1])
+    three = np.zeros(len(o), dtype=bool)
+    body2 = np.abs(c[:-2] - o[:-2])
+    three[2:] = (c[:-2] < o[:-2]) & (c[1:-1] > o[1:-1]) & (c[1:-1] > c[:-2] + body2 * 0.5) & (c[2:] > o[:-2])
+    assert np.array_equal(masks["Inside Bar"], inside)
+    assert np.array_equal(masks["Three Inside Up"], three)
+    assert program.specs["Three Inside Up"].bars == 3
+    assert program.specs["Inside Bar"].type == "Reversal"  # defaults fill the metadata
+
+
+def test_extending_builtins_keeps_their_masks_and_shares_subexpressions():
+    o, h, l, c = _random_bars()
+    program = BUILTIN.extend([INSIDE_BAR, {"name": "Bullish Engulfing Clone", "when": BUILTIN.definitions[0]["when"]}])
+
+    masks = program.evaluate(o, h, l, c)
+
+    builtin = pattern_masks(o, h, l, c)
+    assert all(np.array_equal(masks[name], builtin[name]) for name in PATTERNS)
+    assert np.array_equal(masks["Bullish Engulfing Clone"], builtin["Bullish Engulfing"])
+    assert program.source.count("feature('open', 1)") == 1
+
+
+def test_subset_evaluation_and_records_use_program_metadata():
+    series = parse_mcp_csv(synthetic_payload(600))
+    program = BUILTIN.extend([INSIDE_BAR])
+
+    records = find_patterns(series, names=["Inside Bar"], program=program)
+
+    assert records and {record["name"] for record in records} == {"Inside Bar"}
+    assert records[0]["reliability"] == 48
+    assert list(program.evaluate(series.open, series.high, series.low, series.close, ["Doji"])) == ["Doji"]
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "volume > 3",
+        "close[-1] > open",
+        "close.real > 0",
+        "__import__('os')",
+        "close if open else high",
+        "close[k] > 0",
+        "not body",
+        "not (close - open)",
+        "body and bullish",
+        "bullish < 2",
+        "bearish[1] + 1 > 0",
+        "abs(bullish) > 0",
+    ],
+)
+def test_unsupported_expressions_are_rejected(condition):
+    with pytest.raises(PatternDefinitionError):
+        compile_patterns([{"name": "Bad", "when": [condition]}])
+
+
+@pytest.mark.parametrize("conditions", [["body"], ["bullish < 2"], ["body", "bullish"], ["bullish", "close - open"]])
+def test_every_condition_must_be_a_mask(conditions):
+    with pytest.raises(PatternDefinitionError, match="Bad"):
+        compile_patterns([{"name": "Bad", "when": conditions}])
+
+
+def test_not_negates_conditions_logically():
+    series = parse_mcp_csv(synthetic_payload(500, 3600, seed=2))
+    program = compile_patterns([{"name": "Not Up", "when": ["not bullish", "not close[1] > open[1]"]}])
+
+    mask = program.evaluate(series.open, series.high, series.low, series.close)["Not Up"]
+    up = series.close > series.open
+    np.testing.assert_array_equal(mask[1:], ~up[1:] & ~up[:-1])
+
+
+def test_pattern_files_load_from_json_and_yaml(tmp_path):
+    json_path = tmp_path / "patterns.json"
+    json_path.write_text(json.dumps({"patterns": [INSIDE_BAR]}), encoding="utf-8")
+    assert load_pattern_file(json_path) == [INSIDE_BAR]
+
+    pytest.importorskip("yaml")
+    yaml_path = tmp_path / "patterns.yaml"
+    yaml_path.write_text(
+        "- name: Inside Bar\n  when:\n    - high < high[1]\n    - low > low[1]\n",
+        encoding="utf-8",
+    )
+    assert load_pattern_file(yaml_path)[0]["when"] == ["high < high[1]", "low > low[1]"]
+
+
+def test_detector_runs_and_persists_custom_programs(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(300))
+    program = BUILTIN.extend([THREE_INSIDE_UP, {"name": "Five Up", "when": ["close[4] < close[3] < close[2] < close[1] < close"]}])
+    detector = PatternDetector(program=program, backfill=len(series))
+
+    events = detector.update_series("EURUSD", "H1", series[:250])
+    detector.save(tmp_path / "state.json")
+    restored = PatternDetector.load(tmp_path / "state.json")
+    later = restored.update_series("EURUSD", "H1", series)
+
+    expected = find_patterns(series, digits=5, program=program)
+    assert detector.window_bars == restored.window_bars == 5
+    assert [(e["name"], e["time"]) for e in events + later] == [(e["name"], e["time"]) for e in expected]
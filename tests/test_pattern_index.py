@@ -0,0 +1,131 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from bar_builder import StreamingBarBuilder, synthetic_ticks  # type: ignore  # noqa: E402
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_index import PatternIndex  # type: ignore  # noqa: E402
+from pattern_kernel import PATTERNS, find_patterns  # type: ignore  # noqa: E402
+
+
+def _index(*streams):
+    index = PatternIndex(sr_lookback=20)
+    for symbol, timeframe, series in streams:
+        index.index_series(symbol, timeframe, series)
+    return index
+
+
+def _streams():
+    return [
+        ("EURUSD", "H1", parse_mcp_csv(synthetic_payload(1500, 3600, seed=1))),
+        ("GBPUSD", "H1", parse_mcp_csv(synthetic_payload(1500, 3600, seed=2))),
+        ("GBPUSD", "H4", parse_mcp_csv(synthetic_payload(1500, 14400, seed=3))),
+    ]
+
+
+def test_records_match_full_history_scan_and_are_time_sorted():
+    streams = _streams()
+    index = _index(*streams)
+
+    records = index.to_dicts(index.query(symbols="GBPUSD", timeframes="H4"))
+
+    expected = find_patterns(streams[2][2], digits=5)
+    assert [(r["pattern"], r["time"], r["price"]) for r in records] == [(e["name"], e["time"], e["price"]) for e in expected]
+    assert (np.diff(index.records["time"]) >= 0).all()
+    assert len(index) == sum(len(find_patterns(series, digits=5)) for _, _, series in streams)
+
+
+def test_incremental_updates_equal_a_single_build():
+    streams = _streams()
+    incremental = PatternIndex(sr_lookback=20)
+    for cut in (400, 401, 1000, 1500):
+        for symbol, timeframe, series in streams:
+            incremental.index_series(symbol, timeframe, series[:cut])
+
+    assert incremental.index_series("EURUSD", "H1", streams[0][2]) == 0
+    assert incremental.records.tobytes() == _index(*streams).records.tobytes()
+
+
+def test_queries_match_brute_force_filters():
+    index = _index(*_streams())
+    records = index.to_dicts(index.records)
+    middle = int(index.records["time"][len(records) // 2])
+    cases = [
+        {},
+        {"start": middle},
+        {"start": middle, "end": middle + 20 * 86400, "symbols": ["gbpusd"]},
+        {"patterns": ["Doji", "Hammer"], "timeframes": "H1"},
+        {"bias": "bearish", "symbols": "EURUSD", "near": "resistance", "within_pips": 5},
+        {"patterns": "Bullish Engulfing", "bias": "Bearish"},
+        {"symbols": "USDJPY"},
+    ]
+
+    for case in cases:
+        def keep(record, time):
+            return (
+                case.get("start", -np.inf) <= time < case.get("end", np.inf)
+                and record["symbol"] in {s.upper() for s in np.atleast_1d(case.get("symbols", record["symbol"]))}
+                and record["timeframe"] in np.atleast_1d(case.get("timeframes", record["timeframe"]))
+                and record["pattern"] in np.atleast_1d(case.get("patterns", record["pattern"]))
+                and record["bias"].lower() == case.get("bias", record["bias"]).lower()
+                and (
+                    "near" not in case
+                    or (record[f"{case['near']}_pips"] is not None and record[f"{case['near']}_pips"] <= case["within_pips"] + 0.05)
+                )
+            )
+
+        expected = [r for r, t in zip(records, index.records["time"].tolist()) if keep(r, t)]
+        assert index.to_dicts(index.query(**case)) == expected, case
+
+
+def test_sr_proximity_is_measured_in_pips_from_prior_extremes():
+    highs = [1.1050, 1.1040, 1.1030, 1.1020, 1.1052]
+    lows = [1.0950, 1.0990, 1.0980, 1.0970, 1.0960]
+    opens = [1.1000, 1.1000, 1.0990, 1.0980, 1.0970]
+    closes = [1.1000, 1.0995, 1.0985, 1.0975, 1.1050]
+    series = CandleSeries(np.arange(5) * 3600, opens, highs, lows, closes)
+    index = PatternIndex(sr_lookback=4)
+
+    index.index_series("EURUSD", "H1", series)
+
+    last = [r for r in index.to_dicts(index.records) if r["time"].endswith("04:00:00")]
+    assert last and all(r["resistance_pips"] == -2.0 and r["support_pips"] == 10.0 for r in last)
+    assert all(r["support_pips"] is None for r in index.to_dicts(index.records) if not r["time"].endswith("04:00:00"))
+
+
+def test_save_load_round_trip_keeps_indexing_incrementally(tmp_path):
+    streams = _streams()
+    index = _index(*(stream[:2] + (stream[2][:1000],) for stream in streams))
+    index.save(tmp_path / "occurrences")
+
+    loaded = PatternIndex.load(tmp_path / "occurrences.json")
+    assert isinstance(loaded.records, np.memmap)
+    for symbol, timeframe, series in streams:
+        loaded.index_series(symbol, timeframe, series)
+    loaded.save(tmp_path / "occurrences")
+
+    again = PatternIndex.load(tmp_path / "occurrences")
+    assert again.records.tobytes() == _index(*streams).records.tobytes()
+    assert again.sr_lookback == 20 and again.symbols == ["EURUSD", "GBPUSD"]
+    with pytest.raises(ValueError):
+        again.query(near="pivot")
+
+
+def test_attached_index_follows_closed_bars():
+    builder = StreamingBarBuilder(["M15", "H1"])
+    index = PatternIndex()
+    index.attach(builder, "EURUSD")
+
+    builder.run(synthetic_ticks(30000))
+
+    h1 = index.to_dicts(index.query(timeframes="H1"))
+    expected = find_patterns(builder.series("H1"), digits=5)
+    assert [(r["pattern"], r["time"]) for r in h1] == [(e["name"], e["time"]) for e in expected]
+    assert set(index.patterns) == set(PATTERNS)
@@ -0,0 +1,143 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_kernel import PATTERNS, detect_masks, find_patterns, latest_patterns, pattern_masks  # type: ignore  # noqa: E402
+
+
+def _series(rows, start=1_700_000_000, step=3600):
+    opens, highs, lows, closes = zip(*rows)
+    return CandleSeries(np.arange(len(rows)) * step + start, opens, highs, lows, closes)
+
+
+def _reference(o, h, l, c, i):
+    """Per-bar rules written the way the example helpers do it."""
+
+    def body(k):
+        return abs(c[k] - o[k])
+
+    def bull(k):
+        return c[k] > o[k]
+
+    def bear(k):
+        return c[k] < o[k]
+
+    top, bottom = max(o[i], c[i]), min(o[i], c[i])
+    upper, lower, span = h[i] - top, bottom - l[i], h[i] - l[i]
+    ratio = body(i) / span if span > 0 else 0.0
+    found = set()
+    if ratio < 0.1:
+        found.add("Doji")
+    if lower > body(i) * 2 and upper < body(i) * 0.5 and ratio < 0.3:
+        found.add("Hammer")
+    if upper > body(i) * 2 and lower < body(i) * 0.5 and ratio < 0.3:
+        found.add("Shooting Star")
+    if ratio < 0.25 and upper > body(i) * 0.5 and lower > body(i) * 0.5:
+        found.add("Spinning Top")
+    if upper < body(i) * 0.15 and lower < body(i) * 0.15 and ratio > 0.7:
+        found.add("Bullish Marubozu" if bull(i) else "Bearish Marubozu" if bear(i) else "")
+    if i >= 1:
+        p = i - 1
+        mid = (o[p] + c[p]) / 2
+        if bear(p) and bull(i) and c[i] > o[p] and o[i] < c[p]:
+            found.add("Bullish Engulfing")
+        if bull(p) and bear(i) and c[i] < o[p] and o[i] > c[p]:
+            found.add("Bearish Engulfing")
+        if bear(p) and bull(i) and o[i] > c[p] and c[i] < o[p]:
+            found.add("Bullish Harami")
+        if bull(p) and bear(i) and o[i] < c[p] and c[i] > o[p]:
+            found.add("Bearish Harami")
+        if bear(p) and bull(i) and o[i] < c[p] and mid < c[i] < o[p]:
+            found.add("Piercing Line")
+        if bull(p) and bear(i) and o[i] > c[p] and o[p] < c[i] < mid:
+            found.add("Dark Cloud Cover")
+    if i >= 2:
+        q, p = i - 2, i - 1
+        star = body(p) < body(q) * 0.4
+        if bear(q) and star and bull(i) and c[i] > (o[q] + c[q]) / 2:
+            found.add("Morning Star")
+        if bull(q) and star and bear(i) and c[i] < (o[q] + c[q]) / 2:
+            found.add("Evening Star")
+        if bull(q) and bull(p) and bull(i) and c[q] < c[p] < c[i]:
+            found.add("Three White Soldiers")
+        if bear(q) and bear(p) and bear(i) and c[q] > c[p] > c[i]:
+            found.add("Three Black Crows")
+    found.discard("")
+    return found
+
+
+def test_masks_match_per_bar_rules_on_integer_points():
+    rng = np.random.default_rng(3)
+    size = 3000
+    o = rng.integers(1000, 1100, size)
+    c = o + rng.integers(-40, 41, size)
+    h = np.maximum(o, c) + rng.integers(0, 30, size)
+    l = np.minimum(o, c) - rng.integers(0, 30, size)
+
+    masks = pattern_masks(o, h, l, c)
+
+    for i in range(size):
+        expected = _reference(o.tolist(), h.tolist(), l.tolist(), c.tolist(), i)
+        assert {name for name, mask in masks.items() if mask[i]} == expected, i
+    assert all(masks[name].any() for name in PATTERNS), [name for name in PATTERNS if not masks[name].any()]
+
+
+def test_textbook_candles():
+    engulfing = _series([(1.1010, 1.1015, 1.0995, 1.1000), (1.0998, 1.1025, 1.0996, 1.1020)])
+    hammer = _series([(1.0990, 1.1002, 1.0960, 1.1000)])
+    crows = _series([(1.20, 1.201, 1.18, 1.185), (1.19, 1.191, 1.17, 1.175), (1.18, 1.181, 1.16, 1.165)])
+
+    assert [p["name"] for p in latest_patterns(engulfing)] == ["Bullish Engulfing"]
+    assert [p["name"] for p in latest_patterns(hammer, digits=4)] == ["Hammer"]
+    assert "Three Black Crows" in [p["name"] for p in latest_patterns(crows)]
+    assert not detect_masks(engulfing)["Three White Soldiers"].any()
+
+
+def test_multi_bar_patterns_need_history():
+    series = _series([(1.1010, 1.1015, 1.0995, 1.1000), (1.0998, 1.1025, 1.0996, 1.1020)])
+
+    assert [p["name"] for p in latest_patterns(series[1:])] == []
+
+
+def test_latest_is_a_slice_of_full_history():
+    series = parse_mcp_csv(synthetic_payload(5000))
+    everything = find_patterns(series, digits=5)
+
+    for bars in (1, 3, 40):
+        first_time = str(series.datetimes()[-bars]).replace("T", " ")
+        expected = [pattern for pattern in everything if pattern["time"] >= first_time]
+        assert latest_patterns(series, bars, digits=5) == expected
+
+
+def test_records_have_confluence_shape():
+    series = parse_mcp_csv(synthetic_payload(500))
+    record = find_patterns(series)[0]
+
+    assert set(record) == {"name", "type", "strength", "bias", "reliability", "price", "time"}
+    assert record["bias"] in {"Bullish", "Bearish", "Neutral"}
+    assert len(record["time"]) == 19
+
+
+def test_two_dimensional_blocks_match_per_series_masks():
+    first = parse_mcp_csv(synthetic_payload(800, seed=1))
+    second = parse_mcp_csv(synthetic_payload(800, seed=2))
+    block = {name: np.stack([getattr(first, name), getattr(second, name)]) for name in ("open", "high", "low", "close")}
+
+    masks = pattern_masks(block["open"], block["high"], block["low"], block["close"])
+
+    for row, series in enumerate((first, second)):
+        single = detect_masks(series)
+        assert all(np.array_equal(masks[name][row], single[name]) for name in PATTERNS)
+
+
+def test_unknown_pattern_name_is_rejected():
+    with pytest.raises(KeyError):
+        detect_masks(_series([(1.0, 1.1, 0.9, 1.05)]), names=["Abandoned Baby"])
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from pattern_kernel import PATTERNS, find_patterns  # type: ignore  # noqa: E402
+from pattern_reliability import (  # type: ignore  # noqa: E402
+    PRIOR_SAMPLES,
+    ReliabilityEngine,
+    ReliabilityTable,
+    measure_series,
+)
+
+HORIZONS = (1, 5, 20)
+
+
+def _brute_force(series, name, horizons=HORIZONS):
+    """Outcome sums of one pattern computed bar by bar."""
+    index = {str(t).replace("T", " "): i for i, t in enumerate(series.datetimes())}
+    sign = {"Bullish": 1, "Bearish": -1}.get(PATTERNS[name].bias, 1)
+    count, samples, returns, hits, mfe, mae = 0, [0] * 3, [0.0] * 3, [0] * 3, [], []
+    for pattern in find_patterns(series, digits=5, names=[name]):
+        i = index[pattern["time"]]
+        count += 1
+        entry = series.close[i]
+        for column, horizon in enumerate(horizons):
+            if i + horizon < len(series):
+                change = (series.close[i + horizon] - entry) / entry * sign
+                samples[column] += 1
+                returns[column] += change
+                hits[column] += change > 0
+        if i + horizons[-1] < len(series):
+            up = (series.high[i + 1 : i + 1 + horizons[-1]].max() - entry) / entry
+            down = (entry - series.low[i + 1 : i + 1 + horizons[-1]].min()) / entry
+            mfe.append(down if sign < 0 else up)
+            mae.append(up if sign < 0 else down)
+    return count, samples, returns, hits, sum(mfe), sum(mae)
+
+
+@pytest.mark.parametrize("name", ["Bearish Engulfing", "Hammer", "Three White Soldiers", "Doji"])
+def test_vectorised_outcomes_match_bar_by_bar(name):
+    series = parse_mcp_csv(synthetic_payload(3000, 3600, seed=4))
+
+    stats = measure_series(series, HORIZONS, digits=5)[name]
+
+    count, samples, returns, hits, mfe, mae = _brute_force(series, name)
+    assert stats.count == count > 0
+    assert stats.samples.tolist() == samples
+    np.testing.assert_allclose(stats.return_sum, returns, rtol=1e-9, atol=1e-12)
+    assert stats.mfe_sum == pytest.approx(mfe) and stats.mae_sum == pytest.approx(mae)
+    if PATTERNS[name].bias == "Neutral":
+        assert not stats.directional and stats.reliability() is None and stats.hits.sum() == 0
+    else:
+        assert stats.hits.tolist() == hits
+
+
+def test_reliability_shrinks_small_samples_towards_fifty():
+    series = parse_mcp_csv(synthetic_payload(3000, 3600, seed=4))
+    stats = measure_series(series, HORIZONS, digits=5)["Bearish Engulfing"]
+
+    hits, samples = stats.hit_rate(5)
+
+    assert stats.reliability() == round(100 * (hits + PRIOR_SAMPLES / 2) / (samples + PRIOR_SAMPLES))
+    assert abs(stats.reliability() - 50) < abs(100 * hits / samples - 50)
+
+
+def test_excursions_need_the_full_window():
+    rows = [(1.0, 1.0, 1.0, 1.0)] * 3 + [(1.0, 1.0, 0.9, 0.95), (0.94, 1.3, 0.94, 1.25), (1.25, 1.4, 1.2, 1.3)]
+    opens, highs, lows, closes = zip(*rows)
+    series = CandleSeries(np.arange(len(rows)) * 3600, opens, highs, lows, closes)
+
+    stats = measure_series(series, (1, 2))["Bullish Engulfing"]
+
+    assert stats.count == 1 and stats.samples.tolist() == [1, 0] and stats.excursions == 0
+    assert stats.return_sum[0] == pytest.approx((1.3 - 1.25) / 1.25)
+
+
+def test_table_falls_back_to_coarser_levels_and_applies_to_patterns(tmp_path):
+    streams = [
+        ("EURUSD", "H1", parse_mcp_csv(synthetic_payload(4000, 3600, seed=1))),
+        ("GBPUSD", "H1", parse_mcp_csv(synthetic_payload(4000, 3600, seed=2))),
+        ("GBPUSD", "H4", parse_mcp_csv(synthetic_payload(60, 14400, seed=3))),
+    ]
+    table = ReliabilityEngine(horizons=HORIZONS).build(streams)
+
+    h1 = table.get("Bullish Engulfing", "H1")
+    eurusd = table.get("Bullish Engulfing", "H1", "EURUSD")
+    assert h1.count == eurusd.count + table.get("Bullish Engulfing", "H1", "GBPUSD").count
+    assert table.reliability("Bullish Engulfing", "H1", "EURUSD") == (eurusd.reliability(), eurusd.hit_rate()[1])
+    # Too few H4 bars: the measured value comes from every stream merged.
+    overall = table.get("Bullish Engulfing")
+    assert table.reliability("Bullish Engulfing", "H4", "GBPUSD") == (overall.reliability(), overall.hit_rate()[1])
+    assert table.reliability("Doji", "H1") is None
+
+    applied = table.apply_by_timeframe(
+        {"H1": [{"name": "Bullish Engulfing", "reliability": 80}, {"name": "Doji", "reliability": 50}]}, "eurusd"
+    )["H1"]
+    assert applied[0]["reliability"] == eurusd.reliability() and applied[0]["reliability_samples"] > 0
+    assert applied[1] == {"name": "Doji", "reliability": 50}
+
+    restored = ReliabilityTable.load(table.save(tmp_path / "table.json"))
+    assert restored.streams() == table.streams()
+    assert restored.rows("H1") == table.rows("H1")
+    with pytest.raises(ValueError):
+        restored.add("EURUSD", "H1", {})
+
+
+def test_engine_caches_per_data_version(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(2000, 3600))
+    engine = ReliabilityEngine(tmp_path, HORIZONS)
+
+    first = engine.measure("EURUSD", "H1", series)
+    again = engine.measure("EURUSD", "H1", series)
+    changed = engine.measure("EURUSD", "H1", series[:-1])
+    other_settings = ReliabilityEngine(tmp_path, (1, 3)).measure("EURUSD", "H1", series)
+
+    assert (engine.hits, engine.misses) == (1, 2)
+    assert {name: stats.to_json() for name, stats in again.items()} == {name: stats.to_json() for name, stats in first.items()}
+    assert changed["Doji"].to_json() != first["Doji"].to_json()
+    assert other_settings["Doji"].horizons == (1, 3)
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from async_connector import AsyncMcpConnector  # type: ignore  # noqa: E402
+from mcp_csv import synthetic_payload  # type: ignore  # noqa: E402
+from mcp_replay import RecordedPayloads, ReplayServer  # type: ignore  # noqa: E402
+from price_cache import PriceCache  # type: ignore  # noqa: E402
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_stale_symbols_refresh_in_one_batch():
+    clock = Clock()
+    batches = []
+
+    def fetch_many(symbols):
+        batches.append(list(symbols))
+        return {symbol: 1.0 + len(batches) for symbol in symbols}
+
+    cache = PriceCache(max_staleness=5, fetch_many=fetch_many, clock=clock)
+    cache.update("eurusd", 1.08)
+    assert cache.prices(["EURUSD", "GBPUSD", "USDJPY"]) == {"EURUSD": 1.08, "GBPUSD": 2.0, "USDJPY": 2.0}
+
+    clock.now += 3
+    assert cache.price("GBPUSD") == 2.0
+    clock.now += 3
+    assert cache.prices(["EURUSD", "GBPUSD"]) == {"EURUSD": 3.0, "GBPUSD": 3.0}
+    assert batches == [["GBPUSD", "USDJPY"], ["EURUSD", "GBPUSD"]]
+    assert cache.stats()["batch_refreshes"] == 2
+
+
+def test_staleness_bounds_and_out_of_order_updates():
+    clock = Clock()
+    cache = PriceCache(max_staleness=5, fetch_one=lambda symbol: 0.0, clock=clock)
+    cache.update("EURUSD", 1.10, observed_at=999.0)
+    cache.update("EURUSD", 1.09, observed_at=990.0)
+
+    assert cache.get("EURUSD") == 1.10
+    clock.now += 10
+    assert cache.get("EURUSD") is None
+    assert cache.get("EURUSD", max_staleness=60) == 1.10
+    with pytest.raises(KeyError):
+        cache.price("EURUSD")
+
+
+def test_connector_batch_prices_use_one_round_trip():
+    recordings = RecordedPayloads.from_candles(
+        {symbol: {"H1": synthetic_payload(100, 3600, seed=index)} for index, symbol in enumerate(["EURUSD", "GBPUSD", "USDJPY"])}
+    )
+    server = ReplayServer(recordings)
+    host, port = server.start_background()
+    try:
+        with AsyncMcpConnector(host, port) as connector:
+            cache = PriceCache(fetch_many=connector.get_prices)
+            prices = cache.prices(["EURUSD", "GBPUSD", "USDJPY"])
+    finally:
+        server.stop_background()
+
+    assert prices["GBPUSD"] == recordings.price("GBPUSD")["bid"]
+    assert server.requests == 1
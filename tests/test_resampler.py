@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from resampler import derive_timeframes, resample  # type: ignore  # noqa: E402
+
+
+def _weekday_m15(days: int = 40) -> CandleSeries:
+    start = np.datetime64("2024-03-01T00:00")
+    times = np.arange(start, start + np.timedelta64(days, "D"), np.timedelta64(15, "m"))
+    times = times[pd.DatetimeIndex(times).dayofweek < 5].astype("datetime64[s]").view(np.int64)
+    rng = np.random.default_rng(3)
+    close = 1.08 + np.cumsum(rng.normal(0, 0.0004, times.shape[0]))
+    open_ = np.concatenate(([1.08], close[:-1]))
+    spread = rng.integers(0, 0.0008 * 1e5, times.shape[0]) / 1e5
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(10, 500, times.shape[0])
+    return CandleSeries(times, open_, high, low, close, volume, rng.integers(0, 20, times.shape[0]), volume * 0)
+
+
+@pytest.mark.parametrize("timeframe,rule", [("H1", "1h"), ("H4", "4h"), ("D1", "1D"), ("W1", "W-SUN")])
+def test_resample_matches_pandas(timeframe, rule):
+    series = _weekday_m15()
+    derived = derive_timeframes(series, "M15", [timeframe])[timeframe]
+
+    frame = series.to_pandas().set_index("time")
+    expected = (
+        frame.resample(rule, label="left", closed="left")
+        .agg({"open": "first", "high": "max", "low": "min", "close": "last", "tick_volume": "sum"})
+        .dropna()
+    )
+    assert np.array_equal(derived.datetimes(), expected.index.to_numpy().astype("datetime64[s]"))
+    for name in ("open", "high", "low", "close"):
+        assert np.array_equal(getattr(derived, name), expected[name].to_numpy())
+    assert np.array_equal(derived.tick_volume, expected["tick_volume"].to_numpy())
+
+
+def test_day_offset_and_incomplete_last_bucket():
+    series = _weekday_m15(5)  # Friday, weekend, Monday
+    shifted = resample(series, 86400, day_offset=7200)
+    assert (shifted.time % 86400 == 86400 - 7200).all()
+
+    partial = series[: 96 + 40]
+    assert len(resample(partial, 86400)) == 2
+    assert len(resample(partial, 86400, complete_only=True)) == 1
@@ -0,0 +1,76 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from single_flight import SingleFlight  # type: ignore  # noqa: E402
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight(ttl=0)
+    calls = []
+    release = threading.Event()
+
+    def fetch(keys):
+        calls.append(tuple(keys))
+        release.wait(1)
+        return {key: f"csv-{key[1]}" for key in keys}
+
+    keys = [("EURUSD", "H1", 250), ("EURUSD", "H4", 250)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do_many, keys, fetch) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert calls == [tuple(keys)]
+    assert all(result[keys[1]] == "csv-H4" for result in results)
+    assert flight.stats() == {"hits": 0, "misses": 2, "coalesced": 6, "round_trips_saved": 6}
+
+
+def test_ttl_reuse_and_partial_batches():
+    now = [100.0]
+    flight = SingleFlight(ttl=2.0, clock=lambda: now[0])
+    fetched = []
+
+    def fetch(keys):
+        fetched.append(list(keys))
+        return {key: key.lower() for key in keys}
+
+    assert flight.do_many(["H1", "H4"], fetch) == {"H1": "h1", "H4": "h4"}
+    assert flight.do_many(["H4", "D1"], fetch) == {"H4": "h4", "D1": "d1"}
+    now[0] += 5
+    flight.do("H1", lambda: "fresh")
+
+    assert fetched == [["H1", "H4"], ["D1"]]
+    assert flight.do("H1", lambda: "stale") == "fresh"
+    assert flight.stats()["hits"] == 2
+
+
+def test_errors_reach_waiters_and_are_not_cached():
+    flight = SingleFlight(ttl=10)
+    with pytest.raises(RuntimeError):
+        flight.do("H1", lambda: (_ for _ in ()).throw(RuntimeError("broker down")))
+    assert flight.do("H1", lambda: "ok") == "ok"
+    assert flight.stats()["misses"] == 2
+
+
+def test_rejected_values_reach_waiters_but_are_not_cached():
+    flight = SingleFlight(ttl=10)
+    payloads = iter([{"H1": "", "H4": "csv-h4"}, {"H1": "csv-h1"}])
+    fetched = []
+
+    def fetch(keys):
+        fetched.append(list(keys))
+        return next(payloads)
+
+    assert flight.do_many(["H1", "H4"], fetch, cacheable=bool) == {"H1": "", "H4": "csv-h4"}
+    assert flight.do_many(["H1", "H4"], fetch, cacheable=bool) == {"H1": "csv-h1", "H4": "csv-h4"}
+    assert fetched == [["H1", "H4"], ["H1"]]
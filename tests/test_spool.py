@@ -0,0 +1,44 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import synthetic_payload  # type: ignore  # noqa: E402
+from spool import read_spool, run_pattern_scan_from_spool, write_spool  # type: ignore  # noqa: E402
+
+MCP_DATA = {
+    "price": {"bid": 1.0849, "ask": 1.0851},
+    "candles_m15": synthetic_payload(300, 900),
+    "candles_h1": {"result": synthetic_payload(120, 3600)},
+}
+
+
+@pytest.mark.parametrize("name", ["mcp_data.jsonl", "mcp_data.jsonl.gz"])
+def test_round_trip_plain_and_gzip(tmp_path, name):
+    path = write_spool(tmp_path / name, MCP_DATA)
+    assert read_spool(path) == MCP_DATA
+    assert path.read_bytes()[:2] == (b"\x1f\x8b" if name.endswith(".gz") else b'{"')
+
+
+def test_stdin_and_plain_json_object(tmp_path, monkeypatch):
+    spool = write_spool(tmp_path / "spool.bin", MCP_DATA, compress=True)
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(spool.read_bytes())))
+    assert read_spool("-") == MCP_DATA
+
+    legacy = tmp_path / "mcp_data.json"
+    legacy.write_text(json.dumps(MCP_DATA, indent=2), encoding="utf-8")
+    assert read_spool(legacy) == MCP_DATA
+
+
+def test_run_pattern_scan_from_spool_hands_over_mcp_data(tmp_path):
+    spool = write_spool(tmp_path / "mcp_data.jsonl", MCP_DATA)
+    calls = []
+    result = run_pattern_scan_from_spool("EURUSD", spool, scan=lambda symbol, data: calls.append((symbol, data)) or "r.html")
+    assert result == "r.html"
+    assert calls == [("EURUSD", MCP_DATA)]
@@ -0,0 +1,119 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from sr_zones import SRZoneEngine, ZoneHistogram  # type: ignore  # noqa: E402
+from swings import HIGH, LOW, zigzag  # type: ignore  # noqa: E402
+
+
+def _histogram(engine, symbol="EURUSD", timeframe="D1"):
+    return engine.state()["streams"][f"{symbol}|{timeframe}"]["histogram"]
+
+
+def test_nearby_touches_merge_into_weighted_zones():
+    histogram = ZoneHistogram(0.0002)
+    prices = np.array([1.10001, 1.10021, 1.10041, 1.10501, 1.10001])
+    kinds = np.array([LOW, LOW, HIGH, HIGH, LOW], dtype=np.int8)
+
+    histogram.add(np.arange(5) * 86400, prices, kinds, np.array([1.0, 1.0, 2.0, 1.0, 1.0]))
+    zones = histogram.zones(radius=2)
+
+    assert [zone.touches for zone in zones] == [4, 1]
+    low_zone = zones[0]
+    assert low_zone.low == pytest.approx(1.1) and low_zone.high == pytest.approx(1.1006)
+    assert low_zone.center == pytest.approx((1.10001 * 2 + 1.10021 + 1.10041 * 2) / 5)
+    assert (low_zone.support_touches, low_zone.resistance_touches, low_zone.weight) == (3, 1, 5.0)
+    assert low_zone.last_touch == 4 * 86400
+
+
+def test_histogram_counts_every_confirmed_swing():
+    series = parse_mcp_csv(synthetic_payload(3000, 86400, seed=3))
+    engine = SRZoneEngine()
+
+    zones = engine.update("EURUSD", "D1", series)
+
+    swings = zigzag(series, include_pending=False)
+    histogram = _histogram(engine)
+    ids = np.floor(swings.price / histogram["bin_size"]).astype(np.int64) - histogram["origin"]
+    assert np.array_equal(np.bincount(ids, minlength=len(histogram["touches"])), histogram["touches"])
+    assert sum(zone.touches for zone in zones) == len(swings)
+    assert sum(zone.resistance_touches for zone in zones) == int((swings.kind == HIGH).sum())
+
+
+def test_sliding_updates_equal_a_single_build_and_hit_the_cache():
+    series = parse_mcp_csv(synthetic_payload(3000, 86400, seed=4))
+    single = SRZoneEngine()
+    single.update("EURUSD", "D1", series[:250])
+    single.update("EURUSD", "D1", series)
+
+    incremental = SRZoneEngine()
+    windows = range(250, 3001, 41)
+    for end in windows:
+        incremental.update("EURUSD", "D1", series[max(end - 250, 0) : end])
+    zones = incremental.update("EURUSD", "D1", series[-250:])
+    again = incremental.update("EURUSD", "D1", series[-250:])
+
+    expected, got = _histogram(single), _histogram(incremental)
+    for name in ("origin", "touches", "highs", "last_time"):
+        assert got[name] == expected[name], name
+    np.testing.assert_allclose(got["weight"], expected["weight"])
+    assert again is zones
+    assert incremental.stats() == {"streams": 1, "hits": 1, "updates": len(windows), "rebuilds": 1}
+
+    incremental.update("EURUSD", "D1", series[:100])
+    assert incremental.stats()["rebuilds"] == 2
+
+
+def _with_partial_last_bar(series):
+    """``series`` as fetched while its last bar was still forming: a narrower range so far."""
+    partial = series[:]
+    partial.high = series.high.copy()
+    partial.low = series.low.copy()
+    partial.close = series.close.copy()
+    opening = series.open[-1]
+    partial.high[-1] = opening + (series.high[-1] - opening) * 0.3
+    partial.low[-1] = opening - (opening - series.low[-1]) * 0.3
+    partial.close[-1] = opening
+    return partial
+
+
+def test_resuming_after_a_forming_bar_reads_it_again_once_closed():
+    series = parse_mcp_csv(synthetic_payload(3000, 86400, seed=8))
+    ends = list(range(250, 3001, 7))
+    closed = SRZoneEngine()
+    closed.update("EURUSD", "D1", series[:249])
+    closed.update("EURUSD", "D1", series[: ends[-1] - 1])
+
+    live = SRZoneEngine()
+    for end in ends:
+        live.update("EURUSD", "D1", _with_partial_last_bar(series[max(end - 250, 0) : end]), forming=True)
+
+    expected, got = _histogram(closed), _histogram(live)
+    for name in ("origin", "touches", "highs", "last_time"):
+        assert got[name] == expected[name], name
+    np.testing.assert_allclose(got["weight"], expected["weight"])
+    assert live.state()["streams"]["EURUSD|D1"]["zigzag"] == closed.state()["streams"]["EURUSD|D1"]["zigzag"]
+
+
+def test_levels_and_state_round_trip(tmp_path):
+    series = parse_mcp_csv(synthetic_payload(2000, 86400, seed=5))
+    engine = SRZoneEngine(zone_bins=3)
+    price = float(series.close[1500])
+
+    levels = engine.levels("EURUSD", "D1", series[:1500], price)
+    restored = SRZoneEngine.load(engine.save(tmp_path / "zones.json"))
+
+    assert levels["support"] == sorted(levels["support"], reverse=True) and max(levels["support"]) < price
+    assert levels["resistance"] == sorted(levels["resistance"]) and min(levels["resistance"]) > price
+    assert [zone["center"] for zone in levels["zones"]] == levels["support"] + levels["resistance"]
+    assert restored.zone_bins == 3
+    assert restored.levels("EURUSD", "D1", series, price) == engine.levels("EURUSD", "D1", series, price)
+    assert restored.stats()["updates"] == 1
+    assert SRZoneEngine.load(tmp_path / "missing.json").stats()["streams"] == 0
@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_context import CandleContext  # type: ignore  # noqa: E402
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from swings import (  # type: ignore  # noqa: E402
+    HIGH,
+    LOW,
+    fibonacci_levels,
+    fractal_swings,
+    reversal_threshold,
+    swing_levels,
+    zigzag,
+)
+
+
+def _series(closes):
+    closes = np.asarray(closes, dtype=float)
+    return CandleSeries(np.arange(len(closes)) * 3600, closes, closes + 0.0001, closes - 0.0001, closes)
+
+
+def test_zigzag_confirms_extremes_after_threshold_reversals():
+    series = _series([1.00, 1.02, 1.05, 1.04, 1.03, 1.01, 1.02, 1.06, 1.08, 1.07])
+
+    swings = zigzag(series, 0.03, mode="points")
+
+    assert swings.index.tolist() == [0, 2, 5, 8]
+    assert swings.kind.tolist() == [LOW, HIGH, LOW, HIGH]
+    assert swings.pending and swings.confirmed().index.tolist() == [0, 2, 5]
+    assert swings.price[1] == pytest.approx(1.0501)
+    assert zigzag(series, 0.03, mode="points", include_pending=False).index.tolist() == [0, 2, 5]
+
+
+@pytest.mark.parametrize("mode, threshold", [("percent", 0.3), ("atr", 3.0), ("points", 0.002)])
+def test_zigzag_legs_alternate_and_span_their_extremes(mode, threshold):
+    series = parse_mcp_csv(synthetic_payload(3000, 3600, seed=5))
+    reversal = reversal_threshold(series, threshold, mode)
+
+    swings = zigzag(series, threshold, mode)
+    confirmed = swings.confirmed()
+
+    assert len(confirmed) > 5 and (np.diff(swings.kind) != 0).all() and (np.diff(swings.index) > 0).all()
+    for a, b in zip(confirmed.index[:-1], confirmed.index[1:]):
+        segment = slice(a, b + 1)
+        if series.high[b] == confirmed.price[confirmed.index == b][0]:
+            assert series.high[b] == series.high[segment].max() and series.low[a] == series.low[segment].min()
+        else:
+            assert series.low[b] == series.low[segment].min() and series.high[a] == series.high[segment].max()
+    # Every confirmed extreme was followed by a reversal of at least the threshold.
+    for point, kind in zip(confirmed.index, confirmed.kind):
+        after = slice(point, None)
+        move = series.high[point] - series.low[after].min() if kind == HIGH else series.high[after].max() - series.low[point]
+        assert move >= reversal[point]
+
+
+def test_fractals_match_a_bar_by_bar_scan():
+    series = parse_mcp_csv(synthetic_payload(1500, 3600, seed=2))
+    left, right = 2, 3
+
+    swings = fractal_swings(series, left, right)
+
+    raw = []
+    for i in range(left, len(series) - right):
+        window = slice(i - left, i + right + 1)
+        if series.high[i] > series.high[i - left : i].max() and series.high[i] >= series.high[window].max():
+            raw.append((i, HIGH, series.high[i]))
+        if series.low[i] < series.low[i - left : i].min() and series.low[i] <= series.low[window].min():
+            raw.append((i, LOW, series.low[i]))
+    expected = []
+    for point in raw:
+        if expected and expected[-1][1] == point[1]:
+            if point[2] * point[1] > expected[-1][2] * expected[-1][1]:
+                expected[-1] = point
+        else:
+            expected.append(point)
+    assert list(zip(swings.index.tolist(), swings.kind.tolist())) == [(i, k) for i, k, _ in expected]
+
+
+def test_levels_and_fibonacci_come_from_the_same_swings():
+    series = _series([1.00, 1.02, 1.05, 1.04, 1.03, 1.01, 1.02, 1.06, 1.08, 1.07])
+    swings = zigzag(series, 0.03, mode="points")
+
+    levels = swing_levels(swings, 1.03)
+    fib = fibonacci_levels(swings)
+
+    assert levels["resistance"] == [pytest.approx(1.0501)]
+    assert levels["support"] == [pytest.approx(1.0099), pytest.approx(0.9999)]
+    assert levels["pivot"] == pytest.approx((1.0501 + 1.0099 + 1.03) / 3)
+    assert fib["direction"] == "up" and fib["levels"][0.5] == pytest.approx((1.0099 + 1.0801) / 2)
+    assert fibonacci_levels(zigzag(_series([1.0, 1.0]))) is None
+
+
+def test_context_computes_swings_once_per_payload():
+    context = CandleContext()
+    context.register("EURUSD", {"H1": synthetic_payload(500, 3600), "H4": synthetic_payload(500, 14400)})
+
+    first = context.swings_by_timeframe("EURUSD", ["H1", "H4", "D1"])
+    again = context.swings("EURUSD", "H1")
+    fractal = context.swings("EURUSD", "H1", method="fractal")
+
+    assert set(first) == {"H1", "H4"} and again is first["H1"] and fractal is not again
+    assert context.debug_stats()["swing_runs"] == 3
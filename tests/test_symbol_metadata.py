@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from symbol_metadata import (  # type: ignore  # noqa: E402
+    SymbolInfo,
+    SymbolRegistry,
+    from_points,
+    guess_symbol_info,
+    infer_digits,
+    to_points,
+)
+
+
+def test_pip_sizes_follow_symbol_conventions():
+    eurusd = guess_symbol_info("EURUSD")
+    usdjpy = guess_symbol_info("usdjpy.m")
+    gold = guess_symbol_info("XAUUSD")
+
+    assert (eurusd.digits, eurusd.points_per_pip) == (5, 10)
+    assert (usdjpy.symbol, usdjpy.digits, usdjpy.pip_size) == ("USDJPY.M", 3, 0.01)
+    assert gold.digits == 2 and gold.pip_size == 0.1
+    assert eurusd.pips(1.16386 - 1.16286) == pytest.approx(10.0)
+    assert usdjpy.pips(151.250 - 151.000) == pytest.approx(25.0)
+    assert gold.format_price(2650.5) == "2650.50"
+
+
+def test_registry_prefers_broker_metadata_and_widens_guesses_from_prices():
+    registry = SymbolRegistry()
+
+    broker = registry.register_broker_info("XAUUSD", {"digits": 3, "trade_contract_size": 100})
+    unknown = registry.get("FOOBAR", prices=[12.3456789, 12.3456780])
+
+    assert registry.get("xauusd") == broker
+    assert broker.digits == 3 and broker.pip_size == 0.1
+    assert unknown.digits == 7
+    assert "FOOBAR" in registry
+    with pytest.raises(ValueError):
+        registry.register(SymbolInfo("BAD", 12, 0.1))
+
+
+def test_name_only_guesses_are_not_cached_and_prices_widen_guesses():
+    registry = SymbolRegistry()
+
+    assert registry.get("FOOBAR").digits == 5
+    assert "FOOBAR" not in registry
+    assert registry.get("FOOBAR", prices=[12.345678, 12.3]).digits == 6
+    assert registry.get("FOOBAR", prices=[12.3456789]).digits == 7
+    assert registry.get("FOOBAR", prices=[12.3]).digits == 7
+    assert registry.get("FOOBAR").digits == 7
+
+    registry.register_broker_info("FOOBAR", {"digits": 4})
+    assert registry.get("FOOBAR", prices=[12.3456789]).digits == 4
+
+
+def test_infer_digits_sees_through_float_noise():
+    assert infer_digits([1.1638600000000001, 1.16426, 1.1]) == 5
+    assert infer_digits([151.25, 151.3]) == 2
+    assert infer_digits([2650.0, 2651.0]) == 0
+    assert infer_digits([]) is None
+
+
+def test_points_round_trip_exactly():
+    prices = np.array([1.1638600000000001, 1.16426, 0.99999, 151.253])
+
+    points = to_points(prices, 5)
+
+    assert points.dtype == np.int64
+    assert points.tolist() == [116386, 116426, 99999, 15125300]
+    assert np.array_equal(from_points(points, 5), np.round(prices, 5))
+    assert to_points(-1.000005, 5).tolist() == -100001
+
+
+def test_point_candles_use_int32_offsets_and_compare_exactly():
+    series = parse_mcp_csv(synthetic_payload(1000))
+
+    candles = series.to_points(5)
+
+    assert candles.open.dtype == np.int32
+    assert candles.nbytes * 2 == sum(getattr(series, name).nbytes for name in ("open", "high", "low", "close"))
+    assert (candles.high >= candles.low).all()
+    assert np.array_equal(candles.points("close"), to_points(series.close, 5))
+    np.testing.assert_allclose(candles.to_series().close, series.close, rtol=0, atol=1e-12)
+
+
+def test_point_candles_fall_back_to_int64_for_huge_ranges():
+    series = CandleSeries([0, 60], [1.0, 50000.0], [1.0, 50000.0], [1.0, 50000.0], [1.0, 50000.0])
+
+    candles = series.to_points(8)
+
+    assert candles.open.dtype == np.int64
+    assert candles.points("high").tolist() == [100000000, 5000000000000]
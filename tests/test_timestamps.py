@@ -0,0 +1,109 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))  # noqa: E402, N806
+
+from mcp_csv import parse_mcp_csv, synthetic_payload  # type: ignore  # noqa: E402
+from timestamps import decode_offsets, decode_timestamps, parse_timestamps  # type: ignore  # noqa: E402
+
+
+def _pandas_epoch(values):
+    times = pd.to_datetime(pd.Series(values), utc=True, format="mixed")
+    return times.dt.as_unit("s").astype("int64").to_numpy()
+
+
+def test_matches_pandas_across_dst_month_and_year_boundaries():
+    stamps = [
+        # US and EU DST transitions (broker offsets shift around these)
+        "2024-03-10 01:59:59-05:00",
+        "2024-03-10 03:00:00-04:00",
+        "2024-03-31 00:59:59+00:00",
+        "2024-03-31 03:00:00+03:00",
+        "2024-10-27 02:59:59+03:00",
+        "2024-10-27 02:00:00+02:00",
+        "2024-11-03 01:30:00-04:00",
+        "2024-11-03 01:30:00-05:00",
+        # month, year and leap-day boundaries
+        "2024-01-31 23:59:59+00:00",
+        "2024-02-29 12:00:00+00:00",
+        "2024-12-31 23:00:00-01:00",
+        "2025-01-01 00:00:00+00:00",
+        "2000-02-29 00:00:00+05:30",
+        "1999-12-31 23:59:59",
+        "1970-01-01T00:00:00",
+        "1969-12-31 23:59:59",
+    ]
+
+    assert np.array_equal(parse_timestamps(stamps), _pandas_epoch(stamps))
+
+
+def test_hourly_bars_over_several_years_match_pandas():
+    epoch = np.arange(1_500_000_000, 1_800_000_000, 3600 * 7 + 13)
+    offsets = np.array(["+00:00", "+02:00", "+03:00", "-04:00", "-05:00"])[epoch % 5]
+    plain = pd.Series(epoch.astype("datetime64[s]")).dt.strftime("%Y-%m-%d %H:%M:%S")
+    stamps = (plain + offsets).tolist()
+
+    assert np.array_equal(parse_timestamps(stamps), _pandas_epoch(stamps))
+
+
+def test_decodes_byte_matrices():
+    chars = np.frombuffer(b"2025-10-29 21:30:00+00:002025-10-29 21:15:00-01:30", dtype=np.uint8)
+
+    epoch = decode_timestamps(chars.reshape(2, 25))
+    offsets = decode_offsets(chars.reshape(2, 25)[:, 19:])
+
+    assert epoch.dtype == np.int64
+    assert epoch.tolist() == [1761773400, 1761773400 - 900 + 5400]
+    assert offsets.tolist() == [0, -5400]
+
+
+@pytest.mark.parametrize(
+    "stamp",
+    [
+        "2025-02-29 00:00:00",
+        "1900-02-29 00:00:00",
+        "2025-13-01 00:00:00",
+        "2025-00-10 00:00:00",
+        "2025-04-31 00:00:00",
+        "2025-01-01 24:00:00",
+        "2025-01-01 00:60:00",
+        "2025/01/01 00:00:00",
+        "2025-01-01_00:00:00",
+        "2O25-01-01 00:00:00",
+        "2025-01-01 00:00:00+0a:00",
+        "2025-01-01 00:00:00*00:00",
+        "2025-01-01 00:00",
+        "2025-01-01 00:00:00Z",
+    ],
+)
+def test_rejects_malformed_timestamps(stamp):
+    with pytest.raises(ValueError):
+        parse_timestamps([stamp])
+
+
+def test_mcp_csv_uses_decoder_for_large_and_small_payloads():
+    for rows in (100, 5000):
+        series = parse_mcp_csv(synthetic_payload(rows))
+        stamps = pd.Series(series.time.astype("datetime64[s]")).dt.strftime("%Y-%m-%d %H:%M:%S+00:00")
+
+        assert np.array_equal(series.time, _pandas_epoch(stamps))
+
+
+def test_mcp_csv_mixed_offsets_and_fallback():
+    rows = ["time,open,high,low,close,tick_volume,spread,real_volume"]
+    for index in range(600):
+        suffix = "+02:00" if index % 2 else ""
+        rows.append(f"2025-01-01 {index // 60 % 24:02d}:{index % 60:02d}:00{suffix},1.1,1.2,1.0,1.15,10,0,0")
+    series = parse_mcp_csv("\n".join(rows))
+    assert len(series) == 600
+
+    broken = "\n".join(rows).replace("2025-01-01 00:01:00+02:00", "2025-01-01 00:01:00+2:000")
+    # Outside the dialect: the pandas fallback rejects it too.
+    with pytest.raises(ValueError):
+        parse_mcp_csv(broken)
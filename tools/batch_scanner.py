@@ -4,6 +4,7 @@ Batch Pattern Scanner
 
 Usage:
     python tools/batch_scanner.py EURUSD GBPUSD XAUUSD --timeframes H1,H4,D1
+    python tools/batch_scanner.py EURUSD GBPUSD XAUUSD --patterns-only --pattern-bars 3
 """
 
 from __future__ import annotations
@@ -21,8 +22,22 @@ SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
 sys.path.insert(0, str(SKILL_PATH))
 sys.path.insert(0, str(TOOLS_DIR))
 
+from candle_context import CandleContext  # type: ignore  # noqa: E402
+from candle_series import CandleSeries  # type: ignore  # noqa: E402
 from console_utils import safe_console_output  # type: ignore  # noqa: E402
-from standalone_scanner import run_scan  # type: ignore  # noqa: E402
+from pattern_batch import batch_detect  # type: ignore  # noqa: E402
+from price_cache import PriceCache  # type: ignore  # noqa: E402
+from single_flight import SingleFlight  # type: ignore  # noqa: E402
+from pattern_reliability import ReliabilityTable  # type: ignore  # noqa: E402
+from sr_zones import SRZoneEngine  # type: ignore  # noqa: E402
+from standalone_scanner import (  # type: ignore  # noqa: E402
+    broker_offset_seconds,
+    fetch_market_data,
+    load_reliability,
+    load_zones,
+    run_scan,
+    use_mcp_server,
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -54,6 +69,75 @@ def parse_args() -> argparse.Namespace:
         default=4,
         help="Maximum number of concurrent workers (default: 4)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent candle cache shared by all symbols",
+    )
+    parser.add_argument(
+        "--broker-offset",
+        type=float,
+        default=0.0,
+        help="Broker server clock in hours east of UTC (e.g., 2 or 3); MT5 bar times use it (default: 0)",
+    )
+    parser.add_argument(
+        "--reliability",
+        type=Path,
+        help="Reliability table JSON (tools/build_reliability_table.py) applied to every symbol",
+    )
+    parser.add_argument(
+        "--zones",
+        type=Path,
+        help="Support/resistance zone state JSON shared by every symbol (updated incrementally, saved after the run)",
+    )
+    parser.add_argument(
+        "--patterns-only",
+        action="store_true",
+        help="Skip the reports: load candles for every symbol and detect patterns in one batch per timeframe",
+    )
+    parser.add_argument(
+        "--pattern-bars",
+        type=int,
+        default=1,
+        help="With --patterns-only, report patterns completing on the last N closed bars (default: 1)",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Print candle parse counters for every scan",
+    )
+    parser.add_argument(
+        "--base-timeframe",
+        help="Fetch only this timeframe per symbol and resample the others locally",
+    )
+    parser.add_argument(
+        "--coalesce-ttl",
+        type=float,
+        default=2.0,
+        help="Seconds identical candle fetches are shared across symbols/scans (0 = only in-flight, default: 2)",
+    )
+    parser.add_argument(
+        "--price-staleness",
+        type=float,
+        default=5.0,
+        help="Max age in seconds of a cached price before it is fetched again (default: 5)",
+    )
+    parser.add_argument(
+        "--mcp-server",
+        help="HOST:PORT of a JSON-lines MCP bridge; all symbols share one pooled async connector",
+    )
+    parser.add_argument(
+        "--mcp-pool-size",
+        type=int,
+        default=8,
+        help="Persistent MCP sessions (and concurrent requests) for --mcp-server (default: 8)",
+    )
+    parser.add_argument(
+        "--mcp-timeout",
+        type=float,
+        default=10.0,
+        help="Per-request timeout in seconds for --mcp-server (default: 10)",
+    )
     return parser.parse_args()
 
 
@@ -70,6 +154,14 @@ def scan_symbol(
     output_dir: Path,
     sample_dir: Optional[Path],
     open_browser: bool,
+    debug: bool = False,
+    cache_dir: Optional[Path] = None,
+    base_timeframe: Optional[str] = None,
+    flight: Optional[SingleFlight] = None,
+    price_cache: Optional[PriceCache] = None,
+    reliability: Optional[ReliabilityTable] = None,
+    zones: Optional[SRZoneEngine] = None,
+    broker_offset: int = 0,
 ) -> Dict[str, Any]:
     try:
         sample_path = resolve_sample_path(sample_dir, symbol)
@@ -79,6 +171,14 @@ def scan_symbol(
             output_dir=output_dir,
             sample_data=sample_path,
             open_browser=open_browser,
+            debug=debug,
+            cache_dir=cache_dir,
+            base_timeframe=base_timeframe,
+            flight=flight,
+            price_cache=price_cache,
+            reliability=reliability,
+            zones=zones,
+            broker_offset=broker_offset,
         )
         return {
             "symbol": symbol,
@@ -92,6 +192,86 @@ def scan_symbol(
         return {"symbol": symbol, "status": "error", "error": str(exc)}
 
 
+def load_series(
+    symbol: str,
+    timeframes: List[str],
+    sample_dir: Optional[Path],
+    cache_dir: Optional[Path] = None,
+    flight: Optional[SingleFlight] = None,
+    price_cache: Optional[PriceCache] = None,
+    broker_offset: int = 0,
+    closed_only: bool = False,
+) -> Dict[str, CandleSeries]:
+    """Candle series per timeframe; with ``closed_only`` live fetches lose their forming last bar."""
+    context = CandleContext()
+    sample_path = resolve_sample_path(sample_dir, symbol)
+    candles, _ = fetch_market_data(
+        symbol,
+        timeframes,
+        sample_path=sample_path,
+        context=context,
+        cache_dir=cache_dir,
+        flight=flight,
+        price_cache=price_cache,
+        broker_offset=broker_offset,
+    )
+    for timeframe in timeframes:
+        if candles.get(timeframe):
+            context.series(symbol, timeframe, candles[timeframe])
+    series = context.series_by_timeframe(symbol, timeframes)
+    if closed_only and sample_path is None:
+        series = {timeframe: bars[:-1] for timeframe, bars in series.items()}
+    return series
+
+
+def scan_patterns(
+    symbols: List[str],
+    timeframes: List[str],
+    bars: int,
+    executor: concurrent.futures.Executor,
+    **load_options: Any,
+) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Patterns on the last ``bars`` closed bars per symbol and timeframe.
+
+    Candles load concurrently and detection runs once per timeframe; the
+    bar still forming on live data is left out, as in the zone engine.
+    """
+    futures = {
+        symbol: executor.submit(load_series, symbol, timeframes, closed_only=True, **load_options) for symbol in symbols
+    }
+    loaded: Dict[str, Dict[str, CandleSeries]] = {}
+    for symbol, future in futures.items():
+        try:
+            loaded[symbol] = future.result()
+        except Exception as exc:
+            safe_console_output(f"[ERROR] {symbol}: {exc}")
+
+    results: Dict[str, Dict[str, List[Dict[str, Any]]]] = {symbol: {} for symbol in loaded}
+    for timeframe in timeframes:
+        block = {symbol: series[timeframe] for symbol, series in loaded.items() if timeframe in series}
+        for symbol, patterns in batch_detect(block, bars=bars).items():
+            results[symbol][timeframe] = patterns
+    return results
+
+
+def report_patterns(results: Dict[str, Dict[str, List[Dict[str, Any]]]]) -> None:
+    safe_console_output("")
+    safe_console_output("Patrones detectados:")
+    for symbol, by_timeframe in results.items():
+        found = [(timeframe, pattern) for timeframe, patterns in by_timeframe.items() for pattern in patterns]
+        if not found:
+            safe_console_output(f"  {symbol}: sin patrones")
+            continue
+        safe_console_output(f"  {symbol}:")
+        for timeframe, pattern in found:
+            safe_console_output(
+                f"      {timeframe:<4} {pattern['time']}  {pattern['name']} ({pattern['bias']}, {pattern['reliability']}%)"
+            )
+    if not results:
+        safe_console_output("[WARN] No se pudieron cargar velas para ningun simbolo.")
+
+
 def main() -> None:
     args = parse_args()
     timeframes = [tf.strip().upper() for tf in args.timeframes.split(",") if tf.strip()]
@@ -105,6 +285,37 @@ def main() -> None:
         f"-> Ejecutando escaneo en lote para: {', '.join(sym.upper() for sym in args.symbols)}"
     )
 
+    reliability = load_reliability(args.reliability)
+    zones = load_zones(args.zones)
+    broker_offset = broker_offset_seconds(args.broker_offset)
+    flight = SingleFlight(ttl=args.coalesce_ttl)
+    connector = use_mcp_server(args.mcp_server, args.mcp_pool_size, args.mcp_timeout) if args.mcp_server else None
+    price_cache = PriceCache(args.price_staleness, fetch_many=connector.get_prices if connector else None)
+    if connector:
+        try:
+            price_cache.refresh(sym.upper() for sym in args.symbols)
+        except Exception as exc:
+            safe_console_output(f"[WARN] No se pudieron precargar los precios: {exc}")
+
+    if args.patterns_only:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.max_workers) as executor:
+            report_patterns(
+                scan_patterns(
+                    [symbol.upper() for symbol in args.symbols],
+                    timeframes,
+                    args.pattern_bars,
+                    executor,
+                    sample_dir=args.sample_dir,
+                    cache_dir=args.cache_dir,
+                    flight=flight,
+                    price_cache=price_cache,
+                    broker_offset=broker_offset,
+                )
+            )
+        if connector:
+            connector.close()
+        return
+
     results: List[Dict[str, Any]] = []
     with concurrent.futures.ThreadPoolExecutor(max_workers=args.max_workers) as executor:
         futures = [
@@ -115,11 +326,23 @@ def main() -> None:
                 output_dir=output_dir,
                 sample_dir=args.sample_dir,
                 open_browser=args.open,
+                debug=args.debug,
+                cache_dir=args.cache_dir,
+                base_timeframe=args.base_timeframe.upper() if args.base_timeframe else None,
+                flight=flight,
+                price_cache=price_cache,
+                reliability=reliability,
+                zones=zones,
+                broker_offset=broker_offset,
             )
             for symbol in args.symbols
         ]
         for future in concurrent.futures.as_completed(futures):
             results.append(future.result())
+    if connector:
+        connector.close()
+    if zones is not None:
+        zones.save(args.zones)
 
     ok_results = [res for res in results if res["status"] == "ok"]
     safe_console_output("")
@@ -133,6 +356,17 @@ def main() -> None:
     if not ok_results:
         safe_console_output("[WARN] No se generaron reportes exitosos.")
 
+    stats = flight.stats()
+    if stats["misses"] or args.debug:
+        safe_console_output(
+            f"-> Peticiones de velas: {stats['misses']} al broker, {stats['hits']} desde cache,"
+            f" {stats['coalesced']} compartidas en vuelo ({stats['round_trips_saved']} evitadas)"
+        )
+    if args.debug:
+        safe_console_output(
+            "[DEBUG] price cache: " + ", ".join(f"{name}={value}" for name, value in price_cache.stats().items())
+        )
+
 
 if __name__ == "__main__":
     main()
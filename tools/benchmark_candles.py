@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Candle Pipeline Benchmarks
+
+Usage:
+    python tools/benchmark_candles.py parse --rows 100,10000,1000000
+    python tools/benchmark_candles.py tail --rows 250,10000
+    python tools/benchmark_candles.py ticks --rows 100000,1000000
+    python tools/benchmark_candles.py validate --rows 1000000
+    python tools/benchmark_candles.py connector --rows 4,16
+    python tools/benchmark_candles.py timestamps --rows 1000,1000000
+    python tools/benchmark_candles.py patterns --rows 1000,1000000
+    python tools/benchmark_candles.py dsl --rows 1000,1000000
+    python tools/benchmark_candles.py reliability --rows 62000
+    python tools/benchmark_candles.py batch --rows 100,1000
+    python tools/benchmark_candles.py swings --rows 10000,1000000
+    python tools/benchmark_candles.py zones --rows 5000,100000
+    python tools/benchmark_candles.py levels --rows 100,10000
+    python tools/benchmark_candles.py indicators --rows 10000,1000000
+
+Times the pattern-scanner candle hot paths against synthetic MCP payloads
+(newest-first rows, leading index column, ``+00:00`` timestamps, noisy floats).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+INDICATOR_PATH = REPO_ROOT / ".claude" / "skills" / "technical-analysis" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+sys.path.insert(0, str(INDICATOR_PATH))
+
+from console_utils import safe_console_output  # noqa: E402
+from async_connector import AsyncMcpConnector  # noqa: E402
+from bar_builder import FileReplayTickSource, StreamingBarBuilder, synthetic_ticks, write_tick_file  # noqa: E402
+from candle_payload import CandlePayload  # noqa: E402
+from candle_series import timeframe_seconds  # noqa: E402
+from candle_validation import validate_timeframes  # noqa: E402
+from indicator_engine import IndicatorEngine  # noqa: E402
+from level_index import LevelIndex  # noqa: E402
+from mcp_csv import parse_mcp_csv, parse_with_pandas, synthetic_payload  # noqa: E402
+from mcp_replay import RecordedPayloads, ReplayServer  # noqa: E402
+from pattern_batch import batch_detect  # noqa: E402
+from pattern_dsl import compile_patterns  # noqa: E402
+from pattern_kernel import BUILTIN, detect_masks, find_patterns, latest_patterns  # noqa: E402
+from pattern_reliability import ReliabilityEngine  # noqa: E402
+from sr_zones import SRZoneEngine  # noqa: E402
+from swings import fractal_swings, swing_levels, zigzag  # noqa: E402
+from timestamps import decode_timestamps  # noqa: E402
+
+CONNECTOR_LATENCY = 0.02
+
+CUSTOM_PATTERNS = [
+    {"name": "Inside Bar", "when": ["high < high[1]", "low > low[1]"]},
+    {"name": "Outside Bar", "when": ["high > high[1]", "low < low[1]"]},
+    {"name": "Three Inside Up", "when": ["bearish[2]", "bullish[1]", "close[1] > mid[2]", "close > open[2]"]},
+    {"name": "Long Legged Doji", "when": ["body_ratio < 0.1", "min(upper, lower) > range * 0.3"]},
+]
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(title: str, rows: int, timings: Dict[str, float]) -> None:
+    baseline = next(iter(timings.values()))
+    safe_console_output(f"{title} | {rows:>9,d} rows")
+    for label, seconds in timings.items():
+        speedup = baseline / seconds if seconds else float("inf")
+        safe_console_output(f"    {label:<18} {seconds * 1000:>10.2f} ms   x{speedup:5.1f}")
+
+
+def bench_parse(rows_list: List[int], repeat: int) -> None:
+    for rows in rows_list:
+        payload = synthetic_payload(rows)
+        timings = {
+            "pandas": best_of(lambda: parse_with_pandas(payload), repeat),
+            "mcp fast path": best_of(lambda: parse_mcp_csv(payload), repeat),
+        }
+        report("parse", rows, timings)
+
+
+def bench_tail(rows_list: List[int], repeat: int) -> None:
+    for rows in rows_list:
+        payload = synthetic_payload(rows)
+        timings = {
+            "full parse": best_of(lambda: parse_mcp_csv(payload).last_close(), repeat),
+            "lazy last close": best_of(lambda: CandlePayload(payload).last_close(), repeat),
+            "lazy latest(3)": best_of(lambda: CandlePayload(payload).latest(3), repeat),
+        }
+        report("tail", rows, timings)
+
+
+def bench_ticks(rows_list: List[int], repeat: int) -> None:
+    timeframes = ["M1", "M5", "M15", "H1", "H4", "D1"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in rows_list:
+            ticks = synthetic_ticks(rows)
+            replay = write_tick_file(Path(tmp) / "ticks.csv", ticks)
+            timings = {
+                "in-memory ticks": best_of(lambda: StreamingBarBuilder(timeframes).run(ticks), repeat),
+                "file replay": best_of(
+                    lambda: StreamingBarBuilder(timeframes).run(FileReplayTickSource(replay)), repeat
+                ),
+            }
+            report(f"ticks ({len(timeframes)} timeframes)", rows, timings)
+            per_tick = timings["in-memory ticks"] / rows * 1e6
+            safe_console_output(f"    {'per tick':<18} {per_tick:>10.2f} us")
+
+
+def _validate_with_pandas(frame: pd.DataFrame, period: int) -> Dict[str, bool]:
+    step = frame["time"].diff().dt.total_seconds().iloc[1:]
+    body_top = frame[["open", "close"]].max(axis=1)
+    body_bottom = frame[["open", "close"]].min(axis=1)
+    return {
+        "duplicates": bool(frame["time"].duplicated().any()),
+        "monotonic": bool(frame["time"].is_monotonic_increasing),
+        "gaps": bool((step > period).any()),
+        "ohlc": bool(((frame["high"] < body_top) | (frame["low"] > body_bottom)).any()),
+        "enough": len(frame) >= 50,
+    }
+
+
+def bench_validate(rows_list: List[int], repeat: int) -> None:
+    timeframes = {"M15": 900, "H1": 3600, "H4": 14400, "D1": 86400}
+    for rows in rows_list:
+        base = parse_mcp_csv(synthetic_payload(rows))
+        series = {tf: base for tf in timeframes}
+        frames = {tf: base.to_pandas() for tf in timeframes}
+        timings = {
+            "pandas per tf": best_of(
+                lambda: [_validate_with_pandas(frames[tf], period) for tf, period in timeframes.items()], repeat
+            ),
+            "vectorised bulk": best_of(lambda: validate_timeframes(series), repeat),
+        }
+        report(f"validate ({len(timeframes)} timeframes)", rows, timings)
+
+
+def _with_numpy_datetime64(chars: np.ndarray) -> np.ndarray:
+    stamps = np.ascontiguousarray(chars[:, :19]).view("S19").ravel()
+    epoch = stamps.astype("datetime64[s]").view(np.int64)
+    sign = np.where(chars[:, 19] == ord("-"), -1, 1)
+    digits = chars[:, [20, 21, 23, 24]].astype(np.int64) - ord("0")
+    return epoch - sign * ((digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 2] * 10 + digits[:, 3]) * 60)
+
+
+def bench_timestamps(rows_list: List[int], repeat: int) -> None:
+    for rows in rows_list:
+        epoch = parse_mcp_csv(synthetic_payload(rows)).time
+        text = pd.Series(epoch.astype("datetime64[s]")).dt.strftime("%Y-%m-%d %H:%M:%S+00:00")
+        chars = np.frombuffer("".join(text).encode("ascii"), dtype=np.uint8).reshape(rows, 25)
+        timings = {
+            "pandas": best_of(lambda: pd.to_datetime(text, utc=True), repeat),
+            "numpy datetime64": best_of(lambda: _with_numpy_datetime64(chars), repeat),
+            "digit decoder": best_of(lambda: decode_timestamps(chars), repeat),
+        }
+        report("timestamps (+00:00)", rows, timings)
+
+
+def bench_patterns(rows_list: List[int], repeat: int) -> None:
+    per_bar_limit = 2000
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows))
+        bars = min(rows, per_bar_limit)
+        timings = {
+            "latest() per bar": best_of(
+                lambda: [latest_patterns(series[: rows - back]) for back in range(bars)], repeat
+            )
+            * rows
+            / bars,
+            "full-history masks": best_of(lambda: detect_masks(series), repeat),
+            "masks (points)": best_of(lambda: detect_masks(series, digits=5), repeat),
+            "latest bar": best_of(lambda: latest_patterns(series), repeat),
+            "records (last 500)": best_of(lambda: find_patterns(series, start=-500), repeat),
+        }
+        report("patterns (16 rules)", rows, timings)
+        if bars < rows:
+            safe_console_output(f"    (per-bar time extrapolated from the last {bars:,d} bars)")
+
+
+def _custom_per_bar(o: List[float], h: List[float], l: List[float], c: List[float], i: int) -> int:
+    found = 0
+    body, span = abs(c[i] - o[i]), h[i] - l[i]
+    found += h[i] < h[i - 1] and l[i] > l[i - 1]
+    found += h[i] > h[i - 1] and l[i] < l[i - 1]
+    found += c[i - 2] < o[i - 2] and c[i - 1] > o[i - 1] and c[i - 1] > (o[i - 2] + c[i - 2]) / 2 and c[i] > o[i - 2]
+    found += span > 0 and body / span < 0.1 and min(h[i] - max(o[i], c[i]), min(o[i], c[i]) - l[i]) > span * 0.3
+    return found
+
+
+def bench_dsl(rows_list: List[int], repeat: int) -> None:
+    per_bar_limit = 20000
+    custom = compile_patterns(CUSTOM_PATTERNS)
+    combined = BUILTIN.extend(CUSTOM_PATTERNS)
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows))
+        columns = [getattr(series, name) for name in ("open", "high", "low", "close")]
+        lists = [values.tolist() for values in columns]
+        bars = min(rows, per_bar_limit)
+        timings = {
+            "4 rules per bar": best_of(
+                lambda: [_custom_per_bar(*lists, i) for i in range(max(rows - bars, 2), rows)], repeat
+            )
+            * rows
+            / bars,
+            "4 rules compiled": best_of(lambda: custom.evaluate(*columns), repeat),
+            "16 built-in": best_of(lambda: BUILTIN.evaluate(*columns), repeat),
+            "16 + 4 fused": best_of(lambda: combined.evaluate(*columns), repeat),
+        }
+        report("pattern DSL (user rules)", rows, timings)
+        if bars < rows:
+            safe_console_output(f"    (per-bar time extrapolated from the last {bars:,d} bars)")
+
+
+def _outcomes_per_occurrence(series, horizon: int = 20) -> int:
+    close, high, low = series.close.tolist(), series.high.tolist(), series.low.tolist()
+    index = {str(t).replace("T", " "): i for i, t in enumerate(series.datetimes())}
+    measured = 0
+    for pattern in find_patterns(series, digits=5):
+        i = index[pattern["time"]]
+        if i + horizon < len(close):
+            entry = close[i]
+            _ = [(close[i + h] - entry) / entry for h in (1, 3, 5, 10, 20)]
+            _ = (max(high[i + 1 : i + 1 + horizon]) - entry, entry - min(low[i + 1 : i + 1 + horizon]))
+            measured += 1
+    return measured
+
+
+def bench_reliability(rows_list: List[int], repeat: int) -> None:
+    streams = 50
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows, 3600))
+        universe = [(f"SYM{index:02d}", "H1", series) for index in range(streams)]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ReliabilityEngine(cache_dir).build(universe)
+            timings = {
+                "per occurrence": best_of(lambda: _outcomes_per_occurrence(series), 1) * streams,
+                "vectorised": best_of(lambda: ReliabilityEngine().build(universe), repeat),
+                "cached": best_of(lambda: ReliabilityEngine(cache_dir).build(universe), repeat),
+            }
+        report(f"reliability ({streams} symbols, H1)", rows, timings)
+        safe_console_output("    (per-occurrence time extrapolated from one symbol)")
+
+
+def bench_batch(rows_list: List[int], repeat: int) -> None:
+    bars = 500
+    distinct = [parse_mcp_csv(synthetic_payload(bars, 3600, seed=seed)) for seed in range(50)]
+    for rows in rows_list:
+        universe = {f"SYM{index:04d}": distinct[index % len(distinct)] for index in range(rows)}
+        timings = {
+            "per symbol": best_of(lambda: [latest_patterns(series, digits=5) for series in universe.values()], repeat),
+            "batched": best_of(lambda: batch_detect(universe), repeat),
+            "batched, last 10": best_of(lambda: batch_detect(universe, bars=10), repeat),
+        }
+        report(f"batch latest patterns ({bars} bars each)", rows, timings)
+        safe_console_output("    (rows = symbols)")
+
+
+def _fractals_per_bar(highs: List[float], lows: List[float], start: int, end: int, side: int = 2) -> int:
+    found = 0
+    for i in range(max(start, side), min(end, len(highs) - side)):
+        window_high, window_low = highs[i - side : i + side + 1], lows[i - side : i + side + 1]
+        found += highs[i] == max(window_high) or lows[i] == min(window_low)
+    return found
+
+
+def bench_swings(rows_list: List[int], repeat: int) -> None:
+    per_bar_limit = 20000
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows))
+        frame = pd.DataFrame({"high": series.high, "low": series.low})
+        highs, lows = series.high.tolist(), series.low.tolist()
+        bars = min(rows, per_bar_limit)
+        timings = {
+            "fractals per bar": best_of(lambda: _fractals_per_bar(highs, lows, rows - bars, rows), repeat) * rows / bars,
+            "rolling max/min": best_of(
+                lambda: (frame["high"].rolling(20).max(), frame["low"].rolling(20).min()), repeat
+            ),
+            "fractals": best_of(lambda: fractal_swings(series), repeat),
+            "zigzag (3 ATR)": best_of(lambda: zigzag(series), repeat),
+            "zigzag (0.5%)": best_of(lambda: zigzag(series, 0.5, "percent"), repeat),
+        }
+        report("swing points", rows, timings)
+        if bars < rows:
+            safe_console_output(f"    (per-bar time extrapolated from the last {bars:,d} bars)")
+
+
+def bench_zones(rows_list: List[int], repeat: int) -> None:
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows + 1, 86400))
+        history, price = series[:rows], float(series.close[-1])
+        frame = pd.DataFrame({"high": history.high, "low": history.low})
+        warm = SRZoneEngine()
+        warm.update("EURUSD", "D1", history)
+        restored = iter([SRZoneEngine.from_state(warm.state()) for _ in range(repeat)])
+
+        timings = {
+            "rolling max/min": best_of(
+                lambda: (frame["high"].rolling(20).max().iloc[-1], frame["low"].rolling(20).min().iloc[-1]), repeat
+            ),
+            "swing levels": best_of(lambda: swing_levels(zigzag(history), price), repeat),
+            "zones (rebuild)": best_of(lambda: SRZoneEngine().levels("EURUSD", "D1", history, price), repeat),
+            "zones (+1 bar)": best_of(lambda: next(restored).levels("EURUSD", "D1", series, price), repeat),
+            "zones (cached)": best_of(lambda: warm.levels("EURUSD", "D1", history, price), repeat),
+        }
+        report("support/resistance (D1)", rows, timings)
+
+
+def _near_by_scanning(levels_by_timeframe: Dict[str, Dict[str, List[float]]], price: float, reach: float) -> int:
+    found = 0
+    for levels in levels_by_timeframe.values():
+        for side in ("support", "resistance"):
+            found += sum(abs(level - price) <= reach for level in levels[side])
+    return found
+
+
+def bench_levels(rows_list: List[int], repeat: int) -> None:
+    patterns = 1000
+    rng = np.random.default_rng(7)
+    prices = (1.1 + rng.normal(0, 0.01, patterns)).tolist()
+    for rows in rows_list:
+        # ``rows`` levels per timeframe on M15/H1/H4/D1, split between support and resistance.
+        levels_by_timeframe = {
+            timeframe: {
+                "support": sorted((1.1 + rng.normal(0, 0.02, rows // 2)).tolist()),
+                "resistance": sorted((1.1 + rng.normal(0, 0.02, rows - rows // 2)).tolist()),
+            }
+            for timeframe in ("M15", "H1", "H4", "D1")
+        }
+        index = LevelIndex(levels_by_timeframe, 0.0001)
+        timings = {
+            "nested scan": best_of(lambda: [_near_by_scanning(levels_by_timeframe, p, 0.001) for p in prices], repeat),
+            "bisect index": best_of(lambda: [index.within(p, 10) for p in prices], repeat),
+            "index build": best_of(lambda: LevelIndex(levels_by_timeframe, 0.0001), repeat),
+        }
+        report(f"S/R proximity ({patterns} patterns, 4 tf)", rows, timings)
+        safe_console_output("    (rows = levels per timeframe)")
+
+
+def _pandas_indicators(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """The analysis scripts' per-indicator helpers: every indicator rebuilds its own windows."""
+    close = df["close"]
+    out = {f"sma_{n}": close.rolling(n).mean() for n in (20, 50, 200)}
+    out.update({f"ema_{n}": close.ewm(span=n, adjust=False).mean() for n in (12, 26)})
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    out["rsi"] = 100 - 100 / (1 + gain / loss)
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    out["macd"], out["macd_signal"] = macd, macd.ewm(span=9, adjust=False).mean()
+    middle, deviation = close.rolling(20).mean(), close.rolling(20).std()
+    out["bb_upper"], out["bb_lower"] = middle + 2 * deviation, middle - 2 * deviation
+    lowest, highest = df["low"].rolling(14).min(), df["high"].rolling(14).max()
+    out["stoch_k"] = 100 * (close - lowest) / (highest - lowest)
+    out["stoch_d"] = out["stoch_k"].rolling(3).mean()
+    true_range = pd.concat(
+        [df["high"] - df["low"], (df["high"] - close.shift()).abs(), (df["low"] - close.shift()).abs()], axis=1
+    ).max(axis=1)
+    out["atr"] = true_range.rolling(14).mean()
+    return out
+
+
+def bench_indicators(rows_list: List[int], repeat: int) -> None:
+    engine = IndicatorEngine()
+    for rows in rows_list:
+        series = parse_mcp_csv(synthetic_payload(rows, 3600))
+        df = pd.DataFrame({"high": series.high, "low": series.low, "close": series.close})
+        timings = {
+            "pandas per-indicator": best_of(lambda: _pandas_indicators(df), repeat),
+            "engine (one pass)": best_of(lambda: engine.compute(series), repeat),
+        }
+        report(f"indicator set ({len(engine.outputs)} outputs, {engine.nodes} nodes)", rows, timings)
+
+
+def bench_connector(rows_list: List[int], repeat: int) -> None:
+    timeframes = ["M15", "H1", "H4", "D1"]
+    for rows in rows_list:
+        symbols = [f"SYM{index:03d}" for index in range(rows)]
+        recordings = RecordedPayloads.from_candles(
+            {symbol: {tf: synthetic_payload(300, timeframe_seconds(tf)) for tf in timeframes} for symbol in symbols}
+        )
+        server = ReplayServer(recordings, latency=CONNECTOR_LATENCY)
+        host, port = server.start_background()
+        try:
+            with AsyncMcpConnector(host, port, pool_size=1) as blocking, AsyncMcpConnector(host, port, pool_size=16) as pooled:
+                timings = {
+                    "one at a time": best_of(
+                        lambda: [blocking.get_symbol_data(symbol, timeframes) for symbol in symbols], repeat
+                    ),
+                    "async pool (16)": best_of(lambda: pooled.get_many(symbols, timeframes), repeat),
+                }
+        finally:
+            server.stop_background()
+        report(f"connector ({len(timeframes)} tf, {CONNECTOR_LATENCY * 1000:.0f} ms latency)", rows, timings)
+
+
+BENCHMARKS: Dict[str, Callable[[List[int], int], None]] = {
+    "parse": bench_parse,
+    "tail": bench_tail,
+    "ticks": bench_ticks,
+    "validate": bench_validate,
+    "connector": bench_connector,
+    "timestamps": bench_timestamps,
+    "patterns": bench_patterns,
+    "dsl": bench_dsl,
+    "reliability": bench_reliability,
+    "batch": bench_batch,
+    "swings": bench_swings,
+    "zones": bench_zones,
+    "levels": bench_levels,
+    "indicators": bench_indicators,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Candle Pipeline Benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS), help="Benchmark to run")
+    parser.add_argument(
+        "--rows",
+        default="100,10000,1000000",
+        help="Comma-separated payload sizes (default: 100,10000,1000000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per measurement; the best time is reported (default: 3)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rows_list = [int(value) for value in args.rows.split(",") if value.strip()]
+    if not rows_list:
+        raise SystemExit("Debe especificar al menos un tamaño de muestra.")
+    BENCHMARKS[args.benchmark](rows_list, max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
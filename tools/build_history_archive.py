@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+History Archive Builder
+
+Usage:
+    python tools/build_history_archive.py EURUSD --sample-data samples/EURUSD.json
+    python tools/build_history_archive.py EURUSD --csv H1=eurusd_h1.csv --csv D1=eurusd_d1.csv
+
+Converts sample JSON payloads or MCP candle CSV exports into memory-mapped
+``.tsa`` archives (one per symbol/timeframe) that scanners and backtests can
+slice by date without re-parsing text.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+
+from console_utils import safe_console_output  # noqa: E402
+from history_archive import HistoryArchive, archive_from_csv, archive_from_sample_json  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="History Archive Builder")
+    parser.add_argument("symbol", help="Trading symbol (e.g., EURUSD)")
+    parser.add_argument(
+        "--sample-data",
+        type=Path,
+        help="JSON file with candle CSV payloads per timeframe (same format as --sample-data)",
+    )
+    parser.add_argument(
+        "--csv",
+        action="append",
+        default=[],
+        metavar="TF=PATH",
+        help="MCP candle CSV export for one timeframe (repeatable)",
+    )
+    parser.add_argument(
+        "--output",
+        default=str(REPO_ROOT / "data" / "archives"),
+        help="Directory where .tsa archives are written",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.sample_data and not args.csv:
+        raise SystemExit("Debe indicar --sample-data o al menos un --csv TF=PATH.")
+
+    symbol = args.symbol.upper()
+    written: List[Path] = []
+    if args.sample_data:
+        written.extend(archive_from_sample_json(args.sample_data, args.output, symbol))
+    for item in args.csv:
+        timeframe, _, csv_path = item.partition("=")
+        if not csv_path:
+            raise SystemExit(f"Formato invalido para --csv: {item} (use TF=PATH)")
+        csv_data = Path(csv_path).read_text(encoding="utf-8")
+        written.append(archive_from_csv(csv_data, args.output, symbol, timeframe.strip().upper()))
+
+    for path in written:
+        archive = HistoryArchive(path)
+        start, end = (
+            datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%d %H:%M") if value is not None else "-"
+            for value in archive.time_range
+        )
+        safe_console_output(f"[OK] {path} ({len(archive)} velas, {start} -> {end})")
+
+
+if __name__ == "__main__":
+    main()
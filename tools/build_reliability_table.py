@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pattern Reliability Table Builder
+
+Usage:
+    python tools/build_reliability_table.py --archives data/archives
+    python tools/build_reliability_table.py --archives data/archives --timeframe H1 --horizons 1,5,20
+
+Measures every candlestick pattern over the full history in the ``.tsa``
+archives (forward returns, hit rates, MFE/MAE) and writes the reliability
+table that ``standalone_scanner.py --reliability`` and ``batch_scanner.py
+--reliability`` apply instead of the fixed textbook values. Per-archive
+results are cached by data version, so rebuilding after appending bars only
+recomputes the archives that changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+
+from console_utils import safe_console_output  # noqa: E402
+from history_archive import ARCHIVE_SUFFIX, HistoryArchive  # noqa: E402
+from pattern_reliability import ALL, DEFAULT_HORIZONS, RELIABILITY_HORIZON, ReliabilityEngine  # noqa: E402
+
+DEFAULT_DIR = REPO_ROOT / "data" / "reliability"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pattern Reliability Table Builder")
+    parser.add_argument("--archives", type=Path, default=REPO_ROOT / "data" / "archives", help="Directory with .tsa archives")
+    parser.add_argument("--output", type=Path, default=DEFAULT_DIR / "reliability.json", help="Reliability table JSON")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_DIR / "cache", help="Per-archive statistics cache")
+    parser.add_argument(
+        "--horizons",
+        default=",".join(str(h) for h in DEFAULT_HORIZONS),
+        help=f"Comma-separated forward horizons in bars (default: {','.join(str(h) for h in DEFAULT_HORIZONS)})",
+    )
+    parser.add_argument("--timeframe", help="Print the summary for this timeframe only (default: all timeframes)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    archives = sorted(args.archives.glob(f"*{ARCHIVE_SUFFIX}"))
+    if not archives:
+        raise SystemExit(f"No se encontraron archivos {ARCHIVE_SUFFIX} en {args.archives}")
+    try:
+        horizons = [int(value) for value in args.horizons.split(",") if value.strip()]
+    except ValueError as exc:
+        raise SystemExit(f"Horizontes invalidos: {args.horizons}") from exc
+
+    engine = ReliabilityEngine(args.cache_dir, horizons)
+    started = time.perf_counter()
+    streams = []
+    for path in archives:
+        archive = HistoryArchive(path)
+        streams.append((archive.symbol, archive.timeframe, archive.slice()))
+    table = engine.build(streams)
+    elapsed = time.perf_counter() - started
+    table.save(args.output)
+
+    timeframe = args.timeframe.upper() if args.timeframe else ALL
+    horizon = min(engine.horizons, key=lambda h: abs(h - RELIABILITY_HORIZON))
+    safe_console_output(f"Patron                 Casos  Fiab.  Aciertos@{horizon}  MFE%   MAE%   ({timeframe})")
+    for row in table.rows(timeframe):
+        hit_rate = row["hit_rate"][horizon]
+        hits = f"{hit_rate * 100:5.1f}%" if hit_rate is not None else "    - "
+        reliability = row["reliability"] if row["reliability"] is not None else "-"
+        mfe = f"{row['mfe'] * 100:5.2f}" if row["mfe"] is not None else "  -  "
+        mae = f"{row['mae'] * 100:5.2f}" if row["mae"] is not None else "  -  "
+        safe_console_output(
+            f"{row['pattern']:<22} {row['occurrences']:>6}  {reliability:>4}   {hits}       {mfe}  {mae}"
+        )
+    safe_console_output(
+        f"[OK] {len(streams)} historicos ({engine.misses} calculados, {engine.hits} desde cache) en {elapsed:.2f}s"
+    )
+    safe_console_output(f"[OK] Tabla guardada en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
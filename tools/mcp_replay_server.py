@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+MCP Replay Server
+
+Usage:
+    python tools/mcp_replay_server.py --recordings samples/ --latency-ms 40
+    python tools/mcp_replay_server.py --synthetic EURUSD,GBPUSD,USDJPY --bars 1000 --port 8765
+
+Serves recorded candle payloads (one ``SYMBOL.json`` per symbol, same layout
+as --sample-data) with configurable latency, standing in for the MetaTrader
+MCP bridge. Point the scanners at it with ``--mcp-server 127.0.0.1:8765``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+
+from candle_series import TIMEFRAME_SECONDS  # noqa: E402
+from console_utils import safe_console_output  # noqa: E402
+from mcp_csv import synthetic_payload  # noqa: E402
+from mcp_replay import RecordedPayloads, ReplayServer  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MCP Replay Server")
+    parser.add_argument("--recordings", type=Path, help="Directory with SYMBOL.json candle recordings")
+    parser.add_argument("--synthetic", help="Comma-separated symbols to serve synthetic candles for")
+    parser.add_argument("--bars", type=int, default=1000, help="Bars per synthetic timeframe (default: 1000)")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay up to this value")
+    return parser.parse_args()
+
+
+def load_payloads(args: argparse.Namespace) -> RecordedPayloads:
+    if args.recordings:
+        if not args.recordings.is_dir():
+            raise SystemExit(f"No se encontro el directorio de grabaciones: {args.recordings}")
+        return RecordedPayloads.from_directory(args.recordings)
+    if args.synthetic:
+        symbols = [sym.strip().upper() for sym in args.synthetic.split(",") if sym.strip()]
+        return RecordedPayloads.from_candles(
+            {
+                symbol: {tf: synthetic_payload(args.bars, seconds, seed=index) for tf, seconds in TIMEFRAME_SECONDS.items()}
+                for index, symbol in enumerate(symbols)
+            }
+        )
+    raise SystemExit("Debe indicar --recordings o --synthetic.")
+
+
+async def serve(args: argparse.Namespace) -> None:
+    payloads = load_payloads(args)
+    server = ReplayServer(payloads, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+    host, port = await server.start(args.host, args.port)
+    safe_console_output(
+        f"[OK] Sirviendo {', '.join(sorted(payloads.series))} en {host}:{port}"
+        f" (latencia {args.latency_ms:.0f} ms + jitter {args.jitter_ms:.0f} ms)"
+    )
+    await server.serve_forever()
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        safe_console_output("-> Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()
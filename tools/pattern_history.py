@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Pattern Occurrence History
+
+Usage:
+    python tools/pattern_history.py build --archives data/archives
+    python tools/pattern_history.py query --symbol GBPUSD --timeframe H4 --pattern "Bearish Engulfing" --near resistance --since 2023-01-01
+
+``build`` indexes every pattern found in the ``.tsa`` history archives
+(``build_history_archive.py``) into a persistent ``PatternIndex``; running it
+again only evaluates bars added since the previous build. ``query`` answers
+range/filter questions from the index without touching raw history.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+
+from console_utils import safe_console_output  # noqa: E402
+from history_archive import ARCHIVE_SUFFIX, HistoryArchive  # noqa: E402
+from pattern_index import DEFAULT_SR_LOOKBACK, SR_SIDES, PatternIndex  # noqa: E402
+from symbol_metadata import get_symbol_info  # noqa: E402
+
+DEFAULT_INDEX = REPO_ROOT / "data" / "pattern_index" / "occurrences"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pattern Occurrence History")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="Index path (without .json/.npy suffix)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Index (or update) patterns from history archives")
+    build.add_argument("--archives", type=Path, default=REPO_ROOT / "data" / "archives", help="Directory with .tsa archives")
+    build.add_argument(
+        "--sr-lookback",
+        type=int,
+        default=DEFAULT_SR_LOOKBACK,
+        help=f"Bars used for the S/R proximity levels of a new index (default: {DEFAULT_SR_LOOKBACK})",
+    )
+
+    query = commands.add_parser("query", help="Filter indexed occurrences")
+    query.add_argument("--symbol", action="append", help="Symbol filter (repeatable)")
+    query.add_argument("--timeframe", action="append", help="Timeframe filter (repeatable)")
+    query.add_argument("--pattern", action="append", help="Pattern name filter (repeatable)")
+    query.add_argument("--bias", choices=["bullish", "bearish", "neutral"], help="Pattern bias filter")
+    query.add_argument("--near", choices=SR_SIDES, help="Only occurrences near support or resistance")
+    query.add_argument("--within", type=float, default=10.0, help="Pips from the level counted as near (default: 10)")
+    query.add_argument("--since", help="First date (YYYY-MM-DD[ HH:MM], UTC)")
+    query.add_argument("--until", help="End date, exclusive (YYYY-MM-DD[ HH:MM], UTC)")
+    query.add_argument("--limit", type=int, default=20, help="Most recent occurrences to print (default: 20)")
+    query.add_argument("--json", action="store_true", help="Print the matches as JSON")
+    return parser.parse_args()
+
+
+def parse_date(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            continue
+    raise SystemExit(f"Fecha invalida: {value} (use YYYY-MM-DD o 'YYYY-MM-DD HH:MM')")
+
+
+def run_build(args: argparse.Namespace) -> None:
+    archives = sorted(args.archives.glob(f"*{ARCHIVE_SUFFIX}"))
+    if not archives:
+        raise SystemExit(f"No se encontraron archivos {ARCHIVE_SUFFIX} en {args.archives}")
+    index = PatternIndex.load(args.index, sr_lookback=args.sr_lookback)
+    for path in archives:
+        archive = HistoryArchive(path)
+        added = index.index_series(archive.symbol, archive.timeframe, archive.slice())
+        safe_console_output(f"[OK] {archive.symbol} {archive.timeframe}: {added} patrones nuevos")
+    index.save(args.index)
+    safe_console_output(f"[OK] Indice guardado en {args.index} ({len(index)} patrones)")
+
+
+def run_query(args: argparse.Namespace) -> None:
+    index = PatternIndex.load(args.index)
+    if not len(index):
+        raise SystemExit(f"Indice vacio o inexistente: {args.index} (ejecute 'build' primero)")
+    started = time.perf_counter()
+    matches = index.query(
+        start=parse_date(args.since),
+        end=parse_date(args.until),
+        symbols=args.symbol,
+        timeframes=args.timeframe,
+        patterns=args.pattern,
+        bias=args.bias,
+        near=args.near,
+        within_pips=args.within,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    shown = index.to_dicts(matches[-args.limit :] if args.limit > 0 else matches)
+    if args.json:
+        print(json.dumps(shown, indent=2))
+        return
+    for item in shown:
+        price = get_symbol_info(item["symbol"]).format_price(item["price"])
+        levels = f"S {item['support_pips']} / R {item['resistance_pips']} pips"
+        safe_console_output(
+            f"{item['time'][:16]} {item['symbol']:<8} {item['timeframe']:<4} {item['pattern']:<22} {price}  {levels}"
+        )
+    safe_console_output(f"[OK] {len(matches)} coincidencias ({elapsed:.2f} ms), mostrando {len(shown)}")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "build":
+        run_build(args)
+    else:
+        run_query(args)
+
+
+if __name__ == "__main__":
+    main()
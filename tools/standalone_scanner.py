@@ -13,6 +13,7 @@ without MCP connectivity.
 from __future__ import annotations
 
 import argparse
+import inspect
 import json
 import sys
 import webbrowser
@@ -23,10 +24,21 @@ REPO_ROOT = Path(__file__).resolve().parent.parent
 SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
 sys.path.insert(0, str(SKILL_PATH))
 
-from candlestick_scanner import (  # noqa: E402
-    parse_candles_from_csv,
-    scan_symbol_for_patterns,
-)
+from async_connector import AsyncMcpConnector, parse_address  # noqa: E402
+from candle_cache import CandleDiskCache  # noqa: E402
+from candle_context import CandleContext  # noqa: E402
+from candle_series import broker_now, timeframe_seconds  # noqa: E402
+from candle_validation import repair_series, validate_timeframes  # noqa: E402
+from history_archive import HistoryArchive, archive_path  # noqa: E402
+from level_index import LevelIndex  # noqa: E402
+from pattern_reliability import ReliabilityTable  # noqa: E402
+from price_cache import PriceCache  # noqa: E402
+from resampler import derive_timeframes  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+from sr_zones import SRZoneEngine  # noqa: E402
+from swings import levels_by_timeframe  # noqa: E402
+from symbol_metadata import get_symbol_info  # noqa: E402
+from candlestick_scanner import scan_symbol_for_patterns  # noqa: E402
 from confluence_calculator import enhance_probability_with_patterns  # noqa: E402
 from console_utils import safe_console_output  # noqa: E402
 from html_generator import generate_html_report  # noqa: E402
@@ -38,19 +50,42 @@ try:  # Optional MetaTrader connector
 except ImportError:
     MCP_AVAILABLE = False
 
+HISTORY_BARS = 250
+NEAR_LEVEL_PIPS = 10.0
 
-def _infer_price_from_candles(candles: Dict[str, str], timeframes: List[str]) -> float:
+
+def use_mcp_server(address: str, pool_size: int = 8, timeout: float = 10.0) -> AsyncMcpConnector:
+    """Route fetches through a pooled asyncio connector instead of ``mt5_connector``."""
+    global get_symbol_data, MCP_AVAILABLE
+    host, port = parse_address(address)
+    connector = AsyncMcpConnector(host, port, pool_size=pool_size, timeout=timeout)
+    get_symbol_data = connector.get_symbol_data
+    MCP_AVAILABLE = True
+    return connector
+
+
+def _infer_price_from_candles(
+    candles: Dict[str, str],
+    timeframes: List[str],
+    context: CandleContext | None = None,
+    symbol: str = "",
+) -> float:
+    context = context or CandleContext()
     for timeframe in timeframes:
         csv_data = candles.get(timeframe)
         if not csv_data:
             continue
-        df = parse_candles_from_csv(csv_data)
-        if not df.empty:
-            return float(df.iloc[-1]["close"])
+        payload = context.payload(symbol, timeframe, csv_data)
+        if not payload.is_empty:
+            return payload.last_close()
     raise ValueError("Unable to infer current price from provided candles.")
 
 
-def _load_sample_payload(path: Path) -> Tuple[Dict[str, str], float]:
+def _load_sample_payload(
+    path: Path,
+    context: CandleContext | None = None,
+    symbol: str = "",
+) -> Tuple[Dict[str, str], float]:
     payload = json.loads(path.read_text(encoding="utf-8"))
     if isinstance(payload, dict) and "candles" in payload:
         candles = payload["candles"]
@@ -59,7 +94,107 @@ def _load_sample_payload(path: Path) -> Tuple[Dict[str, str], float]:
         candles = payload
         price = 0.0
     if not price:
-        price = _infer_price_from_candles(candles, list(candles.keys()))
+        price = _infer_price_from_candles(candles, list(candles.keys()), context, symbol)
+    return candles, price
+
+
+def _load_archive_payload(
+    archive_dir: Path,
+    symbol: str,
+    timeframes: List[str],
+    context: CandleContext | None = None,
+) -> Tuple[Dict[str, str], float]:
+    context = context or CandleContext()
+    candles: Dict[str, str] = {}
+    for timeframe in timeframes:
+        path = archive_path(archive_dir, symbol, timeframe)
+        if path.exists():
+            # The mapped arrays become the context's series; the CSV is only for CSV-based consumers.
+            candles[timeframe] = context.register_series(symbol, timeframe, HistoryArchive(path).tail(HISTORY_BARS))
+    if not candles:
+        raise FileNotFoundError(f"No history archives for {symbol} in {archive_dir}.")
+    return candles, _infer_price_from_candles(candles, timeframes, context, symbol)
+
+
+def _unpack_connector_result(result: Any) -> Tuple[Dict[str, str], float]:
+    if isinstance(result, tuple):
+        candles, price = result
+    else:
+        candles = result.get("candles") if isinstance(result, dict) else result
+        price = result.get("current_price") if isinstance(result, dict) else 0.0
+    return candles, float(price or 0.0)
+
+
+def _connector_accepts(parameter: str) -> bool:
+    try:
+        return parameter in inspect.signature(get_symbol_data).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _call_connector(
+    symbol: str,
+    timeframes: List[str],
+    count: int | None = None,
+    flight: SingleFlight | None = None,
+    with_price: bool = True,
+) -> Tuple[Dict[str, str], float]:
+    options: Dict[str, Any] = {}
+    if count and _connector_accepts("count"):
+        options["count"] = count
+    if not with_price and _connector_accepts("with_price"):
+        options["with_price"] = False
+
+    def request(tfs: List[str]) -> Tuple[Dict[str, str], float]:
+        return _unpack_connector_result(get_symbol_data(symbol, tfs, **options))
+
+    if flight is None:
+        return request(timeframes)
+
+    def fetch(keys: List[Tuple[str, str, int | None, bool]]) -> Dict[Any, Tuple[str, float]]:
+        candles, price = request([key[1] for key in keys])
+        return {key: (candles.get(key[1], ""), price) for key in keys}
+
+    # Unpriced results carry 0.0, so they must not answer a priced request; missing timeframes are retried.
+    priced = "with_price" not in options
+    keys = [(symbol.upper(), tf.upper(), count, priced) for tf in timeframes]
+    values = flight.do_many(keys, fetch, cacheable=lambda value: bool(value[0]))
+    candles = {tf: values[key][0] for tf, key in zip(timeframes, keys)}
+    return candles, next((price for _, price in values.values() if price), 0.0)
+
+
+def _fetch_through_cache(
+    symbol: str,
+    timeframes: List[str],
+    cache: CandleDiskCache,
+    context: CandleContext,
+    history_bars: int = HISTORY_BARS,
+    flight: SingleFlight | None = None,
+    with_price: bool = True,
+    broker_offset: int = 0,
+) -> Tuple[Dict[str, str], float]:
+    if _connector_accepts("count"):
+        # One request sized for the timeframe furthest behind; extra bars only overlap the cache.
+        now = broker_now(broker_offset)
+        count = max(cache.bars_to_fetch(symbol, timeframe, now, history_bars) for timeframe in timeframes)
+        fetched, price = _call_connector(symbol, timeframes, count, flight, with_price)
+        short = [
+            tf
+            for tf in timeframes
+            if fetched.get(tf) and cache.leaves_gap(symbol, tf, context.series(symbol, tf, fetched[tf]))
+        ]
+        if short and count < history_bars:
+            # The broker clock ran ahead of ``broker_offset``: refill instead of leaving a hole.
+            safe_console_output(f"[WARN] {symbol} {', '.join(short)}: hueco en la cache, se recarga el historial")
+            refilled, _ = _call_connector(symbol, short, history_bars, flight, False)
+            fetched.update({tf: csv_data for tf, csv_data in refilled.items() if csv_data})
+    else:
+        fetched, price = _call_connector(symbol, timeframes, flight=flight, with_price=with_price)
+
+    for timeframe in timeframes:
+        if fetched.get(timeframe):
+            cache.merge(symbol, timeframe, context.series(symbol, timeframe, fetched[timeframe]))
+    candles = {tf: cache.load(symbol, tf, history_bars).to_csv() for tf in timeframes}
     return candles, price
 
 
@@ -67,36 +202,157 @@ def fetch_market_data(
     symbol: str,
     timeframes: List[str],
     sample_path: Path | None = None,
+    context: CandleContext | None = None,
+    cache_dir: Path | None = None,
+    archive_dir: Path | None = None,
+    history_bars: int | None = None,
+    flight: SingleFlight | None = None,
+    price_cache: PriceCache | None = None,
+    broker_offset: int = 0,
 ) -> Tuple[Dict[str, str], float]:
+    """
+    Candle payloads and current price for ``symbol``.
+
+    With ``flight``, concurrent callers asking for the same (symbol,
+    timeframe, count, with or without price) share one connector request and
+    recent non-empty results. A
+    fresh ``price_cache`` entry replaces the connector price lookup.
+    ``broker_offset`` (seconds east of UTC) puts the cache's clock on the
+    broker's bar times.
+    """
     if sample_path:
-        return _load_sample_payload(sample_path)
+        return _load_sample_payload(sample_path, context, symbol)
+    if archive_dir:
+        return _load_archive_payload(archive_dir, symbol, timeframes, context)
 
     if not MCP_AVAILABLE:
         raise RuntimeError(
             "MetaTrader connector not configured. Provide --sample-data or install mt5_connector."
         )
 
-    result = get_symbol_data(symbol, timeframes)
-    if isinstance(result, tuple):
-        candles, price = result
+    context = context or CandleContext()
+    cached_price = price_cache.get(symbol) if price_cache else None
+    if cache_dir:
+        candles, price = _fetch_through_cache(
+            symbol,
+            timeframes,
+            CandleDiskCache(cache_dir),
+            context,
+            history_bars or HISTORY_BARS,
+            flight,
+            cached_price is None,
+            broker_offset,
+        )
     else:
-        candles = result.get("candles") if isinstance(result, dict) else result
-        price = result.get("current_price") if isinstance(result, dict) else 0.0
+        candles, price = _call_connector(symbol, timeframes, history_bars, flight, cached_price is None)
 
+    if cached_price is not None:
+        price = cached_price
+    elif price and price_cache:
+        price_cache.update(symbol, price)
     if not price:
-        price = _infer_price_from_candles(candles, timeframes)
+        price = _infer_price_from_candles(candles, timeframes, context, symbol)
     return candles, float(price)
 
 
+def _derive_from_base(
+    symbol: str,
+    candles: Dict[str, str],
+    base_timeframe: str,
+    timeframes: List[str],
+    context: CandleContext,
+) -> Dict[str, str]:
+    base_csv = candles.get(base_timeframe)
+    if not base_csv:
+        raise ValueError(f"No {base_timeframe} candles available to derive {', '.join(timeframes)}.")
+    base = context.series(symbol, base_timeframe, base_csv)
+    derived = derive_timeframes(base, base_timeframe, [tf for tf in timeframes if tf != base_timeframe])
+    result = {tf: series.tail(HISTORY_BARS).to_csv() for tf, series in derived.items()}
+    if base_timeframe in timeframes:
+        result[base_timeframe] = base_csv
+    return result
+
+
+def _validate_candles(
+    symbol: str,
+    candles: Dict[str, str],
+    timeframes: List[str],
+    context: CandleContext,
+    now: int | None = None,
+) -> Tuple[Dict[str, str], List[str]]:
+    report = validate_timeframes(context.series_by_timeframe(symbol, timeframes), now=now)
+    checked = dict(candles)
+    usable: List[str] = []
+    for tf in timeframes:
+        if tf not in report.masks:
+            usable.append(tf)
+            continue
+        if not report.usable(tf):
+            safe_console_output(f"[WARN] {symbol} {tf}: se omite ({report.describe(tf)})")
+            checked.pop(tf, None)
+            continue
+        if not report.ok(tf):
+            safe_console_output(f"[WARN] {symbol} {tf}: {report.describe(tf)}")
+        if report.needs_repair(tf):
+            checked[tf] = repair_series(context.series(symbol, tf)).to_csv()
+            context.payload(symbol, tf, checked[tf])
+        usable.append(tf)
+    if not usable:
+        raise ValueError(f"No timeframe of {symbol} has enough valid candles to scan.")
+    return checked, usable
+
+
 def run_scan(
     symbol: str,
     timeframes: List[str],
     output_dir: Path,
     sample_data: Path | None,
     open_browser: bool,
+    debug: bool = False,
+    cache_dir: Path | None = None,
+    archive_dir: Path | None = None,
+    base_timeframe: str | None = None,
+    flight: SingleFlight | None = None,
+    price_cache: PriceCache | None = None,
+    reliability: ReliabilityTable | None = None,
+    zones: SRZoneEngine | None = None,
+    broker_offset: int = 0,
 ) -> Tuple[str, Dict[str, Any]]:
     safe_console_output(f"-> Scanning {symbol} across {', '.join(timeframes)}")
-    candles, current_price = fetch_market_data(symbol, timeframes, sample_data)
+    context = CandleContext()
+    if base_timeframe:
+        # One base fetch deep enough to rebuild HISTORY_BARS of the slowest timeframe.
+        ratio = max(timeframe_seconds(tf) // timeframe_seconds(base_timeframe) for tf in timeframes)
+        candles, current_price = fetch_market_data(
+            symbol,
+            [base_timeframe],
+            sample_data,
+            context,
+            cache_dir,
+            archive_dir,
+            HISTORY_BARS * max(1, ratio),
+            flight,
+            price_cache,
+            broker_offset,
+        )
+        candles = _derive_from_base(symbol, candles, base_timeframe, timeframes, context)
+    else:
+        candles, current_price = fetch_market_data(
+            symbol,
+            timeframes,
+            sample_data,
+            context,
+            cache_dir,
+            archive_dir,
+            flight=flight,
+            price_cache=price_cache,
+            broker_offset=broker_offset,
+        )
+    context.register(symbol, candles)
+    live = not sample_data and not archive_dir
+    candles, timeframes = _validate_candles(
+        symbol, candles, timeframes, context, broker_now(broker_offset) if live else None
+    )
 
     scan_results = scan_symbol_for_patterns(
         symbol=symbol,
@@ -105,6 +361,31 @@ def run_scan(
         timeframes=timeframes,
     )
 
+    if zones is not None:
+        # Histogram zones replace the per-scan levels; unchanged streams are cache hits.
+        # Live series end with the forming bar; it is consumed once it has closed.
+        scan_results["support_resistance"] = zones.levels_by_timeframe(
+            symbol, context.series_by_timeframe(symbol, timeframes), current_price, forming=live
+        )
+    elif not scan_results.get("support_resistance"):
+        # Nearest swing highs/lows, shared through the context with any other swing consumer.
+        scan_results["support_resistance"] = levels_by_timeframe(
+            context.swings_by_timeframe(symbol, timeframes), current_price
+        )
+
+    if reliability is not None:
+        # Measured hit rates replace the textbook reliability constants before scoring.
+        scan_results["patterns_by_timeframe"] = reliability.apply_by_timeframe(
+            scan_results.get("patterns_by_timeframe") or {}, symbol
+        )
+
+    # One sorted index over every timeframe's levels: O(log n) proximity per pattern and the S/R table rows.
+    level_index = LevelIndex(scan_results.get("support_resistance") or {}, get_symbol_info(symbol).pip_size)
+    scan_results["patterns_by_timeframe"] = level_index.annotate_by_timeframe(
+        scan_results.get("patterns_by_timeframe") or {}, NEAR_LEVEL_PIPS
+    )
+    scan_results["level_table"] = level_index.rows(current_price)
+
     technical_snapshots = scan_results.get("technical_snapshots") or {}
     technical_scores_by_tf = {
         tf: payload.get("scores", {})
@@ -134,11 +415,44 @@ def run_scan(
         f"-> Señal principal: {confluence['signal']} ({confluence['primary_probability']:.1f}%)"
     )
 
+    if debug:
+        stats = context.debug_stats()
+        safe_console_output(
+            "[DEBUG] candle payloads: "
+            + ", ".join(f"{name}={value}" for name, value in stats.items())
+        )
+
     if open_browser:
         webbrowser.open(f"file://{report_path}")
     return report_path, confluence
 
 
+def load_reliability(path: Path | None) -> ReliabilityTable | None:
+    if path is None:
+        return None
+    try:
+        table = ReliabilityTable.load(path)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"No se pudo cargar la tabla de fiabilidad {path}: {exc}") from exc
+    safe_console_output(f"-> Fiabilidad medida: {len(table)} historicos ({path})")
+    return table
+
+
+def broker_offset_seconds(hours: float) -> int:
+    if not -14 <= hours <= 14:
+        raise SystemExit(f"Desfase de broker fuera de rango: {hours} horas.")
+    return int(round(hours * 3600))
+
+
+def load_zones(path: Path | None) -> SRZoneEngine | None:
+    if path is None:
+        return None
+    try:
+        return SRZoneEngine.load(path)
+    except (OSError, ValueError, KeyError) as exc:
+        raise SystemExit(f"No se pudo cargar el estado de zonas {path}: {exc}") from exc
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Standalone Pattern Scanner")
     parser.add_argument("symbol", help="Trading symbol (e.g., EURUSD)")
@@ -162,6 +476,51 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Do not open the generated report in the default browser",
     )
+    parser.add_argument(
+        "--base-timeframe",
+        help="Fetch only this timeframe (e.g., M15) and build the others locally by resampling",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=Path,
+        help="Directory with .tsa history archives to scan instead of MCP (see build_history_archive.py)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent candle cache (fetch only new bars on repeat scans)",
+    )
+    parser.add_argument(
+        "--broker-offset",
+        type=float,
+        default=0.0,
+        help="Broker server clock in hours east of UTC (e.g., 2 or 3); MT5 bar times use it (default: 0)",
+    )
+    parser.add_argument(
+        "--reliability",
+        type=Path,
+        help="Reliability table JSON (tools/build_reliability_table.py) with measured pattern hit rates",
+    )
+    parser.add_argument(
+        "--zones",
+        type=Path,
+        help="Support/resistance zone state JSON; levels come from swing-histogram zones updated incrementally",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Print candle parse counters after the scan",
+    )
+    parser.add_argument(
+        "--mcp-server",
+        help="HOST:PORT of a JSON-lines MCP bridge (e.g., tools/mcp_replay_server.py) to fetch from",
+    )
+    parser.add_argument(
+        "--mcp-timeout",
+        type=float,
+        default=10.0,
+        help="Per-request timeout in seconds for --mcp-server (default: 10)",
+    )
     return parser.parse_args()
 
 
@@ -173,6 +532,10 @@ def main() -> None:
 
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    if args.mcp_server:
+        use_mcp_server(args.mcp_server, timeout=args.mcp_timeout)
+    reliability = load_reliability(args.reliability)
+    zones = load_zones(args.zones)
 
     try:
         run_scan(
@@ -181,10 +544,23 @@ def main() -> None:
             output_dir=output_dir,
             sample_data=args.sample_data,
             open_browser=not args.no_open,
+            debug=args.debug,
+            cache_dir=args.cache_dir,
+            archive_dir=args.archive_dir,
+            base_timeframe=args.base_timeframe.upper() if args.base_timeframe else None,
+            reliability=reliability,
+            zones=zones,
+            broker_offset=broker_offset_seconds(args.broker_offset),
         )
     except Exception as exc:  # pragma: no cover - CLI friendly
         safe_console_output(f"[ERROR] Error durante el escaneo: {exc}")
         raise SystemExit(1) from exc
+    if zones is not None:
+        zones.save(args.zones)
+        if args.debug:
+            safe_console_output(
+                "[DEBUG] zones: " + ", ".join(f"{name}={value}" for name, value in zones.stats().items())
+            )
 
 if __name__ == "__main__":
     main()
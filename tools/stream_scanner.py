@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Streaming Pattern Scanner
+
+Usage:
+    python tools/stream_scanner.py EURUSD --ticks data/ticks/EURUSD.csv.gz --timeframes M15,H1,H4
+    python tools/stream_scanner.py EURUSD --ticks data/ticks/EURUSD.csv.gz --patterns-only --state state.json
+    python tools/stream_scanner.py EURUSD --ticks data/ticks/EURUSD.csv.gz --patterns-only --pattern-file my_patterns.yaml
+
+Replays a tick file (``time,bid,ask[,volume]``) through the streaming bar
+builder and runs the pattern scanner each time a bar of a trigger timeframe
+closes, printing the patterns found on that bar. With ``--patterns-only`` the
+incremental ``PatternDetector`` evaluates each closed bar instead (no full
+scan); ``--state`` keeps its state between runs and ``--pattern-file`` adds
+user-defined ``pattern_dsl`` patterns (YAML or JSON) to the built-in set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from functools import partial
+from typing import Any, Dict
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SKILL_PATH = REPO_ROOT / ".claude" / "skills" / "pattern-scanner" / "scripts"
+sys.path.insert(0, str(SKILL_PATH))
+
+from bar_builder import ClosedBar, FileReplayTickSource, ScannerFeed, StreamingBarBuilder  # noqa: E402
+from console_utils import safe_console_output  # noqa: E402
+from pattern_detector import PatternDetector  # noqa: E402
+from pattern_dsl import load_pattern_file  # noqa: E402
+from pattern_kernel import BUILTIN  # noqa: E402
+from symbol_metadata import SymbolInfo, get_symbol_info  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Streaming Pattern Scanner")
+    parser.add_argument("symbol", help="Trading symbol (e.g., EURUSD)")
+    parser.add_argument("--ticks", type=Path, required=True, help="Tick CSV (.csv or .csv.gz) to replay")
+    parser.add_argument(
+        "--timeframes",
+        default="M15,H1,H4",
+        help="Comma-separated list of timeframes to build (default: M15,H1,H4)",
+    )
+    parser.add_argument(
+        "--trigger",
+        help="Timeframes whose bar close triggers a scan (default: all built timeframes)",
+    )
+    parser.add_argument(
+        "--point",
+        type=float,
+        help="Symbol point size used for the spread column (default: from the symbol metadata)",
+    )
+    parser.add_argument("--limit", type=int, help="Stop after this many ticks")
+    parser.add_argument(
+        "--patterns-only",
+        action="store_true",
+        help="Detect candlestick patterns incrementally on each closed bar instead of running full scans",
+    )
+    parser.add_argument("--state", type=Path, help="Detector state file to resume from and save to (--patterns-only)")
+    parser.add_argument(
+        "--pattern-file",
+        type=Path,
+        help="YAML/JSON file with extra pattern definitions (--patterns-only)",
+    )
+    return parser.parse_args()
+
+
+def print_result(info: SymbolInfo, bar: ClosedBar, result: Dict[str, Any]) -> None:
+    stamp = datetime.fromtimestamp(bar.time, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+    patterns = (result.get("patterns_by_timeframe") or {}).get(bar.timeframe) or []
+    names = ", ".join(str(pattern.get("name", "?")) for pattern in patterns[-3:]) or "-"
+    close = info.format_price(bar.close)
+    safe_console_output(f"[{bar.timeframe} {stamp}] close={close} patrones={len(patterns)} ({names})")
+
+
+def print_event(info: SymbolInfo, event: Dict[str, Any]) -> None:
+    price = info.format_price(event["price"])
+    safe_console_output(f"[{event['timeframe']} {event['time'][:16]}] {event['name']} ({event['bias']}) @ {price}")
+
+
+def run_patterns_only(args: argparse.Namespace, builder: StreamingBarBuilder, info: SymbolInfo) -> None:
+    on_event = partial(print_event, info)
+    program = None
+    if args.pattern_file:
+        try:
+            definitions = load_pattern_file(args.pattern_file)
+            program = BUILTIN.extend(definitions)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"[ERROR] Definiciones de patrones invalidas: {exc}") from exc
+        safe_console_output(f"[OK] {len(definitions)} patrones personalizados cargados")
+    if args.state:
+        detector = PatternDetector.load(args.state, on_event=on_event, program=program)
+    else:
+        detector = PatternDetector(on_event=on_event, program=program)
+    detector.attach(builder, args.symbol)
+    closed = builder.run(FileReplayTickSource(args.ticks, limit=args.limit))
+    stats = detector.stats()
+    safe_console_output(
+        f"[OK] {builder.tick_count} ticks, {closed} velas cerradas, {stats['events']} patrones"
+        f" ({stats['bars_skipped']} velas ya evaluadas omitidas)"
+    )
+    if args.state:
+        detector.save(args.state)
+        safe_console_output(f"[OK] Estado guardado en {args.state}")
+
+
+def main() -> None:
+    args = parse_args()
+    timeframes = [tf.strip().upper() for tf in args.timeframes.split(",") if tf.strip()]
+    if not timeframes:
+        raise SystemExit("Debe especificar al menos un timeframe valido.")
+    if not args.ticks.exists():
+        raise SystemExit(f"No se encontro el archivo de ticks: {args.ticks}")
+    triggers = [tf.strip().upper() for tf in args.trigger.split(",")] if args.trigger else None
+
+    info = get_symbol_info(args.symbol)
+    builder = StreamingBarBuilder(timeframes, point=args.point or info.point)
+    if args.patterns_only:
+        run_patterns_only(args, builder, info)
+        return
+    feed = ScannerFeed(builder, args.symbol, triggers, on_result=partial(print_result, info))
+    closed = builder.run(FileReplayTickSource(args.ticks, limit=args.limit))
+    safe_console_output(
+        f"[OK] {builder.tick_count} ticks, {closed} velas cerradas, {feed.scans} escaneos"
+        f" ({builder.late_ticks} ticks fuera de orden ignorados)"
+    )
+
+
+if __name__ == "__main__":
+    main()